@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'user.middleware.QueryCountDebugMiddleware',  # Only active when DEBUG = True
 ]
 
 ROOT_URLCONF = 'main.urls'
@@ -139,13 +140,157 @@ AUTH_USER_MODEL = 'user.User'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads live in the 'default' storage (user/media.py). The local filesystem backend is a
+# stand-in: point 'default' at an object store in production. A backend with an
+# upload_url(name, content_type, expires) method receives ticketed uploads directly.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# WebP thumbnails rendered for professor profile images (longest side, in pixels)
+MEDIA_THUMBNAIL_SIZES = (160, 480, 960)
+MEDIA_THUMBNAIL_QUALITY = 80
+
+# Ticketed uploads (POST /api/user/uploads/, throttled by the 'uploads' rate below):
+# size cap per ticket and ticket lifetime in seconds.
+# Uploads sent through the app (whole or in resumable chunks) are staged on local disk in
+# MEDIA_UPLOAD_STAGING_DIR until registration claims them; it must be shared by all web servers.
+MEDIA_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+MEDIA_UPLOAD_TICKET_SECONDS = 3600
+MEDIA_UPLOAD_STAGING_DIR = BASE_DIR / 'upload_staging'
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'user.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Allow any for development
     ],
-}
\ No newline at end of file
+    # Upload tickets are issued before registration, so anonymously; each one can stage
+    # up to MEDIA_UPLOAD_MAX_BYTES on disk. Counted per client IP (or user) in the
+    # default cache, which is per-process unless pointed at a shared backend.
+    'DEFAULT_THROTTLE_RATES': {
+        'uploads': '20/hour',
+    },
+}
+
+# Token authentication (user/authentication.py). Resolved tokens are cached in
+# AUTH_TOKEN_CACHE_ALIAS for AUTH_TOKEN_CACHE_TTL seconds; tokens older than
+# AUTH_TOKEN_EXPIRY_SECONDS are rejected and replaced at the next login (None: never expire).
+# Logout and deactivation drop entries from that alias, so it must be shared by every
+# web process; the user.E001 check refuses a per-process one when DEBUG is off.
+AUTH_TOKEN_CACHE_ALIAS = 'tokens'
+AUTH_TOKEN_CACHE_TTL = 300
+AUTH_TOKEN_EXPIRY_SECONDS = 30 * 86400
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# 'user.queries' gets per-request query counts from QueryCountDebugMiddleware (DEBUG only).
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'user.queries': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Warn when one SQL statement runs at least this many times in a single request
+QUERY_REPEAT_WARN_THRESHOLD = 5
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The 'matches' alias holds versioned match lists and the versions they are keyed on
+# (see user/match_cache.py). run_matching_worker bumps those versions after rewriting
+# scores, so the alias must be shared by the worker and every web process: the file
+# backend covers processes on one host; across hosts use Redis, e.g.
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1'
+# 'tokens' holds resolved auth tokens (user/authentication.py) and must be shared the same way.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'matches': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'match_cache',
+        'TIMEOUT': 600,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'token_cache',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Matching
+# Cache alias used by user/match_cache.py
+MATCH_CACHE_ALIAS = 'matches'
+
+# Maximum number of skill-less open projects scored for a student in addition
+# to the projects found through the inverted skill index.
+MATCH_FALLBACK_LIMIT = 200
+
+# Stored MatchScore rows kept per student (user/match_store.py): the deck pages through
+# these, with headroom for projects swiped RIGHT (kept for the assignment solver) and
+# for swipes since the student's last refresh. The table holds at most
+# students * MATCH_STORE_DEPTH rows, e.g. 400,000 for 2000 students.
+MATCH_STORE_DEPTH = 200
+
+# Maximum number of swipe events accepted by one batch upload
+SWIPE_BATCH_MAX = 500
+
+# Maximum number of projects accepted by one bulk create (POST a JSON list of projects)
+PROJECT_BATCH_MAX = 500
+
+# Rows fetched and serialized per chunk by the ?stream= list responses (user/streaming.py)
+STREAM_CHUNK_SIZE = 500
+
+# Largest ?limit= page of the project browse endpoint (user/search.py)
+BROWSE_MAX_LIMIT = 100
+
+# TF-IDF text similarity index (user/text_index.py), one .npz pair per side
+TEXT_INDEX_DIR = BASE_DIR / 'text_index'
+
+# Rows appended by saves before the delta segment is folded into the main matrix
+TEXT_INDEX_DELTA_ROWS = 1000
+
+# Approximate nearest neighbour index over open projects (user/ann_index.py).
+# get_student_matches switches to it once it covers MATCH_ANN_MIN_PROJECTS projects,
+# reranking MATCH_ANN_CANDIDATES candidates taken from the MATCH_ANN_PROBES nearest clusters.
+ANN_INDEX_DIR = BASE_DIR / 'ann_index'
+MATCH_ANN_MIN_PROJECTS = 20000
+MATCH_ANN_CANDIDATES = 300
+MATCH_ANN_PROBES = 8
+
+# Capacity-aware assignment (user/assignment.py). The stored match lists order by
+# score - MATCH_CONGESTION_WEIGHT * congestion price + MATCH_ASSIGNMENT_BONUS
+# for the pair the solver picked.
+MATCH_CONGESTION_WEIGHT = 0.5
+MATCH_ASSIGNMENT_BONUS = 0.1
+
+# Background job queue (user/jobs.py), drained by `manage.py run_matching_worker`.
+# Failed jobs are retried JOB_MAX_ATTEMPTS times, JOB_RETRY_DELAY * attempts seconds apart;
+# jobs running longer than JOB_LEASE_SECONDS are assumed orphaned and requeued.
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 30
+JOB_LEASE_SECONDS = 3600
+JOB_RETENTION_SECONDS = 86400
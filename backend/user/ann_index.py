@@ -0,0 +1,237 @@
+"""
+Approximate nearest neighbour index over open projects (IVF).
+
+Each project is embedded as a dense vector: its skill ids and its TF-IDF text
+features (text_index.py) are mapped through a fixed random sign projection into
+ANN_DIMENSIONS dimensions, so inner products approximate a weighted mix of skill
+coverage and text similarity (see embed). Vectors are clustered with spherical
+k-means; a query
+scans only the `probes` closest clusters and returns a few hundred candidates for
+the exact scoring of the stored match refreshes (match_store.py) and of
+matching.get_student_matches.
+
+The index lives in settings.ANN_INDEX_DIR as plain .npy files opened with
+mmap_mode='r', so worker processes share the OS page cache instead of each holding
+a copy. Every build writes a new version directory and then swaps the CURRENT
+pointer, so readers never see a half-written index. Rebuild with
+`manage.py rebuild_ann_index`; projects created after the last build are added to
+the candidates straight from the database.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from .text_index import FEATURES, PROJECTS, features, load as load_text, student_text, weigh
+
+
+ANN_DIMENSIONS = 128
+# Weight of skill coverage against text similarity in the retrieval inner product
+SKILL_WEIGHT = 0.5
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _signs(cols: np.ndarray) -> np.ndarray:
+    """Random +-1/sqrt(d) projection rows for sparse feature ids, derived from the ids by hashing"""
+    mask = np.uint64(0xFFFFFFFF)
+    h = (cols.astype(np.uint64)[:, None] * np.uint64(0x9E3779B1)
+         + np.arange(ANN_DIMENSIONS, dtype=np.uint64)[None, :] * np.uint64(0x85EBCA77)) & mask
+    h ^= h >> np.uint64(15)
+    h = (h * np.uint64(0x2C1B3C6D)) & mask
+    h ^= h >> np.uint64(12)
+    signs = np.where(h & np.uint64(1), 1.0, -1.0).astype(np.float32)
+    return signs / np.float32(np.sqrt(ANN_DIMENSIONS))
+
+
+def _project(cols: np.ndarray, vals: np.ndarray) -> np.ndarray:
+    """Random projection of one sparse vector (preserves inner products in expectation)"""
+    if not len(cols):
+        return np.zeros(ANN_DIMENSIONS, dtype=np.float32)
+    return vals.astype(np.float32) @ _signs(cols)
+
+
+def embed(text_vector, skill_ids: Sequence[int], query: bool = False) -> np.ndarray:
+    """
+    Dense embedding of a TF-IDF text vector and a set of skill ids. A project's skills
+    weigh 1/len(skills) each and a student's (`query`) weigh 1, so the inner product of
+    a student with a project approximates
+    SKILL_WEIGHT * skill coverage + (1 - SKILL_WEIGHT) * text cosine similarity.
+    """
+    text_cols, text_vals = text_vector
+    skill_ids = sorted(set(skill_ids or []))
+    if query:
+        # Skill id 0 is never used: it stands for "no required skills", which every student fully covers
+        skill_ids = [0] + skill_ids
+    elif not skill_ids:
+        skill_ids = [0]
+    skill_cols = FEATURES + np.asarray(skill_ids, dtype=np.int64)
+    skill_vals = np.full(len(skill_cols), 1.0 if query else 1.0 / len(skill_cols), dtype=np.float32)
+    return (np.float32(np.sqrt(SKILL_WEIGHT)) * _project(skill_cols, skill_vals)
+            + np.float32(np.sqrt(1 - SKILL_WEIGHT)) * _project(text_cols, text_vals))
+
+
+def spherical_kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids for `clusters` groups of vectors, assigned by inner product"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_clusters(vectors, centroids)
+        order = np.argsort(assign, kind='stable')
+        present, starts = np.unique(assign[order], return_index=True)
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Clusters that lost all their members keep their previous centroid
+        nonzero = norms[:, 0] > 0
+        centroids[present[nonzero]] = sums[nonzero] / norms[nonzero]
+    return centroids
+
+
+def assign_clusters(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), batch_size)
+    ] or [np.empty(0, dtype=np.int64)])
+
+
+class AnnIndex:
+    """A loaded (memory-mapped) IVF index"""
+
+    def __init__(self, directory: str):
+        def open_array(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+        self.centroids = np.asarray(open_array('centroids'))
+        self.offsets = np.asarray(open_array('offsets'))
+        self.ids = open_array('ids')
+        self.vectors = open_array('vectors')
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.built_at = datetime.fromisoformat(meta['built_at'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query: np.ndarray, k: int, probes: Optional[int] = None) -> np.ndarray:
+        """Ids of (approximately) the k projects with the largest inner product with `query`"""
+        if not len(self) or k <= 0:
+            return np.empty(0, dtype=np.int64)
+        probes = min(probes or getattr(settings, 'MATCH_ANN_PROBES', 8), len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), probes - 1)[:probes]
+        # Clusters are stored contiguously, so each probe reads one slice of the mapped file
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in nearest])
+        if len(rows) > k:
+            scores = np.asarray(self.vectors[rows]) @ query
+            rows = rows[np.argpartition(-scores, k - 1)[:k]]
+        return np.asarray(self.ids[rows], dtype=np.int64)
+
+
+def index_dir() -> str:
+    return str(getattr(settings, 'ANN_INDEX_DIR', os.path.join(settings.BASE_DIR, 'ann_index')))
+
+
+def load() -> Optional[AnnIndex]:
+    """The current index, or None if none has been built"""
+    directory = index_dir()
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        cached = _cache.get(directory)
+        if cached and cached[0] == version:
+            return cached[1]
+    index = AnnIndex(os.path.join(directory, version))
+    with _lock:
+        _cache[directory] = (version, index)
+    return index
+
+
+def active_index() -> Optional[AnnIndex]:
+    """The index, if the catalog is large enough for approximate retrieval to pay off"""
+    index = load()
+    if index is None or len(index) < getattr(settings, 'MATCH_ANN_MIN_PROJECTS', 20000):
+        return None
+    return index
+
+
+def student_query(student) -> np.ndarray:
+    """Embedding of a student's skills and text, in the same space as the projects"""
+    return embed(load_text(PROJECTS).vectorize(student_text(student)), student.skill_ids, query=True)
+
+
+def build(projects: Iterable, clusters: Optional[int] = None, seed: int = 0) -> int:
+    """
+    Build and publish a new index from (id, text, skill_ids) rows; returns the row count.
+    Text uses the current IDF of the project text index.
+    """
+    idf = load_text(PROJECTS).idf
+    ids = []
+    vectors = []
+    for obj_id, text, skill_ids in projects:
+        ids.append(obj_id)
+        vectors.append(embed(weigh(*features(text), idf), skill_ids))
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), ANN_DIMENSIONS)
+
+    clusters = min(clusters or max(1, int(np.sqrt(len(ids)))), max(len(ids), 1))
+    if len(ids):
+        centroids = spherical_kmeans(vectors, clusters, seed=seed)
+        assign = assign_clusters(vectors, centroids)
+    else:
+        centroids = np.zeros((1, ANN_DIMENSIONS), dtype=np.float32)
+        assign = np.empty(0, dtype=np.int64)
+    order = np.argsort(assign, kind='stable')
+    offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assign, minlength=len(centroids)), out=offsets[1:])
+
+    directory = index_dir()
+    os.makedirs(directory, exist_ok=True)
+    version = tempfile.mkdtemp(prefix=f'{time.time_ns()}-', dir=directory)
+    np.save(os.path.join(version, 'centroids.npy'), centroids.astype(np.float32))
+    np.save(os.path.join(version, 'offsets.npy'), offsets)
+    np.save(os.path.join(version, 'ids.npy'), ids[order])
+    np.save(os.path.join(version, 'vectors.npy'), vectors[order])
+    with open(os.path.join(version, 'meta.json'), 'w') as f:
+        json.dump({'built_at': datetime.now(timezone.utc).isoformat(), 'count': len(ids),
+                   'clusters': len(centroids), 'dimensions': ANN_DIMENSIONS}, f)
+
+    pointer = os.path.join(directory, 'CURRENT.tmp')
+    with open(pointer, 'w') as f:
+        f.write(os.path.basename(version))
+    os.replace(pointer, os.path.join(directory, 'CURRENT'))
+
+    # Keep the previous version for readers that resolved CURRENT just before the swap
+    versions = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+    for name in versions[:-2]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return len(ids)
+
+
+def rebuild_ann_index(clusters: Optional[int] = None) -> int:
+    """Rebuild the index over every open project"""
+    from .models import ProfessorProject
+
+    rows = ProfessorProject.objects.filter(is_open=True).values_list('id', 'title', 'description', 'skill_ids')
+    return build(
+        ((row[0], ' '.join(filter(None, row[1:3])), row[3]) for row in rows.iterator(chunk_size=2000)),
+        clusters=clusters,
+    )
+
+
+def recall_at_k(approximate: Sequence[List[int]], exact: Sequence[List[int]], k: int) -> float:
+    """
+    Mean fraction of each approximate top-k list that belongs to the exact top k.
+    `exact` lists may run past k with ids tied on the k-th score; any of those counts.
+    """
+    ratios = [len(set(a) & set(e)) / min(k, len(e)) for a, e in zip(approximate, exact) if e]
+    return float(np.mean(ratios)) if ratios else 1.0
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from .authentication import check_token_cache
+        checks.register(check_token_cache, checks.Tags.caches)
@@ -0,0 +1,176 @@
+"""
+Capacity-constrained assignment of students to projects.
+
+Solves max-weight b-matching on the sparse MatchScore graph: each student gets at
+most one project, each open project at most `capacity` students, maximizing the
+total match score. Uses the auction algorithm (Bertsekas): unassigned students
+bid for their best project at current prices, a full project evicts its lowest
+bidder, and a project's price is the lowest bid it holds once full. The final
+prices measure congestion: how much score a student gives up to get into a
+project everybody wants.
+
+Results are stored in Assignment and ProjectCongestion and blended into
+MatchScore.rank_score, which the stored match endpoints order by, so popular
+projects stop being recommended to everyone. Run with `manage.py solve_assignments`.
+"""
+import heapq
+from collections import deque
+from itertools import chain
+from typing import Dict, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Assignment, MatchScore, ProfessorProject, ProjectCongestion, Swipe
+
+
+# Minimum bid increment; the total score ends within len(students) * EPSILON of the optimum
+EPSILON = 1e-4
+
+
+def auction(
+    indptr: np.ndarray,
+    projects: np.ndarray,
+    scores: np.ndarray,
+    capacity: np.ndarray,
+    eps: float = EPSILON,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Auction over a CSR score graph: row i lists student i's candidate projects
+    (`projects[indptr[i]:indptr[i+1]]`) and scores. Staying unassigned is worth 0.
+    Returns (project index per student or -1, price per project).
+    """
+    students = len(indptr) - 1
+    # A project without capacity is priced out of reach
+    closed = capacity <= 0
+    prices = np.where(closed, np.inf, 0.0)
+    assigned = np.full(students, -1, dtype=np.int64)
+    holders = [[] for _ in range(len(capacity))]  # min-heaps of (bid, student)
+
+    queue = deque(i for i in range(students) if indptr[i + 1] > indptr[i])
+    while queue:
+        i = queue.popleft()
+        lo, hi = indptr[i], indptr[i + 1]
+        candidates = projects[lo:hi]
+        values = scores[lo:hi] - prices[candidates]
+        best = int(np.argmax(values))
+        best_value = float(values[best])
+        if best_value <= 0:
+            continue  # every project costs more than it is worth: stay unassigned
+        values[best] = -np.inf
+        second = max(float(values.max()), 0.0) if hi - lo > 1 else 0.0
+
+        j = candidates[best]
+        heap = holders[j]
+        heapq.heappush(heap, (prices[j] + best_value - second + eps, i))
+        assigned[i] = j
+        if len(heap) > capacity[j]:
+            _, evicted = heapq.heappop(heap)
+            assigned[evicted] = -1
+            queue.append(evicted)
+        if len(heap) >= capacity[j]:
+            prices[j] = heap[0][0]
+    prices[closed] = 0.0
+    return assigned, prices
+
+
+def load_graph():
+    """
+    Candidate edges from MatchScore for open projects with capacity, minus projects
+    a student passed on, as (student ids, project ids, CSR arrays, capacities)
+    """
+    passed = Swipe.objects.filter(
+        student_id=OuterRef('student_id'), project_id=OuterRef('project_id'), direction=Swipe.Direction.LEFT,
+    )
+    rows = np.fromiter(
+        chain.from_iterable(
+            MatchScore.objects.filter(project__is_open=True, project__capacity__gt=0)
+            .filter(~Exists(passed))
+            .values_list('student_id', 'project_id', 'score')
+            .order_by('student_id')
+            .iterator(chunk_size=10000)
+        ),
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+    student_ids, student_index = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+    project_ids, project_index = np.unique(rows[:, 1].astype(np.int64), return_inverse=True)
+    indptr = np.zeros(len(student_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(student_index, minlength=len(student_ids)), out=indptr[1:])
+
+    capacity_by_id = dict(ProfessorProject.objects.filter(id__in=project_ids.tolist()).values_list('id', 'capacity'))
+    capacity = np.array([capacity_by_id.get(int(p), 0) for p in project_ids], dtype=np.int64)
+    return student_ids, project_ids, indptr, project_index, rows[:, 2], capacity
+
+
+def solve_assignments() -> Dict:
+    """Solve the assignment over the stored scores, store it and re-rank MatchScore; returns a summary"""
+    student_ids, project_ids, indptr, projects, scores, capacity = load_graph()
+    assigned, prices = auction(indptr, projects, scores, capacity)
+
+    matched = np.flatnonzero(assigned >= 0)
+    pair_scores = {}
+    for i in matched:
+        lo, hi = indptr[i], indptr[i + 1]
+        pair_scores[i] = float(scores[lo + int(np.flatnonzero(projects[lo:hi] == assigned[i])[0])])
+    counts = np.bincount(assigned[matched], minlength=len(project_ids))
+
+    with transaction.atomic():
+        Assignment.objects.all().delete()
+        Assignment.objects.bulk_create([
+            Assignment(student_id=int(student_ids[i]), project_id=int(project_ids[assigned[i]]), score=pair_scores[i])
+            for i in matched
+        ], batch_size=2000)
+        ProjectCongestion.objects.all().delete()
+        ProjectCongestion.objects.bulk_create([
+            ProjectCongestion(project_id=int(project_ids[j]), price=float(prices[j]), assigned=int(counts[j]))
+            for j in range(len(project_ids))
+        ], batch_size=2000)
+        update_rank_scores()
+
+    return {
+        'students': len(student_ids),
+        'projects': len(project_ids),
+        'edges': len(scores),
+        'assigned': len(matched),
+        'total_score': round(sum(pair_scores.values()), 4),
+        'congested_projects': int((prices > 0).sum()),
+    }
+
+
+def rank_scores(scores: np.ndarray, project_ids: np.ndarray, prices: Dict[int, float],
+                assigned: np.ndarray) -> np.ndarray:
+    """
+    Blend match scores with each project's congestion price and the solver's choice
+    (`assigned` marks the pairs it picked); same formula as update_rank_scores()
+    """
+    weight = getattr(settings, 'MATCH_CONGESTION_WEIGHT', 0.5)
+    bonus = getattr(settings, 'MATCH_ASSIGNMENT_BONUS', 0.1)
+    price = np.fromiter((prices.get(int(p), 0.0) for p in project_ids), dtype=np.float64, count=len(project_ids))
+    return scores - weight * price + np.where(assigned, bonus, 0.0)
+
+
+def update_rank_scores():
+    """Recompute MatchScore.rank_score for every row in one UPDATE"""
+    weight = getattr(settings, 'MATCH_CONGESTION_WEIGHT', 0.5)
+    bonus = getattr(settings, 'MATCH_ASSIGNMENT_BONUS', 0.1)
+    price = ProjectCongestion.objects.filter(project_id=OuterRef('project_id')).values('price')[:1]
+    chosen = Assignment.objects.filter(student_id=OuterRef('student_id'), project_id=OuterRef('project_id'))
+    MatchScore.objects.update(rank_score=(
+        F('score')
+        - Value(weight) * Coalesce(Subquery(price, output_field=FloatField()), Value(0.0))
+        + Case(When(Exists(chosen), then=Value(bonus)), default=Value(0.0), output_field=FloatField())
+    ))
+
+
+def congestion_prices(**filters) -> Dict[int, float]:
+    """Positive congestion prices by project id"""
+    return dict(ProjectCongestion.objects.filter(price__gt=0, **filters).values_list('project_id', 'price'))
+
+
+def assigned_projects(**filters) -> Dict[int, int]:
+    """Assigned project id by student id"""
+    return dict(Assignment.objects.filter(**filters).values_list('student_id', 'project_id'))
@@ -0,0 +1,50 @@
+"""
+Async DRF views.
+
+DRF's APIView.dispatch is synchronous, so `async def` handlers on it return an
+unawaited coroutine. AsyncAPIView keeps APIView's request parsing, authentication,
+permissions, exception handling and content negotiation, and awaits the handler.
+
+Authentication and permission checks can hit the database (token and session
+lookups), so they run through sync_to_async. Under ASGI every request gets its own
+thread for that; under WSGI the whole view runs in one event loop per request.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView whose HTTP method handlers are coroutines"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            # OPTIONS is APIView's synchronous metadata handler
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def run_in_thread(fn, *args, **kwargs):
+    """
+    Run CPU-bound work that does not touch the database (serialization, payload
+    building) on the default thread pool so the event loop keeps serving requests
+    """
+    return await sync_to_async(fn, thread_sensitive=False)(*args, **kwargs)
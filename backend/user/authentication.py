@@ -0,0 +1,174 @@
+"""
+Token authentication served from the cache.
+
+DRF's TokenAuthentication runs a Token -> User query on every request, and the match
+and swipe views then look up the user's profile. CachedTokenAuthentication resolves a
+token once with a single query (user flags plus student and professor profile ids),
+caches that as a TokenInfo for AUTH_TOKEN_CACHE_TTL seconds, and rebuilds the user
+from it without touching the database. Views get the profile from cached_profile().
+
+The returned user and profiles carry only the cached fields; any other field is
+loaded from the database when first read, like a deferred field.
+
+Tokens expire AUTH_TOKEN_EXPIRY_SECONDS after they were issued (None: never); login
+issues a fresh one. Revoking a token deletes it, and deleting a token, saving its
+user or creating or deleting a profile drops the cached entry on commit (receivers
+in models.py). That only reaches every web process if AUTH_TOKEN_CACHE_ALIAS is a
+shared cache; with a per-process one such as locmem the others would keep accepting a
+revoked token for up to AUTH_TOKEN_CACHE_TTL, so check_token_cache() (registered in
+apps.py) refuses one outside DEBUG.
+"""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User, StudentProfile
+
+
+TOKEN_CACHE_PREFIX = 'auth:token:'
+# Columns of User rebuilt from the cache; the rest stay deferred
+USER_FIELDS = ('id', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+@dataclass(frozen=True)
+class TokenInfo:
+    """What a token resolves to; returned as request.auth"""
+    key: str
+    user_id: int
+    role: str
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+    student_profile_id: Optional[int]
+    professor_profile_id: Optional[int]
+    created: float  # When the token was issued (epoch seconds)
+
+    def user(self) -> User:
+        values = {'id': self.user_id, 'role': self.role, 'is_active': self.is_active,
+                  'is_staff': self.is_staff, 'is_superuser': self.is_superuser}
+        # from_db() takes the loaded values in concrete field order
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+        return User.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+def token_cache():
+    return caches[getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', 'default')]
+
+
+# Backends whose entries live in one process
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_token_cache(app_configs=None, **kwargs):
+    """System check: outside DEBUG, revoking a token must reach every web process"""
+    alias = getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if settings.DEBUG or backend not in PER_PROCESS_CACHES:
+        return []
+    return [checks.Error(
+        f"AUTH_TOKEN_CACHE_ALIAS '{alias}' uses the per-process {backend.rsplit('.', 1)[-1]}, so logout "
+        "and deactivation would not reach the other web processes.",
+        hint="Point it at a cache shared by all web processes (file, database, Redis or memcached).",
+        id='user.E001',
+    )]
+
+
+def token_lifetime() -> Optional[float]:
+    return getattr(settings, 'AUTH_TOKEN_EXPIRY_SECONDS', None)
+
+
+def is_expired(created: float) -> bool:
+    lifetime = token_lifetime()
+    return lifetime is not None and time.time() - created >= lifetime
+
+
+def load_token_info(key: str) -> Optional[TokenInfo]:
+    """Resolve a token with one query, or None if there is no such token"""
+    row = User.objects.filter(auth_token__key=key).values_list(
+        *USER_FIELDS, 'studentprofile__id', 'professorprofile__id', 'auth_token__created',
+    ).first()
+    if row is None:
+        return None
+    *flags, student_profile_id, professor_profile_id, created = row
+    user_id, role, is_active, is_staff, is_superuser = flags
+    return TokenInfo(key, user_id, role, is_active, is_staff, is_superuser,
+                     student_profile_id, professor_profile_id, created.timestamp())
+
+
+def forget_token(key: str) -> None:
+    token_cache().delete(TOKEN_CACHE_PREFIX + key)
+
+
+def forget_user_tokens(user_id: int) -> None:
+    """Drop the cached entry of a user's token after their account or profiles changed"""
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        forget_token(key)
+
+
+def issue_token(user) -> Token:
+    """The user's token, replaced by a new one if it has expired"""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and is_expired(token.created.timestamp()):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def revoke_token(key: str) -> bool:
+    """Delete a token so it no longer authenticates; returns False if it did not exist"""
+    deleted, _ = Token.objects.filter(key=key).delete()
+    forget_token(key)  # Also done on commit by the post_delete receiver
+    return bool(deleted)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    `Authorization: Token <key>` authentication resolved from the cache; request.auth is
+    the TokenInfo rather than the Token row
+    """
+
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        info = cache.get(TOKEN_CACHE_PREFIX + key)
+        if info is None:
+            info = load_token_info(key)
+            if info is None:
+                raise exceptions.AuthenticationFailed("Invalid token.")
+            ttl = getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300)
+            if token_lifetime() is not None:
+                ttl = min(ttl, max(info.created + token_lifetime() - time.time(), 1))
+            cache.set(TOKEN_CACHE_PREFIX + key, info, ttl)
+
+        if is_expired(info.created):
+            revoke_token(key)
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        if not info.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return info.user(), info
+
+
+def cached_profile(request, model):
+    """
+    The authenticated user's StudentProfile or ProfessorProfile (`model`) as resolved by
+    CachedTokenAuthentication, without a query; only id and user_id are loaded. Raises
+    model.DoesNotExist if the user has none, and returns None for requests authenticated
+    some other way (sessions, tests), which must look the profile up themselves.
+    """
+    info = request.auth
+    if not isinstance(info, TokenInfo):
+        return None
+    profile_id = info.student_profile_id if model is StudentProfile else info.professor_profile_id
+    if profile_id is None:
+        raise model.DoesNotExist(f"{info.user_id} has no {model._meta.verbose_name}")
+    return model.from_db(DEFAULT_DB_ALIAS, ['id', 'user_id'], [profile_id, info.user_id])
@@ -0,0 +1,171 @@
+"""
+Benchmark harness for matching and the list endpoints.
+
+Each target is a zero-argument callable run `samples` times. Latency comes from
+untraced runs; query counts are captured per run; peak Python memory comes from one
+extra run under tracemalloc so tracing overhead does not skew the timings.
+
+wsgi_load() and asgi_load() drive the project's WSGI and ASGI applications in-process
+with concurrent clients (threads for WSGI, as a threaded server would; tasks on one
+event loop for ASGI) to compare their throughput without a server in the way.
+"""
+import asyncio
+import json
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def measure(fn: Callable[[], object], samples: int, setup: Callable[[], None] = None) -> Dict:
+    """Run `fn` `samples` times (after optional per-run `setup`) and summarize the runs"""
+    timings = []
+    queries = []
+    for _ in range(samples):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'samples': samples,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(float(np.mean(timings)), 3) if timings else 0.0,
+        'max_ms': round(max(timings), 3) if timings else 0.0,
+        'queries_mean': round(float(np.mean(queries)), 2) if queries else 0.0,
+        'queries_max': max(queries) if queries else 0,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def summarize_load(timings: List[float], statuses: List[int], elapsed: float, clients: int) -> Dict:
+    return {
+        'clients': clients,
+        'requests': len(timings),
+        'errors': sum(status != 200 for status in statuses),
+        'throughput_rps': round(len(timings) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'max_ms': round(max(timings), 3) if timings else 0.0,
+    }
+
+
+def split_url(url: str) -> Tuple[str, str]:
+    path, _, query = url.partition('?')
+    return path, query
+
+
+def wsgi_load(application, requests: Sequence[Tuple[str, Dict[str, str]]], clients: int) -> Dict:
+    """GET every (url, headers) pair through the WSGI `application`, `clients` requests at a time"""
+    def request(url, headers):
+        path, query = split_url(url)
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(), 'wsgi.url_scheme': 'http',
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        environ.update({'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()})
+        status = []
+        started = time.perf_counter()
+        body = application(environ, lambda code, response_headers, exc_info=None: status.append(code))
+        try:
+            for _ in body:
+                pass
+        finally:
+            getattr(body, 'close', lambda: None)()
+        return (time.perf_counter() - started) * 1000, int(status[0].split()[0])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(lambda pair: request(*pair), requests))
+    elapsed = time.perf_counter() - started
+    return summarize_load([ms for ms, _ in results], [code for _, code in results], elapsed, clients)
+
+
+def asgi_load(application, requests: Sequence[Tuple[str, Dict[str, str]]], clients: int) -> Dict:
+    """GET every (url, headers) pair through the ASGI `application`, `clients` requests in flight at a time"""
+    async def request(url, headers):
+        path, query = split_url(url)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+            'headers': [(b'host', b'testserver')] + [
+                (name.lower().encode(), value.encode()) for name, value in headers.items()
+            ],
+        }
+        messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+        status = []
+
+        async def receive():
+            try:
+                return next(messages)
+            except StopIteration:
+                # Django listens for a disconnect while the view runs; the client never sends one
+                await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        return (time.perf_counter() - started) * 1000, status[0]
+
+    async def run():
+        semaphore = asyncio.Semaphore(clients)
+
+        async def limited(url, headers):
+            async with semaphore:
+                return await request(url, headers)
+        return await asyncio.gather(*(limited(url, headers) for url, headers in requests))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    return summarize_load([ms for ms, _ in results], [code for _, code in results], elapsed, clients)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_report(path: str, results: Dict, meta: Dict) -> Dict:
+    report = {
+        'meta': dict(meta, git_commit=git_commit(), timestamp=datetime.now(timezone.utc).isoformat(),
+                     database=connection.vendor),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return report
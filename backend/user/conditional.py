@@ -0,0 +1,93 @@
+"""
+HTTP conditional requests (ETag / Last-Modified) for the catalog and match endpoints.
+
+Validators are computed before any row is loaded or serialized, so a client
+revalidating an unchanged list gets a 304 for the cost of one aggregate query
+(catalog lists) or a couple of cache reads (match lists):
+
+- Catalog lists hash the request path with MAX(updated_at) and COUNT(*) of the
+  projects and professor profiles; the count catches deletes. Last-Modified is the
+  newest updated_at, which cannot reflect deletes, so clients should prefer the ETag.
+  QuerySet.update() skips auto_now, so code changing these rows in bulk must set
+  updated_at itself.
+- Match lists hash the request path with the versions the match cache is keyed on
+  (match_cache.py), which are bumped whenever stored scores, swipes or the catalog change.
+  Stored scores are rewritten by run_matching_worker, which bumps them from its own
+  process; the ETags are only correct while CACHES['matches'] is shared by the worker
+  and the web processes, as the default file backend is on one host.
+"""
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .match_cache import catalog_version, student_pool_version, student_version
+from .models import ProfessorProfile, ProfessorProject
+
+
+Validators = Tuple[str, Optional[datetime]]
+
+
+def make_etag(request, parts: Iterable) -> str:
+    """Strong ETag over the full request path and the state `parts` it was rendered from"""
+    digest = hashlib.sha1(request.get_full_path().encode())
+    for part in parts:
+        digest.update(b'\0' + str(part).encode())
+    return quote_etag(digest.hexdigest())
+
+
+def _newest(*values: Optional[datetime]) -> Optional[datetime]:
+    return max((value for value in values if value is not None), default=None)
+
+
+def project_list_validators(request) -> Validators:
+    """Validators for project lists, whose rows embed their professor's profile fields"""
+    state = ProfessorProject.objects.aggregate(
+        project_count=Count('id'), last=Max('updated_at'), profile_last=Max('profile__updated_at'),
+    )
+    return (
+        make_etag(request, (state['project_count'], state['last'], state['profile_last'])),
+        _newest(state['last'], state['profile_last']),
+    )
+
+
+def profile_list_validators(request) -> Validators:
+    """Validators for professor profile lists, which embed their project ids"""
+    state = ProfessorProfile.objects.aggregate(
+        profile_count=Count('id', distinct=True), last=Max('updated_at'),
+        project_count=Count('projects', distinct=True), project_last=Max('projects__updated_at'),
+    )
+    return (
+        make_etag(request, (state['profile_count'], state['last'], state['project_count'], state['project_last'])),
+        _newest(state['last'], state['project_last']),
+    )
+
+
+def student_match_validators(request) -> Validators:
+    user_id = request.user.id
+    return make_etag(request, (user_id, catalog_version(), student_version(user_id))), None
+
+
+def project_match_validators(request) -> Validators:
+    return make_etag(request, (catalog_version(), student_pool_version())), None
+
+
+def not_modified(request, validators: Validators):
+    """The 304 (or 412) response for a request whose preconditions fail, else None"""
+    etag, last_modified = validators
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def with_validators(response, validators: Validators):
+    """Attach the ETag and Last-Modified headers to a successful response"""
+    etag, last_modified = validators
+    if 200 <= response.status_code < 300:
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+    return response
@@ -0,0 +1,170 @@
+"""
+Process-local feature store for the matchers: the score refresh jobs that fill
+MatchScore (match_store.py) and the live get_student_matches / get_project_matches.
+
+Scoring reads about eight columns per row, so instead of building a model instance
+per candidate on every refresh or request the store loads those columns once with
+values_list() into __slots__ records, plus an in-memory inverted skill index. It
+holds the candidate rules: a student is scored against the open projects sharing a
+skill plus the newest MATCH_FALLBACK_LIMIT skill-less ones, a project against the
+students sharing a required skill (everyone when it requires none).
+
+Each side is stamped with the cache version it was loaded under (catalog version
+for open projects, student pool version for students; see match_cache.py) and is
+reloaded in full the next time it is read after that version moves. Readers that
+write stored scores pass checked=True, which also compares the row count and newest
+updated_at of the table, so a worker never scores against a table a missed or
+delayed version bump left stale.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .match_cache import catalog_version, student_pool_version
+from .models import StudentProfile, ProfessorProject
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectFeatures:
+    id: int
+    skill_ids: Tuple[int, ...]
+    start_date: Optional[date]
+    end_date: Optional[date]
+    hrs_per_week: Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class StudentFeatures:
+    id: int
+    user_id: int
+    skill_ids: Tuple[int, ...]
+    avail_start: Optional[date]
+    avail_end: Optional[date]
+    hrs_per_week: Optional[int]
+    gpa: Optional[float]
+    reliability: Optional[float]
+
+
+class FeatureTable:
+    """Records by id plus an inverted skill index over them"""
+
+    def __init__(self, records: Iterable, version: int):
+        self.version = version
+        self.stamp = None  # (row count, newest updated_at) when loaded by a checked read
+        self.records: Dict[int, object] = {}
+        self.by_skill: Dict[int, List[int]] = {}
+        self.skill_less: List[int] = []
+        for record in records:
+            self.records[record.id] = record
+            if not record.skill_ids:
+                self.skill_less.append(record.id)
+            for skill_id in record.skill_ids:
+                self.by_skill.setdefault(skill_id, []).append(record.id)
+
+    def __len__(self):
+        return len(self.records)
+
+    def sharing(self, skill_ids: Iterable[int]) -> set:
+        """Ids of records sharing at least one of `skill_ids`"""
+        ids = set()
+        for skill_id in skill_ids:
+            ids.update(self.by_skill.get(skill_id, ()))
+        return ids
+
+    def fallback(self) -> List[int]:
+        """Ids of the first MATCH_FALLBACK_LIMIT skill-less records (the newest, for projects)"""
+        return self.skill_less[:getattr(settings, 'MATCH_FALLBACK_LIMIT', 200)]
+
+    def get_many(self, ids: Iterable[int]) -> List:
+        """Records for `ids` in ascending id order, skipping ids not in the table"""
+        return [self.records[i] for i in sorted(ids) if i in self.records]
+
+
+def _decimal(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def load_projects(version: int) -> FeatureTable:
+    """Open projects, newest first so skill_less starts with the fallback projects"""
+    rows = ProfessorProject.objects.filter(is_open=True).order_by('-created_at').values_list(
+        'id', 'skill_ids', 'start_date', 'end_date', 'hrs_per_week',
+    )
+    return FeatureTable(
+        (ProjectFeatures(pk, tuple(skill_ids or ()), start, end, hrs) for pk, skill_ids, start, end, hrs in rows),
+        version,
+    )
+
+
+def load_students(version: int) -> FeatureTable:
+    rows = StudentProfile.objects.order_by('id').values_list(
+        'id', 'user_id', 'skill_ids', 'avail_start', 'avail_end', 'hrs_per_week', 'gpa', 'reliability',
+    )
+    return FeatureTable(
+        (StudentFeatures(pk, user_id, tuple(skill_ids or ()), start, end, hrs, _decimal(gpa), _decimal(reliability))
+         for pk, user_id, skill_ids, start, end, hrs, gpa, reliability in rows),
+        version,
+    )
+
+
+def _table_stamp(model) -> Tuple:
+    state = model.objects.aggregate(rows=Count('id'), last=Max('updated_at'))
+    return state['rows'], state['last']
+
+
+class FeatureStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._projects: Optional[FeatureTable] = None
+        self._students: Optional[FeatureTable] = None
+
+    def _current(self, attr: str, version: int, loader, model=None) -> FeatureTable:
+        # Stamped before loading, so rows changed meanwhile only cause one more reload
+        stamp = _table_stamp(model) if model is not None else None
+
+        def valid(table):
+            return table is not None and table.version == version and (stamp is None or table.stamp == stamp)
+
+        table = getattr(self, attr)
+        if valid(table):
+            return table
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            table = getattr(self, attr)
+            if not valid(table):
+                table = loader(version)
+                table.stamp = stamp
+                setattr(self, attr, table)
+            return table
+
+    def projects(self, checked: bool = False) -> FeatureTable:
+        return self._current('_projects', catalog_version(), load_projects, ProfessorProject if checked else None)
+
+    def students(self, checked: bool = False) -> FeatureTable:
+        return self._current('_students', student_pool_version(), load_students, StudentProfile if checked else None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._projects = self._students = None
+
+    def candidate_projects(self, skill_ids: Iterable[int], exclude: Iterable[int] = ()) -> List[ProjectFeatures]:
+        """
+        Open projects sharing a skill, plus the newest MATCH_FALLBACK_LIMIT skill-less
+        ones, minus the `exclude` ids (projects already swiped on)
+        """
+        table = self.projects()
+        ids = table.sharing(skill_ids)
+        ids.update(table.fallback())
+        return table.get_many(ids.difference(exclude))
+
+    def candidate_students(self, skill_ids: Iterable[int]) -> List[StudentFeatures]:
+        """Students sharing a required skill; everyone when there are none"""
+        table = self.students()
+        skill_ids = list(skill_ids)
+        return table.get_many(table.sharing(skill_ids) if skill_ids else table.records)
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,204 @@
+"""
+Database-backed job queue for work too heavy to run inside a request: match score
+refreshes, index rebuilds, the assignment solver and image thumbnails.
+
+enqueue() inserts a Job row in the caller's transaction, so workers only see a job
+once the save that caused it commits, and never see it if that save rolls back. At
+most one job per (kind, object_id) is pending, so a burst of saves to one profile
+coalesces into a single refresh.
+
+Workers (`manage.py run_matching_worker`) claim due jobs in batches with
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it. SQLite has no row
+locks; there the claiming UPDATE only takes rows that are still pending and tags them
+with a per-claim token, and SQLite's single writer serializes competing claims.
+Failed jobs are retried with backoff up to JOB_MAX_ATTEMPTS; jobs left RUNNING for
+longer than JOB_LEASE_SECONDS (their worker died) are put back in the queue.
+"""
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ann_index import rebuild_ann_index
+from .assignment import solve_assignments
+from .match_cache import bump_catalog_version, bump_student_pool_version, bump_student_version
+from .match_store import rebuild_all_scores, refresh_project_scores, refresh_student_scores
+from .media import refresh_profile_thumbnails
+from .models import Job, StudentProfile, ProfessorProfile, ProfessorProject
+from .text_index import index_project, index_projects, index_student, rebuild_text_index
+
+
+logger = logging.getLogger(__name__)
+
+HANDLERS: Dict[str, Callable[[int], None]] = {}
+
+
+def handler(kind: str):
+    """Register the function that runs jobs of `kind`; it receives the job's object_id"""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(kind: str, object_id: int = 0, delay: float = 0) -> None:
+    """Queue a job, unless the same one is already pending"""
+    job = Job(kind=kind, object_id=object_id, run_after=timezone.now() + timedelta(seconds=delay))
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+
+
+def claim(limit: int, worker: str = 'worker') -> List[Job]:
+    """Mark up to `limit` due jobs as running for this worker and return them"""
+    token = f'{worker}:{uuid.uuid4().hex[:12]}'
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status=Job.Status.PENDING, run_after__lte=now).order_by('run_after', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        Job.objects.filter(id__in=ids, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING, locked_by=token, started_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(locked_by=token, status=Job.Status.RUNNING).order_by('id'))
+
+
+def _requeue(job: Job, error: str = '') -> bool:
+    """
+    Put a claimed job back in the queue; returns False (and fails it) when a newer
+    pending copy already covers it
+    """
+    try:
+        with transaction.atomic():
+            return bool(Job.objects.filter(id=job.id).update(
+                status=Job.Status.PENDING, locked_by='', error=error,
+                run_after=timezone.now() + timedelta(seconds=getattr(settings, 'JOB_RETRY_DELAY', 30) * job.attempts),
+            ))
+    except IntegrityError:
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.FAILED, finished_at=timezone.now(), error=error or "Superseded by a newer job",
+        )
+        return False
+
+
+def run_job(job_id: int) -> bool:
+    """Run one claimed job and record the outcome; returns True if it succeeded"""
+    job = Job.objects.get(id=job_id)
+    try:
+        HANDLERS[job.kind](job.object_id)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s failed (attempt %s): %s", job, job.attempts, error.splitlines()[-1])
+        if job.attempts < getattr(settings, 'JOB_MAX_ATTEMPTS', 3):
+            _requeue(job, error)
+        else:
+            Job.objects.filter(id=job.id).update(status=Job.Status.FAILED, finished_at=timezone.now(), error=error)
+        return False
+    Job.objects.filter(id=job.id).update(status=Job.Status.DONE, finished_at=timezone.now(), error='')
+    return True
+
+
+def run_pending(worker: str = 'inline', batch_size: int = 100) -> int:
+    """Run every due job in this process until the queue is empty; returns the number run"""
+    total = 0
+    while True:
+        jobs = claim(batch_size, worker)
+        if not jobs:
+            return total
+        for job in jobs:
+            run_job(job.id)
+        total += len(jobs)
+
+
+def requeue_stale() -> int:
+    """Put back jobs running for longer than the lease; their worker most likely died"""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOB_LEASE_SECONDS', 3600))
+    stale = Job.objects.filter(status=Job.Status.RUNNING, started_at__lt=cutoff)
+    return sum(_requeue(job, "Worker lease expired") for job in stale)
+
+
+def purge_finished() -> int:
+    """Delete finished jobs older than JOB_RETENTION_SECONDS; failed ones are kept for inspection"""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOB_RETENTION_SECONDS', 86400))
+    deleted, _ = Job.objects.filter(status=Job.Status.DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+@handler(Job.Kind.REFRESH_STUDENT)
+def refresh_student(student_id: int):
+    student = StudentProfile.objects.filter(id=student_id).first()
+    if student is None:
+        return  # Deleted since the job was queued
+    index_student(student)
+    refresh_student_scores(student)
+    bump_student_version(student.user_id)
+    # Project match lists include this student's rewritten rows
+    bump_student_pool_version()
+
+
+@handler(Job.Kind.REFRESH_PROJECT)
+def refresh_project(project_id: int):
+    project = ProfessorProject.objects.filter(id=project_id).first()
+    if project is None:
+        return
+    index_project(project)
+    refresh_project_scores(project)
+    bump_catalog_version()
+
+
+@handler(Job.Kind.REFRESH_PROFILE_PROJECTS)
+def refresh_profile_projects(profile_id: int):
+    """Every project of one professor, queued by bulk inserts: one text index write and one cache bump"""
+    projects = list(ProfessorProject.objects.filter(profile_id=profile_id).order_by('id'))
+    if not projects:
+        return
+    index_projects(projects)
+    for project in projects:
+        refresh_project_scores(project)
+    bump_catalog_version()
+
+
+@handler(Job.Kind.REBUILD_MATCH_SCORES)
+def rebuild_scores(_):
+    rebuild_text_index()
+    rebuild_all_scores()
+    bump_catalog_version()
+
+
+@handler(Job.Kind.REBUILD_TEXT_INDEX)
+def rebuild_text(_):
+    rebuild_text_index()
+
+
+@handler(Job.Kind.REBUILD_ANN_INDEX)
+def rebuild_ann(_):
+    rebuild_ann_index()
+
+
+@handler(Job.Kind.SOLVE_ASSIGNMENTS)
+def solve(_):
+    solve_assignments()
+    bump_catalog_version()
+
+
+@handler(Job.Kind.MAKE_THUMBNAILS)
+def make_thumbnails(profile_id: int):
+    """Thumbnails for one professor profile, or for every profile when `profile_id` is 0 (backfill)"""
+    profiles = ProfessorProfile.objects.order_by('id')
+    if profile_id:
+        profiles = profiles.filter(id=profile_id)
+    changed = False
+    for profile in profiles.iterator():
+        if refresh_profile_thumbnails(profile):
+            # update() skips post_save (which would queue this job again) and auto_now
+            ProfessorProfile.objects.filter(id=profile.id).update(
+                thumbnails=profile.thumbnails, updated_at=timezone.now(),
+            )
+            changed = True
+    if changed:
+        bump_catalog_version()
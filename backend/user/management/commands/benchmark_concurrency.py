@@ -0,0 +1,78 @@
+import logging
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.authtoken.models import Token
+
+from main.asgi import application as asgi_application
+from main.wsgi import application as wsgi_application
+from user.benchmark import asgi_load, wsgi_load, write_report
+from user.match_cache import match_cache
+from user.models import StudentProfile, ProfessorProject
+
+
+class Command(BaseCommand):
+    help = "Compare WSGI and ASGI throughput of the match and browse endpoints under concurrent clients"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, action='append', default=None,
+                            help="Concurrent clients; repeat for several levels (default 1, 8 and 32)")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint, mode and level")
+        parser.add_argument('--limit', type=int, default=20, help="Match list size")
+        parser.add_argument('--users', type=int, default=50, help="Distinct students making requests")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='concurrency_results.json', help="JSON report path")
+        parser.add_argument('--warm-cache', action='store_true', help="Keep the match cache between runs")
+
+    def handle(self, *args, **options):
+        logging.getLogger('user.queries').disabled = True
+        rng = random.Random(options['seed'])
+        levels = options['clients'] or [1, 8, 32]
+        count = options['requests']
+        limit = options['limit']
+
+        student_ids = list(StudentProfile.objects.values_list('user_id', flat=True))
+        project_ids = list(ProfessorProject.objects.filter(is_open=True).values_list('id', flat=True))
+        if not student_ids or not project_ids:
+            raise CommandError("Need students and open projects; run generate_match_data first.")
+        # One token per simulated student; requests from different users do not share cache entries
+        tokens = [
+            Token.objects.get_or_create(user_id=user_id)[0].key
+            for user_id in rng.sample(student_ids, min(options['users'], len(student_ids)))
+        ]
+
+        endpoints = {
+            'GET /api/user/student/matches/': lambda: f'/api/user/student/matches/?limit={limit}',
+            'GET /api/user/project/<id>/matches/':
+                lambda: f'/api/user/project/{rng.choice(project_ids)}/matches/?limit={limit}',
+            'GET /api/user/projects/': lambda: '/api/user/projects/',
+        }
+        modes = {'wsgi': (wsgi_load, wsgi_application), 'asgi': (asgi_load, asgi_application)}
+
+        results = {}
+        for name, make_url in endpoints.items():
+            for clients in levels:
+                # Both modes replay the same requests from the same users
+                requests = [(make_url(), {'Authorization': f'Token {rng.choice(tokens)}'}) for _ in range(count)]
+                for mode, (load, application) in modes.items():
+                    if not options['warm_cache']:
+                        match_cache().clear()
+                    # Worker threads open their own connections; start each run from none
+                    connections.close_all()
+                    r = load(application, requests, clients)
+                    results[f'{name} [{mode}, {clients} clients]'] = r
+                    self.stdout.write(
+                        f"{name:<36} {mode} x{clients:<4} {r['throughput_rps']:>8.1f} req/s  "
+                        f"p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  errors {r['errors']}"
+                    )
+
+        write_report(options['output'], results, {
+            'students': len(student_ids),
+            'open_projects': len(project_ids),
+            'requests': count,
+            'clients': levels,
+            'limit': limit,
+            'warm_cache': options['warm_cache'],
+        })
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,138 @@
+import logging
+import random
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from user.ann_index import load as load_ann, recall_at_k
+from user.benchmark import measure, write_report
+from user.match_cache import match_cache
+from user.matching import (
+    get_student_matches, get_project_matches, ann_candidate_projects, unseen_by, PROJECT_SCORING_FIELDS,
+)
+from user.models import StudentProfile, ProfessorProject, ProfessorProfile
+from user.scoring import score_student_projects, top_k
+from user.text_index import project_similarity
+
+
+class Command(BaseCommand):
+    help = "Time matching and the list endpoints (p50/p95 latency, query counts, peak memory)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=20, help="Runs per target")
+        parser.add_argument('--limit', type=int, default=20, help="Match list size")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark_results.json', help="JSON report path")
+        parser.add_argument('--warm-cache', action='store_true', help="Keep the match cache between runs")
+        parser.add_argument('--skip-endpoints', action='store_true', help="Only time the matcher functions")
+        parser.add_argument('--recall-students', type=int, default=50,
+                            help="Students checked for ANN recall@k against brute force (0 to skip)")
+
+    def handle(self, *args, **options):
+        # The DEBUG query logger would print one line per request and skew the timings
+        logging.getLogger('user.queries').disabled = True
+        rng = random.Random(options['seed'])
+        samples = options['samples']
+        limit = options['limit']
+
+        student_ids = list(StudentProfile.objects.values_list('user_id', flat=True))
+        project_ids = list(ProfessorProject.objects.filter(is_open=True).values_list('id', flat=True))
+        if not student_ids or not project_ids:
+            raise CommandError("Need students and open projects; run generate_match_data first.")
+
+        def pick_student():
+            return rng.choice(student_ids)
+
+        def pick_project():
+            return rng.choice(project_ids)
+
+        setup = None if options['warm_cache'] else match_cache().clear
+
+        targets = {
+            'get_student_matches': lambda: get_student_matches(pick_student(), limit=limit),
+            'get_project_matches': lambda: get_project_matches(pick_project(), limit=limit),
+        }
+
+        ann = load_ann()
+        if ann is not None:
+            def ann_student_matches():
+                with override_settings(MATCH_ANN_MIN_PROJECTS=0):
+                    return get_student_matches(pick_student(), limit=limit)
+            targets['get_student_matches (ann)'] = ann_student_matches
+
+        if not options['skip_endpoints']:
+            student_user_id = pick_student()
+            token, _ = Token.objects.get_or_create(user_id=student_user_id)
+            client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+            profile_id = ProfessorProfile.objects.values_list('id', flat=True).first()
+
+            def get(url):
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"GET {url} returned {response.status_code}")
+                return response
+
+            def stream(url):
+                # Consume the body so the timing and memory cover the whole stream
+                for _ in get(url).streaming_content:
+                    pass
+
+            targets.update({
+                'GET /api/user/projects/': lambda: get('/api/user/projects/'),
+                'GET /api/user/projects/?stream=ndjson': lambda: stream('/api/user/projects/?stream=ndjson'),
+                'GET /api/user/professor/jobs/': lambda: get('/api/user/professor/jobs/'),
+                'GET /api/user/professor/jobs/?stream=ndjson': lambda: stream('/api/user/professor/jobs/?stream=ndjson'),
+                'GET /api/user/professor/projects/': lambda: get('/api/user/professor/projects/'),
+                'GET /api/user/professor/<id>/projects/': lambda: get(f'/api/user/professor/{profile_id}/projects/'),
+                'GET /api/user/student/matches/': lambda: get(f'/api/user/student/matches/?limit={limit}'),
+                'GET /api/user/project/<id>/matches/': lambda: get(f'/api/user/project/{pick_project()}/matches/?limit={limit}'),
+            })
+
+        results = {}
+        for name, fn in targets.items():
+            results[name] = measure(fn, samples, setup=setup)
+            r = results[name]
+            self.stdout.write(
+                f"{name:<42} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  "
+                f"queries {r['queries_mean']:>6.1f}  peak {r['peak_memory_kb']:>9.1f}KB"
+            )
+
+        if ann is not None and options['recall_students']:
+            sample = rng.sample(student_ids, min(options['recall_students'], len(student_ids)))
+            approximate, exact = zip(*(self.ann_and_exact(ann, user_id, limit) for user_id in sample))
+            recall = recall_at_k(approximate, exact, limit)
+            results['ann_recall'] = {'k': limit, 'students': len(sample), 'recall_at_k': round(recall, 4),
+                                     'indexed_projects': len(ann)}
+            self.stdout.write(f"{'ANN recall@' + str(limit):<42} {recall:.4f} over {len(sample)} students")
+
+        write_report(options['output'], results, {
+            'students': len(student_ids),
+            'open_projects': len(project_ids),
+            'samples': samples,
+            'limit': limit,
+            'warm_cache': options['warm_cache'],
+        })
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def ann_and_exact(self, ann, user_id, limit):
+        """
+        Top-`limit` project ids for one student via the ANN candidates, and the exact
+        top `limit` (plus ties on the last score) from scoring every open project
+        """
+        student = StudentProfile.objects.get(user_id=user_id)
+
+        def score(candidates):
+            projects = list(candidates.only(*PROJECT_SCORING_FIELDS))
+            ids = np.fromiter((p.id for p in projects), dtype=np.int64, count=len(projects))
+            return ids, score_student_projects(student, projects, project_similarity(student, ids))['score']
+
+        ids, scores = score(ann_candidate_projects(student, ann))
+        approximate = [int(ids[i]) for i in top_k(scores, ids, limit)]
+
+        ids, scores = score(ProfessorProject.objects.filter(is_open=True).filter(unseen_by(student, 'pk')))
+        if len(ids) > limit:
+            kth = np.partition(-scores, limit - 1)[limit - 1]
+            ids = ids[-scores <= kth]
+        return approximate, ids.tolist()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from user.profile_io import FORMATS, KINDS, RowWriter, columns, export_rows, guess_format
+
+
+class Command(BaseCommand):
+    help = "Export students, professors or projects as CSV or NDJSON, in the layout import_profiles reads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=KINDS)
+        parser.add_argument('--output', default='-', help="File to write (default: stdout)")
+        parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension (csv unless .ndjson/.jsonl)")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows read from the database at a time")
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = options['format'] or ('csv' if path == '-' else guess_format(path))
+        # Every CSV row and NDJSON line ends with a newline, so OutputWrapper adds none
+        out = self.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        count = 0
+        try:
+            writer = RowWriter(out, fmt, columns(options['kind'], export=True))
+            for row in export_rows(options['kind'], options['chunk_size']):
+                writer.write(row)
+                count += 1
+        finally:
+            if path != '-':
+                out.close()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} {options['kind']} to {path}"))
@@ -0,0 +1,198 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from user.models import (
+    User, StudentProfile, ProfessorProfile, ProfessorProject, ProjectSkill, StudentSkill, Skill, SkillAlias,
+)
+from user.match_cache import bump_catalog_version, bump_student_pool_version
+from user.match_store import rebuild_all_scores
+from user.skills import normalize_skill
+from user.text_index import rebuild_text_index
+from user.ann_index import rebuild_ann_index
+
+
+SYNTHETIC_PREFIX = 'synth_'
+
+BASE_SKILLS = [
+    'Python', 'Machine Learning', 'Data Analysis', 'SQL', 'Statistics', 'R', 'Java', 'C++',
+    'JavaScript', 'React', 'Django', 'Deep Learning', 'PyTorch', 'TensorFlow', 'MATLAB',
+    'Linux', 'Git', 'Computer Vision', 'NLP', 'Research Writing', 'Excel', 'Data Visualization',
+    'Docker', 'Cloud Computing', 'Bioinformatics', 'Signal Processing', 'Robotics', 'CAD',
+    'Lab Safety', 'PCR', 'Cell Culture', 'Microscopy', 'Chemistry', 'Physics', 'Econometrics',
+    'Survey Design', 'Qualitative Research', 'UX Research', 'Figma', 'Embedded Systems',
+]
+MODALITIES = ['Remote', 'On-site', 'Hybrid']
+UNIVERSITIES = ['NUS', 'NTU', 'SMU', 'SUTD', 'SIT', 'SUSS']
+HOURS = [5, 10, 15, 20, 25, 30, 40]
+TOPICS = [
+    'climate modelling', 'genomics', 'urban mobility', 'medical imaging', 'financial markets', 'education',
+    'materials discovery', 'public health', 'energy storage', 'social networks', 'language learning',
+    'autonomous vehicles', 'drug design', 'supply chains', 'sensor networks', 'accessibility',
+]
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic students, professors and projects for matching benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=1000)
+        parser.add_argument('--projects-per-professor', type=int, default=5)
+        parser.add_argument('--vocabulary', type=int, default=300, help="Number of distinct skills")
+        parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of skill frequency")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help="Delete previously generated synthetic users first")
+        parser.add_argument('--skip-scores', action='store_true', help="Do not rebuild the MatchScore table")
+
+    def handle(self, *args, **options):
+        self.rng = np.random.default_rng(options['seed'])
+        self.batch_size = options['batch_size']
+        self.vocabulary = self.build_vocabulary(options['vocabulary'])
+        self.skill_ids = self.resolve_vocabulary()
+        ranks = np.arange(1, len(self.vocabulary) + 1)
+        self.skill_weights = 1.0 / ranks ** options['zipf']
+        self.skill_weights /= self.skill_weights.sum()
+        # Password hashing dominates user creation, so every synthetic user shares one unusable hash
+        self.password = make_password(None)
+        started = time.perf_counter()
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=SYNTHETIC_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} synthetic rows")
+
+        run = int(time.time())
+        self.create_students(options['students'], run)
+        self.create_projects(options['projects'], options['projects_per_professor'], run)
+        bump_catalog_version()
+        bump_student_pool_version()
+        # bulk_create skips the save receivers that keep the text index current
+        rebuild_text_index()
+        rebuild_ann_index()
+
+        if not options['skip_scores']:
+            total = rebuild_all_scores(batch_size=self.batch_size)
+            self.stdout.write(f"Stored {total} match scores")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['students']} students and {options['projects']} projects in {elapsed:.1f}s"
+        ))
+
+    def build_vocabulary(self, size):
+        vocabulary = list(BASE_SKILLS[:size])
+        vocabulary += [f"Skill {i}" for i in range(len(vocabulary), size)]
+        # Shuffle so the most frequent (low rank) skills are not always the base list order
+        return [vocabulary[i] for i in self.rng.permutation(len(vocabulary))]
+
+    def resolve_vocabulary(self):
+        """Skill id for every vocabulary entry, resolved once instead of per saved row"""
+        Skill.objects.resolve_ids(self.vocabulary)
+        keys = [normalize_skill(skill) for skill in self.vocabulary]
+        by_alias = dict(SkillAlias.objects.filter(alias__in=keys).values_list('alias', 'skill_id'))
+        return {skill: by_alias[key] for skill, key in zip(self.vocabulary, keys)}
+
+    def ids_for(self, skills):
+        return sorted({self.skill_ids[skill] for skill in skills})
+
+    def sample_skills(self, low, high):
+        count = min(int(self.rng.integers(low, high + 1)), len(self.vocabulary))
+        picks = self.rng.choice(len(self.vocabulary), size=count, replace=False, p=self.skill_weights)
+        return [self.vocabulary[i] for i in picks]
+
+    def sample_text(self, skills):
+        """Short free text mentioning a couple of topics and the given skills"""
+        topics = self.rng.choice(TOPICS, size=2, replace=False)
+        return f"Research on {topics[0]} and {topics[1]} using {', '.join(skills) or 'any background'}."
+
+    def sample_window(self):
+        """Random availability window, missing 10% of the time"""
+        if self.rng.random() < 0.1:
+            return None, None
+        start = date(2025, 1, 1) + timedelta(days=int(self.rng.integers(0, 540)))
+        return start, start + timedelta(weeks=int(self.rng.integers(4, 27)))
+
+    def maybe(self, value, missing=0.1):
+        return None if self.rng.random() < missing else value
+
+    def create_students(self, count, run):
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f'{SYNTHETIC_PREFIX}student_{run}_{offset + i}', password=self.password,
+                         role=User.Role.STUDENT)
+                    for i in range(size)
+                ])
+                profiles = []
+                for user in users:
+                    avail_start, avail_end = self.sample_window()
+                    gpa = float(np.clip(self.rng.normal(3.2, 0.45), 1.5, 4.0))
+                    skills = self.sample_skills(1, 8)
+                    profiles.append(StudentProfile(
+                        user=user,
+                        given_name=user.username,
+                        skills=skills,
+                        skill_ids=self.ids_for(skills),
+                        headline=self.sample_text(skills[:2]),
+                        gpa=self.maybe(Decimal(f'{gpa:.2f}')),
+                        reliability=self.maybe(Decimal(f'{self.rng.uniform(0.4, 1.0):.2f}')),
+                        hrs_per_week=self.maybe(int(self.rng.choice(HOURS))),
+                        avail_start=avail_start,
+                        avail_end=avail_end,
+                    ))
+                # bulk_create skips pre_save/post_save, so skill ids and the index are written here directly
+                profiles = StudentProfile.objects.bulk_create(profiles)
+                StudentSkill.objects.bulk_create([
+                    StudentSkill(student=profile, skill_id=skill_id)
+                    for profile in profiles for skill_id in profile.skill_ids
+                ], batch_size=self.batch_size)
+            self.stdout.write(f"  students: {offset + size}/{count}")
+
+    def create_projects(self, count, per_professor, run):
+        professors = max(1, -(-count // max(per_professor, 1)))
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'{SYNTHETIC_PREFIX}professor_{run}_{i}', password=self.password,
+                     role=User.Role.PROFESSOR)
+                for i in range(professors)
+            ], batch_size=self.batch_size)
+            owners = ProfessorProfile.objects.bulk_create([
+                ProfessorProfile(user=user, professor_name=f'Prof. {user.username}',
+                                 university=str(self.rng.choice(UNIVERSITIES)))
+                for user in users
+            ], batch_size=self.batch_size)
+
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            with transaction.atomic():
+                projects = []
+                for i in range(offset, offset + size):
+                    start_date, end_date = self.sample_window()
+                    # A few projects list no skills and fall back to full coverage
+                    skills = self.sample_skills(0, 5) if self.rng.random() > 0.05 else []
+                    projects.append(ProfessorProject(
+                        profile=owners[i % len(owners)],
+                        title=f'Synthetic project {i}',
+                        description=self.sample_text(skills),
+                        modality=str(self.rng.choice(MODALITIES)),
+                        required_skills=skills,
+                        skill_ids=self.ids_for(skills),
+                        hrs_per_week=self.maybe(int(self.rng.choice(HOURS))),
+                        start_date=start_date,
+                        end_date=end_date,
+                        capacity=int(self.rng.integers(1, 6)),
+                        is_open=bool(self.rng.random() < 0.9),
+                    ))
+                projects = ProfessorProject.objects.bulk_create(projects)
+                ProjectSkill.objects.bulk_create([
+                    ProjectSkill(project=project, skill_id=skill_id)
+                    for project in projects for skill_id in project.skill_ids
+                ], batch_size=self.batch_size)
+            self.stdout.write(f"  projects: {offset + size}/{count}")
@@ -0,0 +1,57 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.jobs import enqueue
+from user.match_cache import bump_catalog_version, bump_student_pool_version
+from user.models import Job
+from user.profile_io import FORMATS, KINDS, ProfileImporter, batched, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import students, professors or projects from a CSV or NDJSON file (- reads stdin)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=KINDS)
+        parser.add_argument('path', help="CSV or NDJSON file; projects name their professor by username")
+        parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension (csv unless .ndjson/.jsonl)")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows validated and inserted per transaction")
+        parser.add_argument('--errors', help="Write rejected rows as NDJSON {line, errors} here instead of to stderr")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only")
+        parser.add_argument('--skip-scores', action='store_true', help="Do not queue a match score rebuild")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        path = options['path']
+        fmt = options['format'] or ('csv' if path == '-' else guess_format(path))
+        importer = ProfileImporter(options['kind'], dry_run=options['dry_run'])
+        errors_out = open(options['errors'], 'w', encoding='utf-8') if options['errors'] else self.stderr
+        source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        started = time.perf_counter()
+        try:
+            for batch in batched(read_rows(source, fmt), options['batch_size']):
+                for line, errors in importer.import_batch(batch):
+                    errors_out.write(json.dumps({'line': line, 'errors': errors}) + '\n')
+                self.stdout.write(f"  {options['kind']}: {importer.created} imported, {importer.rejected} rejected")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if options['errors']:
+                errors_out.close()
+
+        if importer.created and not options['dry_run']:
+            # Imported rows skipped the save receivers; invalidate and rescore once for the whole file
+            if options['kind'] == 'students':
+                bump_student_pool_version()
+            else:
+                bump_catalog_version()
+            if not options['skip_scores']:
+                enqueue(Job.Kind.REBUILD_MATCH_SCORES)
+
+        elapsed = time.perf_counter() - started
+        verb = "Validated" if options['dry_run'] else "Imported"
+        message = f"{verb} {importer.created} {options['kind']} in {elapsed:.1f}s; {importer.rejected} rows rejected"
+        self.stdout.write(self.style.WARNING(message) if importer.rejected else self.style.SUCCESS(message))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.ann_index import rebuild_ann_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the approximate nearest neighbour index over open projects"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clusters', type=int, default=None, help="Number of IVF clusters (default sqrt(projects))")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_ann_index(clusters=options['clusters'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} open projects in {elapsed:.1f}s"))
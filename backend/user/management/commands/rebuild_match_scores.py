@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.match_store import rebuild_all_scores
+from user.text_index import rebuild_text_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized MatchScore table from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per bulk insert")
+        parser.add_argument('--keep-text-index', action='store_true', help="Score against the existing text index")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['keep_text_index']:
+            students, projects = rebuild_text_index()
+            self.stdout.write(f"Indexed text for {students} students and {projects} projects")
+        total = rebuild_all_scores(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Stored {total} match scores in {elapsed:.1f}s"))
@@ -0,0 +1,71 @@
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from user.jobs import claim, enqueue, purge_finished, requeue_stale, run_job
+from user.media import purge_stale_uploads
+from user.models import Job
+from user.worker import init_process, run_job as run_pool_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (score refreshes, index rebuilds, assignments, thumbnails) in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (0 runs jobs in this process)")
+        parser.add_argument('--batch-size', type=int, default=None, help="Jobs claimed per poll (default 2 per process)")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--enqueue', choices=[kind for kind, _ in Job.Kind.choices if not kind.startswith('REFRESH')],
+                            action='append', default=[], help="Queue a catalog-wide job before starting")
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 0:
+            raise CommandError("--processes must be 0 or more")
+        batch_size = options['batch_size'] or max(processes, 1) * 2
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        for kind in options['enqueue']:
+            enqueue(kind)
+
+        pool = None
+        if processes:
+            # Children open their own connections; a forked copy of the parent's must not be shared
+            connections.close_all()
+            pool = ProcessPoolExecutor(processes, initializer=init_process)
+        self.stdout.write(f"Worker {worker} running with {processes or 'no'} child processes")
+        started = time.perf_counter()
+        total = 0
+        try:
+            while True:
+                requeue_stale()
+                jobs = claim(batch_size, worker)
+                if not jobs:
+                    if options['once']:
+                        break
+                    purge_finished()
+                    purge_stale_uploads()
+                    time.sleep(options['poll_interval'])
+                    continue
+                ids = [job.id for job in jobs]
+                if pool:
+                    list(pool.map(run_pool_job, ids))
+                else:
+                    for job_id in ids:
+                        run_job(job_id)
+                total += len(ids)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool:
+                pool.shutdown()
+        self.report(total, time.perf_counter() - started)
+
+    def report(self, total, elapsed):
+        failed = Job.objects.filter(status=Job.Status.FAILED).count()
+        self.stdout.write(self.style.SUCCESS(f"Ran {total} jobs in {elapsed:.1f}s ({failed} failed jobs on record)"))
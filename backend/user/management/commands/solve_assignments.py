@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.assignment import solve_assignments
+from user.match_cache import bump_catalog_version
+
+
+class Command(BaseCommand):
+    help = "Assign students to projects within capacity and re-rank the stored matches by congestion"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        summary = solve_assignments()
+        elapsed = time.perf_counter() - started
+        # Cached match lists were ranked with the previous prices
+        bump_catalog_version()
+        self.stdout.write(
+            f"{summary['students']} students, {summary['projects']} projects, {summary['edges']} candidate pairs; "
+            f"{summary['congested_projects']} projects full"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {summary['assigned']} students (total score {summary['total_score']}) in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,121 @@
+"""
+Versioned cache for match results.
+
+Entries are keyed by (user_id, limit, cursor, catalog version, student version). Nothing is
+ever deleted on invalidation: saving a project bumps the global catalog version and
+saving a StudentProfile bumps that student's version, so stale entries simply stop
+being addressed and age out of the backend.
+
+The backend is the MATCH_CACHE_ALIAS entry in CACHES. Versions are bumped by the web
+processes (on commit of a save) and by run_matching_worker (after a job rewrites stored
+scores), so the backend must be shared by all of them; a per-process cache such as
+locmem would keep serving stale lists, ETags and feature stores after a worker refresh.
+A bump stores a new random value rather than incrementing, so it needs no atomic
+increment and concurrent bumps from different processes cannot cancel out.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CATALOG_VERSION_KEY = 'match-version:catalog'
+STUDENT_POOL_VERSION_KEY = 'match-version:students'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def match_cache():
+    return caches[getattr(settings, 'MATCH_CACHE_ALIAS', 'default')]
+
+
+def _student_version_key(user_id: int) -> str:
+    return f'match-version:student:{user_id}'
+
+
+def _get_version(key: str) -> int:
+    cache = match_cache()
+    version = cache.get(key)
+    if version is None:
+        # Seed with the clock rather than 1 so an evicted counter never reuses old keys
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key: str) -> None:
+    match_cache().set(key, secrets.randbits(63), timeout=None)
+
+
+def catalog_version() -> int:
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version() -> None:
+    """Invalidate every cached match list (a project was created, edited, closed or deleted)"""
+    _bump_version(CATALOG_VERSION_KEY)
+
+
+def student_version(user_id: int) -> int:
+    return _get_version(_student_version_key(user_id))
+
+
+def bump_student_version(user_id: int) -> None:
+    """Invalidate one student's cached match lists"""
+    _bump_version(_student_version_key(user_id))
+
+
+def student_pool_version() -> int:
+    return _get_version(STUDENT_POOL_VERSION_KEY)
+
+
+def bump_student_pool_version() -> None:
+    """Mark the set of students as changed (a profile was created, edited or deleted)"""
+    _bump_version(STUDENT_POOL_VERSION_KEY)
+
+
+def _record(hit: bool) -> None:
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+
+
+def cache_stats() -> Dict:
+    """Hit/miss counters for this process"""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats['hits'] = _stats['misses'] = 0
+
+
+def cached_student_matches(
+    user_id: int,
+    limit: int,
+    compute: Callable[[], Any],
+    cursor: Optional[str] = None,
+) -> Any:
+    """Return the cached match page for this user/limit/cursor, computing and storing it on a miss"""
+    cache = match_cache()
+    page = hashlib.md5(cursor.encode()).hexdigest() if cursor else 'first'
+    key = f'student-matches:{user_id}:{limit}:{page}:{catalog_version()}:{student_version(user_id)}'
+    matches = cache.get(key)
+    if matches is not None:
+        _record(hit=True)
+        return matches
+    _record(hit=False)
+    matches = compute()
+    cache.set(key, matches)
+    return matches
@@ -0,0 +1,256 @@
+"""
+Materialized match scores.
+
+MatchScore holds the component scores of each student's best candidate projects so
+the match endpoints can serve a single indexed ORDER BY rank_score DESC LIMIT k query.
+rank_score is the score blended with the assignment solver's output (assignment.py).
+Only the top MATCH_STORE_DEPTH rows per student are kept, leaving out projects the
+student passed on, so the table holds at most students * MATCH_STORE_DEPTH rows
+however many candidates share a skill; a project's match list holds the students
+it ranks among the top of.
+Rows are refreshed per student / per project by the jobs the post_save receivers in
+models.py queue, and rebuilt in bulk by `manage.py rebuild_match_scores`. Candidates
+and their scoring columns come from the feature store (feature_store.py) and, once
+it covers MATCH_ANN_MIN_PROJECTS projects, the ANN index (ann_index.py).
+"""
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .models import StudentProfile, ProfessorProject, MatchScore, Swipe
+from .ann_index import active_index, student_query
+from .feature_store import feature_store, FeatureTable
+from .matching import (
+    ann_unindexed_project_ids, fallback_project_ids, project_payload, student_payload, unseen_by,
+    STUDENT_SCORING_FIELDS,
+)
+from .scoring import score_student_projects, score_project_students, COMPONENTS
+from .text_index import load, project_similarity, student_similarity, student_text, PROJECTS
+from .assignment import assigned_projects, congestion_prices, rank_scores
+
+
+def _rows(scores: Dict, pairs, prices: Dict[int, float], assigned: Dict[int, int]) -> List[MatchScore]:
+    """
+    Build unsaved MatchScore rows from engine output and (student_id, project_id) pairs,
+    ranked with the congestion `prices` and `assigned` projects of the last solver run
+    """
+    project_ids = np.fromiter((project_id for _, project_id in pairs), dtype=np.int64, count=len(pairs))
+    chosen = np.fromiter(
+        (assigned.get(student_id) == project_id for student_id, project_id in pairs), dtype=bool, count=len(pairs),
+    )
+    ranks = rank_scores(scores['score'], project_ids, prices, chosen)
+    return [
+        MatchScore(student_id=student_id, project_id=project_id, rank_score=float(ranks[i]),
+                   **{name: float(scores[name][i]) for name in COMPONENTS})
+        for i, (student_id, project_id) in enumerate(pairs)
+    ]
+
+
+def store_depth() -> int:
+    return getattr(settings, 'MATCH_STORE_DEPTH', 200)
+
+
+def _top(rows: List[MatchScore]) -> List[MatchScore]:
+    """One student's best store_depth() rows, in the order the match endpoints serve"""
+    return heapq.nsmallest(store_depth(), rows, key=lambda row: (-row.rank_score, row.project_id))
+
+
+def passed_projects(student_id: int) -> set:
+    return set(
+        Swipe.objects.filter(student_id=student_id, direction=Swipe.Direction.LEFT).values_list('project_id', flat=True)
+    )
+
+
+def stored_components(match: MatchScore) -> Dict:
+    """Rounded components of a stored row, in the shape calculate_match_score returns"""
+    return {name: round(getattr(match, name), 4) for name in COMPONENTS}
+
+
+def project_candidates(student: StudentProfile, table: FeatureTable, index=None, unindexed=()) -> List:
+    """
+    Open projects (feature store records) to store scores for: every project sharing a
+    skill, or once the ANN index is active its approximate top MATCH_ANN_CANDIDATES plus
+    the `unindexed` projects created since it was built; and the skill-less fallback
+    either way. Swiped projects are kept, the callers drop the ones passed on.
+    """
+    if index is None:
+        ids = table.sharing(student.skill_ids or [])
+    else:
+        ids = set(index.search(student_query(student), getattr(settings, 'MATCH_ANN_CANDIDATES', 300)).tolist())
+        ids.update(unindexed)
+    ids.update(table.fallback())
+    return table.get_many(ids)
+
+
+def refresh_student_scores(student: StudentProfile) -> int:
+    """Recompute the stored scores of one student; returns the number of rows written"""
+    index = active_index()
+    passed = passed_projects(student.id)
+    projects = [
+        project for project in project_candidates(
+            student, feature_store.projects(checked=True), index, ann_unindexed_project_ids(index) if index else (),
+        )
+        if project.id not in passed
+    ]
+    scores = score_student_projects(student, projects, project_similarity(student, [p.id for p in projects]))
+    rows = _top(_rows(scores, [(student.id, p.id) for p in projects],
+                      congestion_prices(), assigned_projects(student_id=student.id)))
+    with transaction.atomic():
+        MatchScore.objects.filter(student_id=student.id).delete()
+        MatchScore.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _student_floors() -> Dict[int, Tuple[int, float]]:
+    """Number of stored rows and lowest rank_score per student"""
+    return {
+        student_id: (count, lowest)
+        for student_id, count, lowest in MatchScore.objects.values('student_id')
+        .annotate(count=Count('id'), lowest=Min('rank_score')).values_list('student_id', 'count', 'lowest')
+    }
+
+
+def refresh_project_scores(project: ProfessorProject) -> int:
+    """
+    Recompute the stored scores of one project; closed projects just lose their rows.
+    A student gets a row only if it ranks among their best store_depth(), displacing
+    their lowest row when they already have that many. A project with no required
+    skills is scored against every student only while it is one of the newest
+    MATCH_FALLBACK_LIMIT such projects, the rule project_candidates() applies to
+    students; refreshing one also drops the rows of skill-less projects that have
+    fallen out of that window.
+    """
+    rows = []
+    fallback = None
+    if project.is_open and not project.skill_ids:
+        fallback = fallback_project_ids()
+    if project.is_open and (project.skill_ids or project.id in fallback):
+        feature_store.students(checked=True)
+        passed = set(
+            Swipe.objects.filter(project_id=project.id, direction=Swipe.Direction.LEFT).values_list('student_id', flat=True)
+        )
+        students = [s for s in feature_store.candidate_students(project.skill_ids or []) if s.id not in passed]
+        scores = score_project_students(project, students, student_similarity(project, [s.id for s in students]))
+        rows = _rows(scores, [(s.id, project.id) for s in students],
+                     congestion_prices(project_id=project.id), assigned_projects(project_id=project.id))
+    with transaction.atomic():
+        MatchScore.objects.filter(project_id=project.id).delete()
+        if fallback is not None:
+            MatchScore.objects.filter(project__skill_entries__isnull=True).exclude(project_id__in=fallback).delete()
+        if rows:
+            floors, depth = _student_floors(), store_depth()
+            rows = [
+                row for row in rows
+                if floors.get(row.student_id, (0, 0.0))[0] < depth or row.rank_score > floors[row.student_id][1]
+            ]
+            # Students at the cap give up their lowest row (all of them on a tie)
+            full = [(row.student_id, floors[row.student_id][1]) for row in rows
+                    if floors.get(row.student_id, (0, 0.0))[0] >= depth]
+            for start in range(0, len(full), 500):
+                evicted = Q()
+                for student_id, lowest in full[start:start + 500]:
+                    evicted |= Q(student_id=student_id, rank_score__lte=lowest)
+                MatchScore.objects.filter(evicted).delete()
+        MatchScore.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_all_scores(batch_size: int = 1000) -> int:
+    """
+    Rebuild the whole table from scratch.
+    Candidates come from the feature store (and the ANN index once it is active) with
+    the same rules as refresh_student_scores, so the cost is one scoring pass per
+    student plus batched inserts of at most store_depth() rows each.
+    """
+    table = feature_store.projects(checked=True)
+    index = active_index()
+    unindexed = ann_unindexed_project_ids(index) if index else ()
+    passed = defaultdict(set)
+    for student_id, project_id in Swipe.objects.filter(direction=Swipe.Direction.LEFT).values_list(
+        'student_id', 'project_id',
+    ).iterator(chunk_size=10000):
+        passed[student_id].add(project_id)
+    text_matrix = load(PROJECTS)
+    prices, assigned = congestion_prices(), assigned_projects()
+    total = 0
+    with transaction.atomic():
+        MatchScore.objects.all().delete()
+        pending = []
+        students = StudentProfile.objects.only(
+            *STUDENT_SCORING_FIELDS, 'headline', 'summary', 'skills_text',
+        ).iterator(chunk_size=batch_size)
+        for student in students:
+            candidates = [
+                project for project in project_candidates(student, table, index, unindexed)
+                if project.id not in passed[student.id]
+            ]
+            text_similarity = text_matrix.similarity(
+                text_matrix.vectorize(student_text(student)), [p.id for p in candidates],
+            )
+            scores = score_student_projects(student, candidates, text_similarity)
+            pending.extend(_top(_rows(scores, [(student.id, p.id) for p in candidates], prices, assigned)))
+            if len(pending) >= batch_size:
+                MatchScore.objects.bulk_create(pending, batch_size=batch_size)
+                total += len(pending)
+                pending = []
+        MatchScore.objects.bulk_create(pending, batch_size=batch_size)
+        total += len(pending)
+    return total
+
+
+def _page(rows, limit: int, id_field: str) -> Tuple[List[MatchScore], Optional[Tuple[float, int]]]:
+    """Split limit+1 fetched rows into the page and the (rank_score, id) boundary of the next one"""
+    rows = list(rows)
+    if len(rows) <= limit or limit <= 0:
+        return rows[:max(limit, 0)], None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (last.rank_score, getattr(last, id_field))
+
+
+def _payload(data: Dict, row: MatchScore) -> Dict:
+    data.update(stored_components(row))
+    return data
+
+
+def stored_student_matches(
+    student: StudentProfile,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+    """
+    Top stored matches for a student, served with one indexed query.
+    Projects the student already swiped on are dropped by an anti-join on Swipe.
+    `after` is the (rank_score, project_id) boundary of the previous page. Returns the
+    matches and the boundary for the next page (None when this is the last one).
+    """
+    rows = MatchScore.objects.filter(unseen_by(student), student=student, project__is_open=True)
+    if after is not None:
+        rank, project_id = after
+        rows = rows.filter(Q(rank_score__lt=rank) | Q(rank_score=rank, project_id__gt=project_id))
+    rows = rows.select_related('project__profile__user').order_by('-rank_score', 'project_id')[:max(limit, 0) + 1]
+    rows, next_after = _page(rows, limit, 'project_id')
+    return [_payload(project_payload(row.project), row) for row in rows], next_after
+
+
+def stored_project_matches(
+    project_id: int,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+    """
+    Top stored matches for a project, served with one indexed query.
+    `after` is the (rank_score, student_id) boundary of the previous page.
+    """
+    rows = MatchScore.objects.filter(project_id=project_id)
+    if after is not None:
+        rank, student_id = after
+        rows = rows.filter(Q(rank_score__lt=rank) | Q(rank_score=rank, student_id__gt=student_id))
+    rows = rows.select_related('student__user').order_by('-rank_score', 'student_id')[:max(limit, 0) + 1]
+    rows, next_after = _page(rows, limit, 'student_id')
+    return [_payload(student_payload(row.student), row) for row in rows], next_after
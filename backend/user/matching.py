@@ -4,11 +4,53 @@ This is a simplified version that works with Django models.
 """
 from typing import List, Dict, Optional
 from datetime import date
-from django.db.models import Q
-from .models import StudentProfile, ProfessorProject
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from .models import StudentProfile, ProfessorProject, Swipe
+from .scoring import score_student_projects, score_project_students, component_dict, top_k
+from .text_index import project_similarity, student_similarity
+from .ann_index import active_index, student_query
+from .feature_store import feature_store
+from .media import thumbnail_urls
+import numpy as np
 import json
 
 
+def unseen_by(student: StudentProfile, project_ref: str = 'project_id') -> Exists:
+    """Anti-join condition for rows whose project (`project_ref` on the outer query) the student has not swiped on"""
+    return ~Exists(Swipe.objects.filter(student=student, project_id=OuterRef(project_ref)))
+
+
+def fallback_project_ids() -> List[int]:
+    """The bounded set of newest open projects with no required skills (full skill coverage for anyone)"""
+    fallback_limit = getattr(settings, 'MATCH_FALLBACK_LIMIT', 200)
+    return list(
+        ProfessorProject.objects.filter(is_open=True, skill_entries__isnull=True)
+        .order_by('-created_at')
+        .values_list('id', flat=True)[:fallback_limit]
+    )
+
+
+def ann_candidate_projects(student: StudentProfile, index, k: Optional[int] = None):
+    """
+    Open projects the student has not swiped on, retrieved from the ANN index
+    (ann_index.py) for the exact rerank: the approximate top `k`, plus projects
+    created since the index was built and the skill-less fallback.
+    """
+    k = k or getattr(settings, 'MATCH_ANN_CANDIDATES', 300)
+    project_ids = set(index.search(student_query(student), k).tolist())
+    project_ids.update(ann_unindexed_project_ids(index))
+    project_ids.update(fallback_project_ids())
+    return ProfessorProject.objects.filter(id__in=project_ids, is_open=True).filter(unseen_by(student, 'pk'))
+
+
+def ann_unindexed_project_ids(index) -> List[int]:
+    """Open projects created since the ANN index was built, which it cannot retrieve"""
+    return list(
+        ProfessorProject.objects.filter(is_open=True, created_at__gt=index.built_at).values_list('id', flat=True)
+    )
+
+
 def calculate_skill_coverage(student_skills: List[str], required_skills: List[str]) -> float:
     """Calculate skill coverage percentage (0.0 to 1.0)"""
     if not required_skills:
@@ -71,12 +113,14 @@ def calculate_match_score(
     project: ProfessorProject,
     skill_coverage: float,
     availability: float,
-    potential: float
+    potential: float,
+    text_similarity: Optional[float] = None,
 ) -> Dict:
     """Calculate overall match score for a student-project pair"""
-    # Text similarity (simplified - in production, use embeddings)
-    # For now, use skill coverage as a proxy
-    text_similarity = skill_coverage
+    # Text similarity comes from the TF-IDF index (text_index.py); when either side
+    # has no text, skill coverage stands in for it
+    if text_similarity is None or text_similarity != text_similarity:
+        text_similarity = skill_coverage
     
     # Fit score
     fit = 0.35 * text_similarity + 0.50 * skill_coverage + 0.15 * availability
@@ -102,11 +146,56 @@ def calculate_match_score(
         'p_accept': round(p_accept, 4),
         'perf': round(perf, 4),
         'skill_coverage': round(skill_coverage, 4),
+        'text_similarity': round(text_similarity, 4),
         'availability': round(availability, 4),
         'potential': round(potential, 4),
     }
 
 
+# Columns the batch engine reads; everything else is loaded only for the winners
+PROJECT_SCORING_FIELDS = ('id', 'skill_ids', 'start_date', 'end_date', 'hrs_per_week')
+STUDENT_SCORING_FIELDS = ('id', 'user_id', 'skill_ids', 'avail_start', 'avail_end', 'hrs_per_week', 'gpa', 'reliability')
+
+
+def project_payload(project: ProfessorProject) -> Dict:
+    """Project details returned with a student's matches (expects profile__user loaded)"""
+    return {
+        'project_id': project.id,
+        'title': project.title,
+        'description': project.description,
+        'professor_name': project.profile.professor_name or project.profile.user.username,
+        'university': project.profile.university,
+        'required_skills': project.required_skills or [],
+        'hrs_per_week': project.hrs_per_week,
+        'start_date': project.start_date.isoformat() if project.start_date else None,
+        'end_date': project.end_date.isoformat() if project.end_date else None,
+        'capacity': project.capacity,
+        'modality': project.modality,
+        'location': project.location,
+        'profile_image': project.profile.profile_image.url if project.profile.profile_image else None,
+        'profile_thumbnails': thumbnail_urls(project.profile, 'profile_image'),
+    }
+
+
+def student_payload(student: StudentProfile) -> Dict:
+    """Student details returned with a project's matches (expects user loaded)"""
+    return {
+        'student_id': student.user.id,
+        'username': student.user.username,
+        'email': student.user.email,
+        'given_name': student.given_name,
+        'last_name': student.last_name,
+        'headline': student.headline,
+        'summary': student.summary,
+        'skills': student.skills or [],
+        'courses': student.courses or [],
+        'gpa': float(student.gpa) if student.gpa else None,
+        'hrs_per_week': student.hrs_per_week,
+        'major_chosen': student.major_chosen,
+        'graduation_year': student.graduation_year,
+    }
+
+
 def get_student_matches(student_id: int, limit: int = 20) -> List[Dict]:
     """
     Get matching projects for a student.
@@ -117,61 +206,36 @@ def get_student_matches(student_id: int, limit: int = 20) -> List[Dict]:
     except StudentProfile.DoesNotExist:
         return []
     
-    # Get student data
-    student_skills = student_profile.skills or []
-    student_hrs = student_profile.hrs_per_week or 0
-    student_start = student_profile.avail_start
-    student_end = student_profile.avail_end
-    student_gpa = float(student_profile.gpa) if student_profile.gpa else None
-    student_reliability = float(student_profile.reliability) if student_profile.reliability else None
+    # Only score unseen projects that share a skill with the student (plus the skill-less fallback),
+    # resolved against the in-memory feature store; past MATCH_ANN_MIN_PROJECTS the approximate
+    # index narrows that to a few hundred instead
+    index = active_index()
+    if index is not None:
+        projects = feature_store.projects().get_many(
+            ann_candidate_projects(student_profile, index).values_list('id', flat=True)
+        )
+    else:
+        swiped = Swipe.objects.filter(student=student_profile).values_list('project_id', flat=True)
+        projects = feature_store.candidate_projects(student_profile.skill_ids or [], exclude=swiped)
     
-    # Calculate potential once
-    potential = calculate_student_potential(student_gpa, student_reliability)
+    # Score every candidate in one vectorized pass and keep only the top `limit`
+    ids = np.fromiter((p.id for p in projects), dtype=np.int64, count=len(projects))
+    scores = score_student_projects(student_profile, projects, project_similarity(student_profile, ids))
+    winners = top_k(scores['score'], ids, limit)
     
-    # Get all open projects
-    projects = ProfessorProject.objects.filter(is_open=True).select_related('profile')
+    # Load full details for the winners only
+    details = ProfessorProject.objects.select_related('profile__user').in_bulk([int(ids[i]) for i in winners])
     
     matches = []
-    for project in projects:
-        # Calculate features
-        required_skills = project.required_skills or []
-        skill_coverage = calculate_skill_coverage(student_skills, required_skills)
-        availability = calculate_availability_overlap(
-            student_start, student_end,
-            project.start_date, project.end_date,
-            student_hrs, project.hrs_per_week
-        )
-        
-        # Calculate match score
-        match_data = calculate_match_score(
-            student_profile, project, skill_coverage, availability, potential
-        )
-        
-        # Get project details
-        project_data = {
-            'project_id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'professor_name': project.profile.professor_name or project.profile.user.username,
-            'university': project.profile.university,
-            'required_skills': required_skills,
-            'hrs_per_week': project.hrs_per_week,
-            'start_date': project.start_date.isoformat() if project.start_date else None,
-            'end_date': project.end_date.isoformat() if project.end_date else None,
-            'capacity': project.capacity,
-            'modality': project.modality,
-            'location': project.location,
-            'profile_image': project.profile.profile_image.url if project.profile.profile_image else None,
-        }
-        
-        # Combine match data with project data
-        project_data.update(match_data)
+    for i in winners:
+        project = details.get(int(ids[i]))
+        if project is None:
+            continue  # deleted since scoring
+        project_data = project_payload(project)
+        project_data.update(component_dict(scores, i))
         matches.append(project_data)
     
-    # Sort by score (descending)
-    matches.sort(key=lambda x: x['score'], reverse=True)
-    
-    return matches[:limit]
+    return matches
 
 
 def get_project_matches(project_id: int, limit: int = 20) -> List[Dict]:
@@ -184,58 +248,24 @@ def get_project_matches(project_id: int, limit: int = 20) -> List[Dict]:
     except ProfessorProject.DoesNotExist:
         return []
     
-    # Get project data
-    required_skills = project.required_skills or []
-    project_hrs = project.hrs_per_week or 0
-    project_start = project.start_date
-    project_end = project.end_date
+    # Only score students that share a required skill with the project (from the feature store)
+    students = feature_store.candidate_students(project.skill_ids or [])
+    
+    # Score every candidate in one vectorized pass and keep only the top `limit`
+    ids = np.fromiter((s.id for s in students), dtype=np.int64, count=len(students))
+    scores = score_project_students(project, students, student_similarity(project, ids))
+    winners = top_k(scores['score'], ids, limit)
     
-    # Get all students with profiles
-    students = StudentProfile.objects.all().select_related('user')
+    # Load full details for the winners only
+    details = StudentProfile.objects.select_related('user').in_bulk([int(ids[i]) for i in winners])
     
     matches = []
-    for student in students:
-        # Calculate features
-        student_skills = student.skills or []
-        skill_coverage = calculate_skill_coverage(student_skills, required_skills)
-        availability = calculate_availability_overlap(
-            student.avail_start, student.avail_end,
-            project_start, project_end,
-            student.hrs_per_week or 0, project_hrs
-        )
-        potential = calculate_student_potential(
-            float(student.gpa) if student.gpa else None,
-            float(student.reliability) if student.reliability else None
-        )
-        
-        # Calculate match score
-        match_data = calculate_match_score(
-            student, project, skill_coverage, availability, potential
-        )
-        
-        # Get student details
-        student_data = {
-            'student_id': student.user.id,
-            'username': student.user.username,
-            'email': student.user.email,
-            'given_name': student.given_name,
-            'last_name': student.last_name,
-            'headline': student.headline,
-            'summary': student.summary,
-            'skills': student_skills,
-            'courses': student.courses or [],
-            'gpa': float(student.gpa) if student.gpa else None,
-            'hrs_per_week': student.hrs_per_week,
-            'major_chosen': student.major_chosen,
-            'graduation_year': student.graduation_year,
-        }
-        
-        # Combine match data with student data
-        student_data.update(match_data)
+    for i in winners:
+        student = details.get(int(ids[i]))
+        if student is None:
+            continue  # deleted since scoring
+        student_data = student_payload(student)
+        student_data.update(component_dict(scores, i))
         matches.append(student_data)
     
-    # Sort by score (descending)
-    matches.sort(key=lambda x: x['score'], reverse=True)
-    
-    return matches[:limit]
-
+    return matches
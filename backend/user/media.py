@@ -0,0 +1,330 @@
+"""
+Media uploads: content-addressed storage, upload tickets and WebP thumbnails.
+
+Files are kept in the 'default' storage (settings.STORAGES), so the local filesystem
+stand-in used in development can be swapped for an object store without touching
+this module. Every stored file is named after the SHA-256 of its bytes
+(`<upload_to>/<2 hex>/<sha256><ext>`), so uploading the same image or resume twice
+stores it once.
+
+Large files do not have to travel through the registration request: POST /uploads/
+hands out a signed ticket and an upload URL, the client PUTs the bytes there, and the
+registration form sends the ticket (e.g. `resume_upload`) in place of the file. A
+storage backend that defines `upload_url(name, content_type, expires)` (such as a
+subclass of an S3 backend returning a presigned PUT) receives the bytes directly;
+otherwise the URL is this app's own /uploads/<ticket>/ endpoint. That endpoint also
+takes the file in chunks (PATCH with Upload-Offset, HEAD to find where to resume after
+a dropped connection), appending each one straight to a staging file in
+MEDIA_UPLOAD_STAGING_DIR, which must be shared by all web servers. claim_upload() then
+copies the staged bytes to their content address and drops the staged copy once the
+registration commits.
+
+Thumbnails of the professor profile images are generated by a MAKE_THUMBNAILS job
+(jobs.py) in MEDIA_THUMBNAIL_SIZES, stored as `thumbnails/<sha256>/<size>.webp` and
+recorded in ProfessorProfile.thumbnails; thumbnail_urls() serves them to the API.
+"""
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows; chunks to one upload are then not serialized
+    fcntl = None
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+UPLOAD_SALT = 'user.media.upload'
+STAGING_DIR = 'uploads'
+THUMBNAIL_DIR = 'thumbnails'
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Fields that accept tickets, with the folder their files are stored in
+UPLOAD_FIELDS = {
+    'transcript': 'transcripts',
+    'resume': 'resumes',
+    'profile_image': 'professor_profile_images',
+    'lab_first_image': 'professor_lab_images',
+    'lab_second_image': 'professor_lab_images',
+    'lab_third_image': 'professor_lab_images',
+}
+PROFILE_IMAGE_FIELDS = ('profile_image', 'lab_first_image', 'lab_second_image', 'lab_third_image')
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+class UploadOffsetMismatch(InvalidUpload):
+    """A chunk did not start where the received bytes end"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload-Offset must be {offset}")
+        self.offset = offset
+
+
+def thumbnail_sizes():
+    return tuple(getattr(settings, 'MEDIA_THUMBNAIL_SIZES', (160, 480, 960)))
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, 'MEDIA_UPLOAD_MAX_BYTES', 20 * 1024 * 1024)
+
+
+def _digest(content) -> str:
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in iter(lambda: content.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(folder: str, digest: str, filename: str) -> str:
+    ext = os.path.splitext(filename or '')[1].lower()[:10]
+    return f'{folder.rstrip("/")}/{digest[:2]}/{digest}{ext}'
+
+
+def store_content_addressed(content, folder: str, filename: str, storage=None) -> str:
+    """Store `content` under its SHA-256 in `folder`, unless an identical file is already there"""
+    storage = storage or default_storage
+    name = content_name(folder, _digest(content), filename)
+    if not storage.exists(name):
+        name = storage.save(name, File(content, name=name))
+    return name
+
+
+def content_address_files(instance, field_names) -> None:
+    """
+    pre_save hook: store the instance's newly assigned files under their content
+    address, so FileField.pre_save finds them committed and does not save them again
+    """
+    for field_name in field_names:
+        file = getattr(instance, field_name)
+        if not file or file._committed:
+            continue
+        field = instance._meta.get_field(field_name)
+        file.name = store_content_addressed(file.file, str(field.upload_to), file.name, field.storage)
+        file._committed = True
+
+
+# Upload tickets
+
+def issue_upload(field: str, filename: str, content_type: str, request=None, size: Optional[int] = None) -> Dict:
+    """
+    A signed ticket for one upload into `field`, with where and how to send the bytes.
+    `size`, when declared, is enforced and lets chunked uploads report completion.
+    """
+    if field not in UPLOAD_FIELDS:
+        raise InvalidUpload(f"field must be one of: {', '.join(UPLOAD_FIELDS)}")
+    if size is not None and not 0 < size <= max_upload_bytes():
+        raise InvalidUpload(f"size must be between 1 and {max_upload_bytes()} bytes")
+    expires = getattr(settings, 'MEDIA_UPLOAD_TICKET_SECONDS', 3600)
+    staged = f'{STAGING_DIR}/{uuid.uuid4().hex}'
+    ticket = signing.dumps(
+        {'field': field, 'name': staged, 'filename': os.path.basename(filename or ''), 'size': size},
+        salt=UPLOAD_SALT, compress=True,
+    )
+    resumable_url = reverse('media-upload', args=[ticket])
+    if request is not None:
+        resumable_url = request.build_absolute_uri(resumable_url)
+    upload_url = getattr(default_storage, 'upload_url', None)
+    return {
+        'ticket': ticket,
+        'upload_url': upload_url(staged, content_type, expires) if upload_url is not None else resumable_url,
+        'method': 'PUT',
+        'headers': {'Content-Type': content_type} if content_type else {},
+        # PATCH chunks here with an Upload-Offset header; HEAD returns the offset to resume from
+        'resumable_url': resumable_url,
+        'expires_in': expires,
+        'max_bytes': size or max_upload_bytes(),
+    }
+
+
+def read_ticket(ticket: str, field: Optional[str] = None) -> Dict:
+    """The payload of a valid, unexpired ticket (for `field`, when given); raises InvalidUpload"""
+    try:
+        data = signing.loads(ticket, salt=UPLOAD_SALT, max_age=getattr(settings, 'MEDIA_UPLOAD_TICKET_SECONDS', 3600))
+    except signing.SignatureExpired:
+        raise InvalidUpload("Upload ticket expired")
+    except signing.BadSignature:
+        raise InvalidUpload("Invalid upload ticket")
+    if field is not None and data['field'] != field:
+        raise InvalidUpload(f"Upload ticket is not for {field}")
+    return data
+
+
+def staging_path(data: Dict) -> Path:
+    """Local file that uploads through this app are written to until they are claimed"""
+    return Path(getattr(settings, 'MEDIA_UPLOAD_STAGING_DIR', tempfile.gettempdir())) / os.path.basename(data['name'])
+
+
+def upload_offset(ticket: str) -> Dict:
+    """Bytes received so far for a ticket (where a chunked upload resumes) and the declared size"""
+    data = read_ticket(ticket)
+    path = staging_path(data)
+    return {'offset': path.stat().st_size if path.exists() else 0, 'size': data.get('size')}
+
+
+@contextmanager
+def _locked(path: Path, mode: str):
+    """The staging file opened with an exclusive lock, so concurrent chunks cannot interleave"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, mode) as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        yield file
+
+
+def receive_upload(ticket: str, stream, offset: Optional[int] = None) -> Dict:
+    """
+    Write a request body to the ticket's staging file, straight to disk a block at a time.
+    With `offset` None the body is the whole file and replaces anything received before;
+    otherwise it is a chunk that must start where the received bytes end (UploadOffsetMismatch
+    carries the actual offset). Returns the upload_offset() state after the write.
+    """
+    data = read_ticket(ticket)
+    limit = data.get('size') or max_upload_bytes()
+    with _locked(staging_path(data), 'ab') as file:
+        if offset is None:
+            file.truncate(0)
+            offset = 0
+        current = file.seek(0, os.SEEK_END)
+        if offset != current:
+            raise UploadOffsetMismatch(current)
+        for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+            current += len(chunk)
+            if current > limit:
+                file.truncate(offset)
+                raise InvalidUpload(f"Upload is limited to {limit} bytes")
+            file.write(chunk)
+    return {'offset': current, 'size': data.get('size')}
+
+
+def claim_upload(ticket: str, field: str) -> str:
+    """
+    Copy a ticket's upload (from the local staging file, or from the storage backend's
+    staging object for direct uploads) to its content address and return the stored name.
+    The staged copy is deleted when the current transaction commits, so a registration
+    that rolls back leaves the ticket usable for a retry.
+    """
+    data = read_ticket(ticket, field)
+    path = staging_path(data)
+    if path.exists():
+        with _locked(path, 'rb') as staged:
+            received = os.fstat(staged.fileno()).st_size
+            if not received or (data.get('size') and received != data['size']):
+                raise InvalidUpload(f"Upload for {field} is incomplete ({received} of {data.get('size') or '?'} bytes)")
+            name = store_content_addressed(staged, UPLOAD_FIELDS[field], data['filename'])
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
+        return name
+
+    if not default_storage.exists(data['name']):
+        raise InvalidUpload(f"Nothing was uploaded for {field}")
+    if default_storage.size(data['name']) > (data.get('size') or max_upload_bytes()):
+        default_storage.delete(data['name'])
+        raise InvalidUpload(f"Upload for {field} is too large")
+    with default_storage.open(data['name'], 'rb') as staged:
+        name = store_content_addressed(staged, UPLOAD_FIELDS[field], data['filename'])
+    transaction.on_commit(lambda: default_storage.delete(data['name']))
+    return name
+
+
+def purge_stale_uploads() -> int:
+    """Delete staging files of uploads whose ticket has expired; returns the number removed"""
+    directory = Path(getattr(settings, 'MEDIA_UPLOAD_STAGING_DIR', tempfile.gettempdir()))
+    if not directory.is_dir():
+        return 0
+    cutoff = time.time() - getattr(settings, 'MEDIA_UPLOAD_TICKET_SECONDS', 3600)
+    removed = 0
+    for path in directory.iterdir():
+        if path.is_file() and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+# Thumbnails
+
+def render_thumbnail(image: Image.Image, size: int) -> File:
+    thumb = image.copy()
+    thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = tempfile.SpooledTemporaryFile()
+    thumb.save(buffer, 'WEBP', quality=getattr(settings, 'MEDIA_THUMBNAIL_QUALITY', 80), method=4)
+    buffer.seek(0)
+    return File(buffer)
+
+
+def make_thumbnails(name: str, storage=None) -> Dict[str, str]:
+    """
+    WebP thumbnails of the stored image `name`, keyed by size (as a string); sizes
+    already rendered for identical bytes are reused. Empty when `name` is not an image.
+    """
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as source:
+        digest = _digest(source)
+        try:
+            image = Image.open(source)
+            image.load()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            return {}
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    thumbnails = {}
+    for size in thumbnail_sizes():
+        thumb_name = f'{THUMBNAIL_DIR}/{digest}/{size}.webp'
+        if not storage.exists(thumb_name):
+            with render_thumbnail(image, size) as thumb:
+                storage.save(thumb_name, thumb)
+        thumbnails[str(size)] = thumb_name
+    return thumbnails
+
+
+def refresh_profile_thumbnails(profile) -> bool:
+    """
+    Bring profile.thumbnails in line with its image fields; returns True if it changed.
+    Entries record the source name they were made from, so unchanged images are skipped.
+    """
+    current = {}
+    for field in PROFILE_IMAGE_FIELDS:
+        file = getattr(profile, field)
+        if not file:
+            continue
+        entry = (profile.thumbnails or {}).get(field)
+        if entry and entry.get('source') == file.name and set(entry.get('sizes', {})) == set(map(str, thumbnail_sizes())):
+            current[field] = entry
+            continue
+        sizes = make_thumbnails(file.name, file.storage)
+        if sizes:
+            current[field] = {'source': file.name, 'sizes': sizes}
+    changed = current != (profile.thumbnails or {})
+    profile.thumbnails = current
+    return changed
+
+
+def thumbnail_urls(profile, field: str, request=None) -> Optional[Dict[str, str]]:
+    """URLs of a profile image's thumbnails by size, or None until they have been generated"""
+    entry = (profile.thumbnails or {}).get(field)
+    file = getattr(profile, field)
+    if not entry or not file or entry.get('source') != file.name:
+        return None
+    urls = {}
+    for size, name in entry['sizes'].items():
+        url = file.storage.url(name)
+        urls[size] = request.build_absolute_uri(url) if request is not None else url
+    return urls
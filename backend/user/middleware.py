@@ -0,0 +1,52 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('user.queries')
+
+
+class QueryCountDebugMiddleware:
+    """
+    DEBUG-only: log the number of SQL queries each request runs, and warn about
+    repeated statements (same SQL template run many times is the N+1 signature,
+    same SQL with the same params is a plain duplicate).
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, 'QUERY_REPEAT_WARN_THRESHOLD', 5)
+
+    def __call__(self, request):
+        executed = []
+
+        def record(execute, sql, params, many, context):
+            executed.append((sql, repr(params)))
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record))
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        templates = Counter(sql for sql, _ in executed)
+        duplicates = Counter(executed)
+        repeated = [(sql, count) for sql, count in templates.most_common() if count >= self.repeat_threshold]
+        duplicated = sum(count - 1 for count in duplicates.values())
+
+        logger.info(
+            "%s %s: %d queries (%d exact duplicates) in %.1fms",
+            request.method, request.path, len(executed), duplicated, elapsed_ms,
+        )
+        for sql, count in repeated:
+            logger.warning("%s %s: ran %d times: %s", request.method, request.path, count, sql)
+        return response
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_skill_index(apps, schema_editor):
+    from user.skills import normalize_skills
+
+    ProfessorProject = apps.get_model('user', 'ProfessorProject')
+    StudentProfile = apps.get_model('user', 'StudentProfile')
+    ProjectSkill = apps.get_model('user', 'ProjectSkill')
+    StudentSkill = apps.get_model('user', 'StudentSkill')
+
+    ProjectSkill.objects.bulk_create([
+        ProjectSkill(project_id=project_id, skill=skill)
+        for project_id, skills in ProfessorProject.objects.values_list('id', 'required_skills')
+        for skill in normalize_skills(skills)
+    ], batch_size=1000)
+    StudentSkill.objects.bulk_create([
+        StudentSkill(student_id=student_id, skill=skill)
+        for student_id, skills in StudentProfile.objects.values_list('id', 'skills')
+        for skill in normalize_skills(skills)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_studentprofile_avail_end_studentprofile_avail_start_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_entries', to='user.professorproject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'project'), name='unique_project_skill')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_entries', to='user.studentprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'student'), name='unique_student_skill')],
+            },
+        ),
+        migrations.RunPython(build_skill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 14:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_skill_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('fit', models.FloatField()),
+                ('p_accept', models.FloatField()),
+                ('perf', models.FloatField()),
+                ('skill_coverage', models.FloatField()),
+                ('availability', models.FloatField()),
+                ('potential', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_scores', to='user.professorproject')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_scores', to='user.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', '-score', 'project'], name='matchscore_student_rank'), models.Index(fields=['project', '-score', 'student'], name='matchscore_project_rank')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'project'), name='unique_match_score')],
+            },
+        ),
+    ]
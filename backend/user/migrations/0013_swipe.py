@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0012_matchscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Swipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direction', models.CharField(choices=[('LEFT', 'Pass'), ('RIGHT', 'Interested')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swipes', to='user.professorproject')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swipes', to='user.studentprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'project'), name='unique_student_swipe')],
+            },
+        ),
+    ]
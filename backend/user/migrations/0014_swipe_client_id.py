@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0013_swipe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='swipe',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='swipe',
+            constraint=models.UniqueConstraint(fields=('student', 'client_id'), name='unique_swipe_client_id'),
+        ),
+    ]
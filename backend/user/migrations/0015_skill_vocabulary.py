@@ -0,0 +1,115 @@
+# Generated by Django 5.2 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def resolve_skill_ids(apps, schema_editor):
+    from user.skills import SKILL_ALIASES, normalize_skill
+
+    Skill = apps.get_model('user', 'Skill')
+    SkillAlias = apps.get_model('user', 'SkillAlias')
+    ProfessorProject = apps.get_model('user', 'ProfessorProject')
+    StudentProfile = apps.get_model('user', 'StudentProfile')
+    ProjectSkill = apps.get_model('user', 'ProjectSkill')
+    StudentSkill = apps.get_model('user', 'StudentSkill')
+
+    aliases = {}
+
+    def skill_id(name, key):
+        if key not in aliases:
+            skill, _ = Skill.objects.get_or_create(name=name)
+            SkillAlias.objects.create(alias=key, skill=skill)
+            aliases[key] = skill.id
+        return aliases[key]
+
+    for name, spellings in SKILL_ALIASES.items():
+        canonical = skill_id(name, normalize_skill(name))
+        for spelling in spellings:
+            key = normalize_skill(spelling)
+            if key not in aliases:
+                SkillAlias.objects.create(alias=key, skill_id=canonical)
+                aliases[key] = canonical
+
+    def resolve(skills):
+        return sorted({
+            skill_id(' '.join(str(skill).split()), normalize_skill(skill))
+            for skill in skills or [] if normalize_skill(skill)
+        })
+
+    # The old string index rows were dropped with their column; rebuild them by id
+    ProjectSkill.objects.all().delete()
+    StudentSkill.objects.all().delete()
+    for project in ProfessorProject.objects.only('id', 'required_skills'):
+        project.skill_ids = resolve(project.required_skills)
+        project.save(update_fields=['skill_ids'])
+        ProjectSkill.objects.bulk_create([ProjectSkill(project_id=project.id, skill_id=i) for i in project.skill_ids])
+    for student in StudentProfile.objects.only('id', 'skills'):
+        student.skill_ids = resolve(student.skills)
+        student.save(update_fields=['skill_ids'])
+        StudentSkill.objects.bulk_create([StudentSkill(student_id=student.id, skill_id=i) for i in student.skill_ids])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_swipe_client_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=255, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='user.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'skill aliases',
+            },
+        ),
+        migrations.AddField(
+            model_name='professorproject',
+            name='skill_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='skill_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RemoveConstraint(
+            model_name='projectskill',
+            name='unique_project_skill',
+        ),
+        migrations.RemoveConstraint(
+            model_name='studentskill',
+            name='unique_student_skill',
+        ),
+        migrations.RemoveField(
+            model_name='projectskill',
+            name='skill',
+        ),
+        migrations.RemoveField(
+            model_name='studentskill',
+            name='skill',
+        ),
+        migrations.AddField(
+            model_name='projectskill',
+            name='skill',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='project_entries', to='user.skill'),
+        ),
+        migrations.AddField(
+            model_name='studentskill',
+            name='skill',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='student_entries', to='user.skill'),
+        ),
+        migrations.RunPython(resolve_skill_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_skill_vocabulary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectskill',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_entries', to='user.skill'),
+        ),
+        migrations.AlterField(
+            model_name='studentskill',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_entries', to='user.skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'project'), name='unique_project_skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'student'), name='unique_student_skill'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_skill_index_by_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchscore',
+            name='text_similarity',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-18 15:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_scores(apps, schema_editor):
+    MatchScore = apps.get_model('user', 'MatchScore')
+    MatchScore.objects.update(rank_score=models.F('score'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0017_matchscore_text_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Assignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectCongestion',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='congestion', serialize=False, to='user.professorproject')),
+                ('price', models.FloatField(default=0.0)),
+                ('assigned', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='matchscore',
+            name='matchscore_student_rank',
+        ),
+        migrations.RemoveIndex(
+            model_name='matchscore',
+            name='matchscore_project_rank',
+        ),
+        migrations.AddField(
+            model_name='matchscore',
+            name='rank_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(copy_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='matchscore',
+            index=models.Index(fields=['student', '-rank_score', 'project'], name='matchscore_student_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='matchscore',
+            index=models.Index(fields=['project', '-rank_score', 'student'], name='matchscore_project_rank'),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='user.professorproject'),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='student',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='assignment', to='user.studentprofile'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 15:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0018_assignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('REFRESH_STUDENT', 'Refresh student matches'), ('REFRESH_PROJECT', 'Refresh project matches'), ('REBUILD_MATCH_SCORES', 'Rebuild match scores'), ('REBUILD_TEXT_INDEX', 'Rebuild text index'), ('REBUILD_ANN_INDEX', 'Rebuild ANN index'), ('SOLVE_ASSIGNMENTS', 'Solve assignments')], max_length=32)),
+                ('object_id', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=64)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_due')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('kind', 'object_id'), name='unique_pending_job')],
+            },
+        ),
+    ]
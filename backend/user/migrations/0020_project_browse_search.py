@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 15:41
+
+from django.db import migrations, models
+
+
+def install_search(apps, schema_editor):
+    from user.search import install_project_search
+    install_project_search(schema_editor)
+
+
+def uninstall_search(apps, schema_editor):
+    from user.search import uninstall_project_search
+    uninstall_project_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0019_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professorproject',
+            index=models.Index(fields=['is_open', '-created_at'], name='project_open_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='professorproject',
+            index=models.Index(fields=['is_open', 'modality'], name='project_open_modality'),
+        ),
+        migrations.AddIndex(
+            model_name='professorproject',
+            index=models.Index(fields=['is_open', 'start_date', 'end_date'], name='project_open_dates'),
+        ),
+        migrations.AddIndex(
+            model_name='professorproject',
+            index=models.Index(fields=['is_open', 'hrs_per_week'], name='project_open_hours'),
+        ),
+        migrations.RunPython(install_search, uninstall_search),
+    ]
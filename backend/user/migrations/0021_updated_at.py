@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+def reinstall_search(apps, schema_editor):
+    # Adding a column rebuilds the SQLite table, which drops the FTS triggers on it
+    from user.search import install_project_search
+    install_project_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0020_project_browse_search'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the columns are dropped again
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search),
+        migrations.AddField(
+            model_name='professorprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='professorproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0021_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professorprofile',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('REFRESH_STUDENT', 'Refresh student matches'), ('REFRESH_PROJECT', 'Refresh project matches'), ('REBUILD_MATCH_SCORES', 'Rebuild match scores'), ('REBUILD_TEXT_INDEX', 'Rebuild text index'), ('REBUILD_ANN_INDEX', 'Rebuild ANN index'), ('SOLVE_ASSIGNMENTS', 'Solve assignments'), ('MAKE_THUMBNAILS', 'Make profile image thumbnails')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_stored_client_ids(apps, schema_editor):
+    # Swipes uploaded in batches so far keep only the client_id that was applied last
+    Swipe = apps.get_model('user', 'Swipe')
+    SwipeEvent = apps.get_model('user', 'SwipeEvent')
+    SwipeEvent.objects.bulk_create(
+        SwipeEvent(student_id=student_id, client_id=client_id)
+        for student_id, client_id in Swipe.objects.exclude(client_id=None).values_list('student_id', 'client_id')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0023_project_batches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwipeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swipe_events', to='user.studentprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'client_id'), name='unique_swipe_event')],
+            },
+        ),
+        migrations.RunPython(record_stored_client_ids, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from .skills import normalize_skill
 
 
 class User(AbstractUser):
@@ -61,12 +63,14 @@ class StudentProfile(models.Model):
     summary = models.TextField(blank=True, null=True)
     courses = models.JSONField(default=list, blank=True)  # List of courses
     skills = models.JSONField(default=list, blank=True)  # List of skills
+    skill_ids = models.JSONField(default=list, blank=True)  # Sorted Skill ids resolved from `skills` on save
     skills_text = models.TextField(blank=True, null=True)
     gpa = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
     hrs_per_week = models.IntegerField(blank=True, null=True)
     avail_start = models.DateField(blank=True, null=True)
     avail_end = models.DateField(blank=True, null=True)
     reliability = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username} Profile"
@@ -106,11 +110,47 @@ class ProfessorProfile(models.Model):
     lab_second_image = models.FileField(upload_to='professor_lab_images/', blank=True, null=True)
     lab_third_image = models.FileField(upload_to='professor_lab_images/', blank=True, null=True)
     position_description = models.TextField(blank=True, null=True)
+    # {image field: {'source': stored name, 'sizes': {size: WebP name}}}, written by the thumbnail job (media.py)
+    thumbnails = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Conditional GETs of the catalog (conditional.py)
 
     def __str__(self):
         return f"{self.user.username} Professor Profile"
 
 
+class ProjectManager(models.Manager):
+    def bulk_create_projects(self, projects, refresh=True):
+        """
+        Insert unsaved projects with bulk_create in one transaction. bulk_create skips the
+        save receivers below, so their work is done here once per batch instead of once per
+        row: skill ids are resolved in one vocabulary lookup, the inverted skill index is
+        filled with one insert, one score refresh is queued per professor (unless `refresh`
+        is False, for callers that rebuild all scores afterwards), and cached match lists
+        are invalidated once on commit.
+        """
+        from .jobs import enqueue
+        from .match_cache import bump_catalog_version
+
+        projects = list(projects)
+        if not projects:
+            return projects
+        skill_ids = Skill.objects.resolve_map([skill for project in projects for skill in project.required_skills or []])
+        for project in projects:
+            keys = (normalize_skill(skill) for skill in project.required_skills or [])
+            project.skill_ids = sorted({skill_ids[key] for key in keys if key in skill_ids})
+
+        with transaction.atomic():
+            self.bulk_create(projects, batch_size=500)
+            ProjectSkill.objects.bulk_create(
+                [ProjectSkill(project=project, skill_id=skill_id) for project in projects for skill_id in project.skill_ids],
+                batch_size=1000, ignore_conflicts=True,
+            )
+            for profile_id in sorted({project.profile_id for project in projects}) if refresh else ():
+                enqueue(Job.Kind.REFRESH_PROFILE_PROJECTS, profile_id)
+            transaction.on_commit(bump_catalog_version)
+        return projects
+
+
 class ProfessorProject(models.Model):
     profile = models.ForeignKey(ProfessorProfile, on_delete=models.CASCADE, related_name='projects')
     title = models.CharField(max_length=255)
@@ -120,12 +160,392 @@ class ProfessorProject(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # Algorithm-required fields
     required_skills = models.JSONField(default=list, blank=True)  # List of required skills
+    skill_ids = models.JSONField(default=list, blank=True)  # Sorted Skill ids resolved from `required_skills` on save
     hrs_per_week = models.IntegerField(blank=True, null=True)
     start_date = models.DateField(blank=True, null=True)
     end_date = models.DateField(blank=True, null=True)
     capacity = models.IntegerField(default=1)  # Number of students needed
     is_open = models.BooleanField(default=True)  # Whether project is accepting applications
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Conditional GETs of the catalog (conditional.py)
+
+    objects = ProjectManager()
+
+    class Meta:
+        # Browse filters and sorts (search.py); every browse query is limited to open projects
+        indexes = [
+            models.Index(fields=['is_open', '-created_at'], name='project_open_newest'),
+            models.Index(fields=['is_open', 'modality'], name='project_open_modality'),
+            models.Index(fields=['is_open', 'start_date', 'end_date'], name='project_open_dates'),
+            models.Index(fields=['is_open', 'hrs_per_week'], name='project_open_hours'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.profile.professor_name or self.profile.user.username})"
 
+
+# Skill vocabulary: every spelling of a skill ("Python", "python ", "python3") resolves
+# through SkillAlias to one canonical Skill, so matching compares small integer sets.
+class SkillManager(models.Manager):
+    def resolve_map(self, skills, create=True):
+        """{normalize_skill() key: Skill id} for a list of free-text skills, creating unknown skills when `create`"""
+        names = {}
+        for skill in skills or []:
+            key = normalize_skill(skill)
+            if key:
+                names.setdefault(key, ' '.join(str(skill).split()))
+        if not names:
+            return {}
+
+        found = dict(SkillAlias.objects.filter(alias__in=names).values_list('alias', 'skill_id'))
+        missing = [key for key in names if key not in found]
+        if missing and create:
+            self.bulk_create([self.model(name=names[key]) for key in missing], ignore_conflicts=True)
+            by_name = dict(self.filter(name__in=[names[key] for key in missing]).values_list('name', 'id'))
+            SkillAlias.objects.bulk_create(
+                [SkillAlias(alias=key, skill_id=by_name[names[key]]) for key in missing if names[key] in by_name],
+                ignore_conflicts=True,
+            )
+            found.update(SkillAlias.objects.filter(alias__in=missing).values_list('alias', 'skill_id'))
+        return {key: found[key] for key in names if key in found}
+
+    def resolve_ids(self, skills, create=True):
+        """Sorted Skill ids for a list of free-text skills, creating unknown skills when `create`"""
+        return sorted(set(self.resolve_map(skills, create).values()))
+
+
+class Skill(models.Model):
+    name = models.CharField(max_length=255, unique=True)  # Canonical display name
+
+    objects = SkillManager()
+
+    def __str__(self):
+        return self.name
+
+
+class SkillAlias(models.Model):
+    alias = models.CharField(max_length=255, unique=True)  # normalize_skill() key, including the canonical name's own
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        verbose_name_plural = 'skill aliases'
+
+    def __str__(self):
+        return f"{self.alias} -> {self.skill_id}"
+
+
+@receiver(pre_save, sender=StudentProfile)
+def resolve_student_skill_ids(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'skills' not in update_fields):
+        return
+    instance.skill_ids = Skill.objects.resolve_ids(instance.skills)
+
+
+@receiver(pre_save, sender=ProfessorProject)
+def resolve_project_skill_ids(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'required_skills' not in update_fields):
+        return
+    instance.skill_ids = Skill.objects.resolve_ids(instance.required_skills)
+
+
+# Inverted skill index: skill -> project / student.
+# Kept in sync by the post_save receivers below; rows go away with their owner via CASCADE.
+class ProjectSkill(models.Model):
+    project = models.ForeignKey(ProfessorProject, on_delete=models.CASCADE, related_name='skill_entries')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='project_entries')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'project'], name='unique_project_skill'),
+        ]
+
+    def __str__(self):
+        return f"skill {self.skill_id} -> project {self.project_id}"
+
+
+class StudentSkill(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='skill_entries')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='student_entries')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'student'], name='unique_student_skill'),
+        ]
+
+    def __str__(self):
+        return f"skill {self.skill_id} -> student {self.student_id}"
+
+
+def sync_skill_index(index_model, owner_field, owner, skill_ids):
+    """Bring the index rows for one owner in line with its current skill ids"""
+    wanted = set(skill_ids or [])
+    existing = set(index_model.objects.filter(**{owner_field: owner}).values_list('skill_id', flat=True))
+    stale = existing - wanted
+    if stale:
+        index_model.objects.filter(**{owner_field: owner, 'skill_id__in': stale}).delete()
+    index_model.objects.bulk_create(
+        [index_model(**{owner_field: owner, 'skill_id': skill_id}) for skill_id in wanted - existing],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=ProfessorProject)
+def index_project_skills(sender, instance, **kwargs):
+    sync_skill_index(ProjectSkill, 'project', instance, instance.skill_ids)
+
+
+@receiver(post_save, sender=StudentProfile)
+def index_student_skills(sender, instance, **kwargs):
+    sync_skill_index(StudentSkill, 'student', instance, instance.skill_ids)
+
+
+# Text similarity index (see text_index.py). Saves are indexed by the refresh jobs below;
+# deletes drop the row once they commit, so a rolled-back delete keeps it indexed.
+@receiver(post_delete, sender=StudentProfile)
+def unindex_student_text(sender, instance, **kwargs):
+    from .text_index import remove_student
+    student_id = instance.id
+    transaction.on_commit(lambda: remove_student(student_id))
+
+
+@receiver(post_delete, sender=ProfessorProject)
+def unindex_project_text(sender, instance, **kwargs):
+    from .text_index import remove_project
+    project_id = instance.id
+    transaction.on_commit(lambda: remove_project(project_id))
+
+
+# Materialized component scores for candidate (student, project) pairs, see match_store.py
+class MatchScore(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='match_scores')
+    project = models.ForeignKey(ProfessorProject, on_delete=models.CASCADE, related_name='match_scores')
+    score = models.FloatField()
+    fit = models.FloatField()
+    p_accept = models.FloatField()
+    perf = models.FloatField()
+    skill_coverage = models.FloatField()
+    text_similarity = models.FloatField(default=0.0)
+    availability = models.FloatField()
+    potential = models.FloatField()
+    # Ordering key for the match endpoints: score blended with the assignment solver's output (assignment.py)
+    rank_score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'project'], name='unique_match_score'),
+        ]
+        indexes = [
+            models.Index(fields=['student', '-rank_score', 'project'], name='matchscore_student_rank'),
+            models.Index(fields=['project', '-rank_score', 'student'], name='matchscore_project_rank'),
+        ]
+
+    def __str__(self):
+        return f"student {self.student_id} / project {self.project_id}: {self.score:.4f}"
+
+
+# One row per (student, project) the student has swiped on; re-swiping updates the direction
+class Swipe(models.Model):
+    class Direction(models.TextChoices):
+        LEFT = "LEFT", "Pass"
+        RIGHT = "RIGHT", "Interested"
+
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='swipes')
+    project = models.ForeignKey(ProfessorProject, on_delete=models.CASCADE, related_name='swipes')
+    direction = models.CharField(max_length=10, choices=Direction.choices)
+    client_id = models.CharField(max_length=64, blank=True, null=True)  # Client-generated, for idempotent batch uploads
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves the "already seen" anti-join in matching
+            models.UniqueConstraint(fields=['student', 'project'], name='unique_student_swipe'),
+            models.UniqueConstraint(fields=['student', 'client_id'], name='unique_swipe_client_id'),
+        ]
+
+    def __str__(self):
+        return f"student {self.student_id} {self.direction} project {self.project_id}"
+
+
+# Every client_id a student's swipes were accepted under, including events a later one
+# in the same batch superseded, so replayed events are recognised as duplicates
+class SwipeEvent(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='swipe_events')
+    client_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'client_id'], name='unique_swipe_event'),
+        ]
+
+    def __str__(self):
+        return f"student {self.student_id} event {self.client_id}"
+
+
+# Output of the capacity-constrained assignment solver (assignment.py), replaced on every run
+class Assignment(models.Model):
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, related_name='assignment')
+    project = models.ForeignKey(ProfessorProject, on_delete=models.CASCADE, related_name='assignments')
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"student {self.student_id} -> project {self.project_id}"
+
+
+class ProjectCongestion(models.Model):
+    project = models.OneToOneField(ProfessorProject, on_delete=models.CASCADE, primary_key=True, related_name='congestion')
+    price = models.FloatField(default=0.0)  # Auction clearing price; 0 unless the project filled up
+    assigned = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"project {self.project_id}: price {self.price:.4f}, {self.assigned} assigned"
+
+
+# Background work queue (jobs.py), drained by `manage.py run_matching_worker`
+class Job(models.Model):
+    class Kind(models.TextChoices):
+        REFRESH_STUDENT = "REFRESH_STUDENT", "Refresh student matches"
+        REFRESH_PROJECT = "REFRESH_PROJECT", "Refresh project matches"
+        REBUILD_MATCH_SCORES = "REBUILD_MATCH_SCORES", "Rebuild match scores"
+        REBUILD_TEXT_INDEX = "REBUILD_TEXT_INDEX", "Rebuild text index"
+        REBUILD_ANN_INDEX = "REBUILD_ANN_INDEX", "Rebuild ANN index"
+        SOLVE_ASSIGNMENTS = "SOLVE_ASSIGNMENTS", "Solve assignments"
+        MAKE_THUMBNAILS = "MAKE_THUMBNAILS", "Make profile image thumbnails"
+        REFRESH_PROFILE_PROJECTS = "REFRESH_PROFILE_PROJECTS", "Refresh a professor's project matches"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField(default=0)  # Student/professor profile or project id; 0 for catalog-wide jobs
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)  # Claim token of the worker running it
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Repeated saves of one row coalesce into a single pending refresh
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'], condition=models.Q(status='PENDING'), name='unique_pending_job',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({self.status})"
+
+
+# Match scores and the text index are refreshed by a job, which becomes visible to the
+# workers when the save commits. Registered after the skill index receivers above.
+@receiver(post_save, sender=ProfessorProject)
+def refresh_project_match_scores(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .jobs import enqueue
+    enqueue(Job.Kind.REFRESH_PROJECT, instance.id)
+
+
+@receiver(post_save, sender=StudentProfile)
+def refresh_student_match_scores(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .jobs import enqueue
+    enqueue(Job.Kind.REFRESH_STUDENT, instance.id)
+
+
+# Uploaded files are stored under the SHA-256 of their bytes (media.py)
+@receiver(pre_save, sender=StudentProfile)
+def store_student_files(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .media import content_address_files
+    content_address_files(instance, ('transcript', 'resume'))
+
+
+@receiver(pre_save, sender=ProfessorProfile)
+def store_professor_files(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .media import content_address_files, PROFILE_IMAGE_FIELDS
+    content_address_files(instance, PROFILE_IMAGE_FIELDS)
+
+
+# Card images are served as thumbnails, rendered off the request path
+@receiver(post_save, sender=ProfessorProfile)
+def queue_profile_thumbnails(sender, instance, raw=False, **kwargs):
+    from .media import PROFILE_IMAGE_FIELDS
+    if raw or not (instance.thumbnails or any(getattr(instance, field) for field in PROFILE_IMAGE_FIELDS)):
+        return
+    from .jobs import enqueue
+    enqueue(Job.Kind.MAKE_THUMBNAILS, instance.id)
+
+
+# Match cache invalidation (see match_cache.py). Bumped on commit so cached payloads pick up
+# the edited fields; the refresh jobs bump again once the stored scores have been rewritten.
+@receiver(post_save, sender=ProfessorProject)
+@receiver(post_delete, sender=ProfessorProject)
+@receiver(post_save, sender=ProfessorProfile)
+@receiver(post_delete, sender=ProfessorProfile)
+def invalidate_catalog_matches(sender, **kwargs):
+    from .match_cache import bump_catalog_version
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_student_matches(sender, instance, **kwargs):
+    from .match_cache import bump_student_version, bump_student_pool_version
+    transaction.on_commit(lambda: bump_student_version(instance.user_id))
+    transaction.on_commit(bump_student_pool_version)
+
+
+@receiver(post_save, sender=Swipe)
+def invalidate_swiper_matches(sender, instance, **kwargs):
+    from .match_cache import bump_student_version
+    user_id = instance.student.user_id
+    transaction.on_commit(lambda: bump_student_version(user_id))
+
+
+# Token cache invalidation (see authentication.py): cached entries hold the user's flags
+# and profile ids, so they are dropped when any of these change.
+@receiver(post_delete, sender='authtoken.Token')
+def forget_deleted_token(sender, instance, **kwargs):
+    from .authentication import forget_token
+    key = instance.key
+    transaction.on_commit(lambda: forget_token(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Professor)
+def forget_changed_user_tokens(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return  # A new user has no token yet
+    from .authentication import forget_user_tokens
+    user_id = instance.id
+    transaction.on_commit(lambda: forget_user_tokens(user_id))
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=ProfessorProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=ProfessorProfile)
+def forget_profile_owner_tokens(sender, instance, created=True, raw=False, **kwargs):
+    # Only the profile id is cached, so plain edits leave the entry valid
+    if raw or not created:
+        return
+    from .authentication import forget_user_tokens
+    user_id = instance.user_id
+    transaction.on_commit(lambda: forget_user_tokens(user_id))
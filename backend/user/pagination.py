@@ -0,0 +1,43 @@
+"""
+Opaque keyset cursors for the match endpoints, and limit/offset paging for project browsing.
+
+A cursor carries the (rank_score, id) of the last row served plus the catalog version
+the first page was built against. The next page continues with rows strictly after that
+boundary in (rank_score DESC, id ASC) order, so earlier pages are never rescored or
+reserialized. Cursors are signed so clients cannot hand-craft boundaries.
+"""
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from rest_framework.pagination import LimitOffsetPagination
+
+
+CURSOR_SALT = 'user.match-cursor'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(after: Tuple[float, int], version: Optional[int]) -> str:
+    """Encode a (score, id) boundary and snapshot version as an opaque string"""
+    score, row_id = after
+    return signing.dumps({'s': repr(float(score)), 'id': int(row_id), 'v': version}, salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor: str) -> Tuple[Tuple[float, int], Optional[int]]:
+    """Return ((score, id), version) from a cursor produced by encode_cursor"""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        return (float(data['s']), int(data['id'])), data.get('v')
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidCursor("Invalid or expired cursor")
+
+
+class BrowsePagination(LimitOffsetPagination):
+    """
+    ?limit=&offset= paging for the project browse endpoint. Without ?limit= the
+    endpoint keeps returning the bare list.
+    """
+    max_limit = getattr(settings, 'BROWSE_MAX_LIMIT', 100)
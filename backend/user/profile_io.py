@@ -0,0 +1,275 @@
+"""
+Bulk import and export of students, professors and projects as CSV or NDJSON
+(`manage.py import_profiles` / `manage.py export_profiles`).
+
+Both directions stream: rows are read and validated in batches of a fixed size, and
+exports iterate the database in chunks, so memory does not grow with the file.
+Each imported batch is validated row by row with the API serializers, then inserted
+with bulk_create in one transaction. bulk_create skips the save receivers, so their
+per-row work is done per batch instead: skill ids are resolved in one vocabulary
+lookup and the inverted skill index is filled with one insert. Score refreshes are
+left to one REBUILD_MATCH_SCORES job queued after the import.
+
+Rows that fail validation are skipped and reported with their line number; the rest
+of their batch is still imported. Users get an unusable password unless the file has
+a `password` column. Hashing is deliberately slow, so importing passwords dominates
+the run time. Exports never include password hashes.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import (
+    User, StudentProfile, ProfessorProfile, ProfessorProject, Skill, StudentSkill,
+)
+from .serializers import (
+    ImportUserSerializer, StudentProfileSerializer, ProfessorProfileSerializer, ProfessorProjectSerializer,
+)
+from .skills import normalize_skill
+
+
+FORMATS = ('csv', 'ndjson')
+USER_COLUMNS = ('username', 'email', 'password')
+PROFILE_COLUMNS = {
+    'students': (
+        'given_name', 'middle_name', 'last_name', 'nationality', 'age', 'language', 'graduation_year',
+        'major_chosen', 'location', 'phone_number', 'headline', 'summary', 'courses', 'skills', 'skills_text',
+        'gpa', 'hrs_per_week', 'avail_start', 'avail_end', 'reliability',
+    ),
+    'professors': ('professor_name', 'university', 'description', 'website', 'position_description'),
+    'projects': (
+        'professor', 'title', 'description', 'modality', 'location', 'required_skills', 'hrs_per_week',
+        'start_date', 'end_date', 'capacity', 'is_open',
+    ),
+}
+KINDS = tuple(PROFILE_COLUMNS)
+# JSON lists; in CSV written as JSON and read as JSON or a ;-separated list
+LIST_COLUMNS = {'courses', 'skills', 'required_skills'}
+
+Row = Dict[str, object]
+RowErrors = List[Tuple[int, Dict]]
+
+
+def columns(kind: str, export: bool = False) -> Tuple[str, ...]:
+    """Columns of `kind` in file order; projects name their professor by username"""
+    if kind == 'projects':
+        return PROFILE_COLUMNS[kind]
+    user_columns = ('username', 'email') if export else USER_COLUMNS
+    return user_columns + PROFILE_COLUMNS[kind]
+
+
+def guess_format(path: str) -> str:
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Reading and writing
+
+def read_rows(stream, fmt: str) -> Iterator[Tuple[int, Optional[Row], Optional[str]]]:
+    """(line number, row, parse error) for every record in a CSV or NDJSON stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(row, dict):
+            yield line_number, row, None
+        else:
+            yield line_number, None, "Expected a JSON object"
+
+
+def clean_row(row: Row, known: Iterable[str]) -> Row:
+    """Known columns with a value; CSV list cells may be JSON or ;-separated"""
+    cleaned = {}
+    for column in known:
+        value = row.get(column)
+        if value is None or value == '':
+            continue
+        if column in LIST_COLUMNS and isinstance(value, str):
+            if value.lstrip().startswith('['):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass  # Left as a string for the serializer to reject
+            else:
+                value = [item.strip() for item in value.split(';') if item.strip()]
+        cleaned[column] = value
+    return cleaned
+
+
+class RowWriter:
+    """Writes dict rows as CSV (with a header) or NDJSON"""
+
+    def __init__(self, stream, fmt: str, fieldnames: Iterable[str]):
+        self.stream = stream
+        self.fieldnames = tuple(fieldnames)
+        self.encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        self.csv = csv.DictWriter(stream, self.fieldnames) if fmt == 'csv' else None
+        if self.csv:
+            self.csv.writeheader()
+
+    def cell(self, value) -> str:
+        if value is None:
+            return ''
+        if isinstance(value, (list, dict)):
+            return self.encoder.encode(value)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def write(self, row: Row):
+        if self.csv:
+            self.csv.writerow({column: self.cell(row.get(column)) for column in self.fieldnames})
+        else:
+            self.stream.write(self.encoder.encode({column: row.get(column) for column in self.fieldnames}) + '\n')
+
+
+def export_rows(kind: str, chunk_size: int = 2000) -> Iterator[Row]:
+    """Every row of `kind`, read from the database `chunk_size` rows at a time"""
+    if kind == 'projects':
+        fields = [column for column in PROFILE_COLUMNS[kind] if column != 'professor']
+        rows = ProfessorProject.objects.order_by('id').values_list('profile__user__username', *fields)
+        names = ('professor', *fields)
+    else:
+        model = StudentProfile if kind == 'students' else ProfessorProfile
+        fields = PROFILE_COLUMNS[kind]
+        rows = model.objects.order_by('id').values_list('user__username', 'user__email', *fields)
+        names = ('username', 'email', *fields)
+    for values in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(names, values))
+
+
+# Importing
+
+class ProfileImporter:
+    """Validates and inserts batches of rows of one kind; counts what it created"""
+
+    def __init__(self, kind: str, dry_run: bool = False):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of: {', '.join(KINDS)}")
+        self.kind = kind
+        self.dry_run = dry_run
+        self.created = 0
+        self.rejected = 0
+        self.user_serializer = ImportUserSerializer()
+        # One serializer per import, reused for every row as a ListSerializer reuses its child
+        self.profile_serializer = {
+            'students': StudentProfileSerializer(partial=True),
+            'professors': ProfessorProfileSerializer(partial=True),
+            'projects': ProfessorProjectSerializer(context={'profiles': {}}),
+        }[kind]
+        # Password hashing is slow by design; rows without a password share one unusable hash
+        self.unusable_password = make_password(None)
+
+    def import_batch(self, batch: List[Tuple[int, Optional[Row], Optional[str]]]) -> RowErrors:
+        """Import one batch of read_rows() output; returns (line number, errors) of each rejected row"""
+        errors = [(line, {'non_field_errors': [error]}) for line, row, error in batch if error]
+        rows = [(line, row) for line, row, error in batch if not error]
+        if self.kind == 'projects':
+            valid, rejected = self.validate_projects(rows)
+        else:
+            valid, rejected = self.validate_profiles(rows)
+        errors.extend(rejected)
+        if valid and not self.dry_run:
+            with transaction.atomic():
+                if self.kind == 'projects':
+                    ProfessorProject.objects.bulk_create_projects(
+                        (ProfessorProject(**attrs) for _, attrs in valid), refresh=False,
+                    )
+                else:
+                    self.create_profiles(valid)
+        self.created += len(valid)
+        self.rejected += len(errors)
+        return sorted(errors, key=lambda error: error[0])
+
+    def validate(self, serializer, data: Row) -> Tuple[Optional[Row], Dict]:
+        try:
+            return serializer.run_validation(data), {}
+        except serializers.ValidationError as e:
+            return None, e.detail if isinstance(e.detail, dict) else {'non_field_errors': e.detail}
+
+    def validate_profiles(self, rows) -> Tuple[List[Tuple[Dict, Dict]], RowErrors]:
+        """((user attrs, profile attrs) of valid rows, errors of the rest)"""
+        usernames = [row.get('username') for _, row in rows]
+        taken = set(User.objects.filter(username__in=[u for u in usernames if u]).values_list('username', flat=True))
+        valid, errors = [], []
+        for line, row in rows:
+            user, user_errors = self.validate(self.user_serializer, clean_row(row, USER_COLUMNS))
+            profile, profile_errors = self.validate(self.profile_serializer, clean_row(row, PROFILE_COLUMNS[self.kind]))
+            row_errors = {**user_errors, **profile_errors}
+            if user and user['username'] in taken:
+                row_errors['username'] = ["A user with that username already exists."]
+            if row_errors:
+                errors.append((line, row_errors))
+                continue
+            taken.add(user['username'])
+            valid.append((user, profile))
+        return valid, errors
+
+    def validate_projects(self, rows) -> Tuple[List[Tuple[int, Dict]], RowErrors]:
+        usernames = {row.get('professor') for _, row in rows if row.get('professor')}
+        profiles = {
+            profile.user.username: profile
+            for profile in ProfessorProfile.objects.filter(user__username__in=usernames).select_related('user')
+        }
+        # Read by ProfileRelatedField instead of one lookup per row
+        self.profile_serializer.context['profiles'] = {profile.id: profile for profile in profiles.values()}
+        valid, errors = [], []
+        for line, row in rows:
+            data = clean_row(row, PROFILE_COLUMNS['projects'])
+            profile = profiles.get(data.pop('professor', None))
+            if profile is None:
+                errors.append((line, {'professor': ["No professor with that username."]}))
+                continue
+            attrs, row_errors = self.validate(self.profile_serializer, dict(data, profile=profile.id))
+            if row_errors:
+                errors.append((line, row_errors))
+            else:
+                valid.append((line, attrs))
+        return valid, errors
+
+    def create_profiles(self, valid: List[Tuple[Dict, Dict]]):
+        role = User.Role.STUDENT if self.kind == 'students' else User.Role.PROFESSOR
+        # Saved with bulk_create, so the Student/Professor post_save that creates profiles does not run
+        users = User.objects.bulk_create([
+            User(username=user['username'], email=user.get('email') or '', role=role,
+                 password=make_password(user['password']) if user.get('password') else self.unusable_password)
+            for user, _ in valid
+        ])
+        if self.kind == 'professors':
+            ProfessorProfile.objects.bulk_create(
+                [ProfessorProfile(user=user, **profile) for user, (_, profile) in zip(users, valid)],
+            )
+            return
+
+        skill_ids = Skill.objects.resolve_map([skill for _, profile in valid for skill in profile.get('skills') or []])
+        students = []
+        for user, (_, profile) in zip(users, valid):
+            keys = (normalize_skill(skill) for skill in profile.get('skills') or [])
+            students.append(StudentProfile(
+                user=user, skill_ids=sorted({skill_ids[key] for key in keys if key in skill_ids}), **profile,
+            ))
+        students = StudentProfile.objects.bulk_create(students)
+        StudentSkill.objects.bulk_create(
+            [StudentSkill(student=student, skill_id=skill_id) for student in students for skill_id in student.skill_ids],
+            batch_size=5000, ignore_conflicts=True,
+        )
@@ -0,0 +1,233 @@
+"""
+Vectorized batch scoring for student-project matching.
+
+Mirrors calculate_skill_coverage, calculate_availability_overlap,
+calculate_student_potential and calculate_match_score in matching.py, but scores
+one student against N projects (or one project against M students) in a single
+NumPy pass over columnar arrays. Skills are compared as canonical Skill ids
+(models.Skill), resolved once at write time, so no strings are touched here.
+Operation order follows the scalar functions exactly so the raw float results are
+identical for canonical skill lists; round with component_dict().
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+from datetime import date
+
+import numpy as np
+
+
+# Number of set bits for every byte value, used to popcount packed skill bitsets
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+COMPONENTS = ('score', 'fit', 'p_accept', 'perf', 'skill_coverage', 'text_similarity', 'availability', 'potential')
+
+
+class SkillVocabulary:
+    """Maps skill ids to bit positions and encodes skill id lists as packed bitsets"""
+
+    def __init__(self, skill_ids: Iterable[int] = ()):
+        self.index = {}
+        for skill_id in skill_ids:
+            self.index.setdefault(skill_id, len(self.index))
+
+    def __len__(self):
+        return len(self.index)
+
+    def encode(self, skill_lists: Sequence[Optional[List[int]]]) -> np.ndarray:
+        """Encode each skill id list as a row of packed bits (ids outside the vocabulary are ignored)"""
+        bits = np.zeros((len(skill_lists), max(len(self.index), 1)), dtype=bool)
+        for row, skill_ids in enumerate(skill_lists):
+            for skill_id in skill_ids or []:
+                col = self.index.get(skill_id)
+                if col is not None:
+                    bits[row, col] = True
+        return np.packbits(bits, axis=1)
+
+
+def popcount(packed: np.ndarray) -> np.ndarray:
+    """Count set bits per row of a packed bitset matrix"""
+    return _POPCOUNT[packed].sum(axis=1, dtype=np.int64)
+
+
+def date_ordinals(values: Iterable[Optional[date]]) -> np.ndarray:
+    """Dates as proleptic ordinals, 0 where missing"""
+    return np.fromiter((d.toordinal() if d else 0 for d in values), dtype=np.int64)
+
+
+def int_column(values: Iterable[Optional[int]]) -> np.ndarray:
+    """Integers as an int64 column, 0 where missing"""
+    return np.fromiter((int(v) if v else 0 for v in values), dtype=np.int64)
+
+
+def float_column(values: Iterable) -> np.ndarray:
+    """Numbers (including Decimals) as a float64 column, 0.0 where missing"""
+    return np.fromiter((float(v) if v else 0.0 for v in values), dtype=np.float64)
+
+
+def coverage_ratio(
+    shared: np.ndarray,
+    n_required: np.ndarray,
+    n_student: np.ndarray,
+) -> np.ndarray:
+    """Vectorized calculate_skill_coverage from intersection and list sizes"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = shared / n_required
+    return np.where(n_required == 0, 1.0, np.where(n_student == 0, 0.0, ratio))
+
+
+def availability_overlap(
+    student_start: np.ndarray,
+    student_end: np.ndarray,
+    project_start: np.ndarray,
+    project_end: np.ndarray,
+    student_hrs: np.ndarray,
+    project_hrs: np.ndarray,
+) -> np.ndarray:
+    """Vectorized calculate_availability_overlap over ordinal/int columns (0 = missing)"""
+    # Date overlap
+    dates_known = (student_start != 0) & (student_end != 0) & (project_start != 0) & (project_end != 0)
+    overlap_start = np.maximum(student_start, project_start)
+    overlap_end = np.minimum(student_end, project_end)
+    overlap_days = overlap_end - overlap_start + 1
+    total_days = np.maximum(np.maximum(student_end, project_end) - np.minimum(student_start, project_start) + 1, 1)
+    date_overlap = np.where(
+        ~dates_known, 0.5,
+        np.where(overlap_end <= overlap_start, 0.0, overlap_days / total_days),
+    )
+
+    # Hours overlap
+    hrs_known = (student_hrs > 0) & (project_hrs > 0)
+    diff = np.abs(student_hrs - project_hrs)
+    longest = np.where(hrs_known, np.maximum(student_hrs, project_hrs), 1)
+    hrs_overlap = np.where(hrs_known, np.maximum(0.0, 1.0 - diff / longest), 0.5)
+
+    return 0.6 * date_overlap + 0.4 * hrs_overlap
+
+
+def student_potential(gpa: np.ndarray, reliability: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_student_potential (0.0 = missing)"""
+    gpa_norm = np.where(gpa > 0, gpa / 4.0, 0.5)
+    reliability_norm = np.where(reliability != 0, reliability, 0.5)
+    return 0.6 * gpa_norm + 0.4 * reliability_norm
+
+
+def match_scores(
+    skill_coverage: np.ndarray,
+    availability: np.ndarray,
+    potential: np.ndarray,
+    text_similarity: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_match_score; returns unrounded component arrays.
+    NaN (or missing) text similarity falls back to skill coverage, like the scalar version.
+    """
+    if text_similarity is None:
+        text_similarity = np.nan
+    skill_coverage, availability, potential, text_similarity = np.broadcast_arrays(
+        skill_coverage, availability, potential, text_similarity,
+    )
+    text_similarity = np.where(np.isnan(text_similarity), skill_coverage, text_similarity)
+
+    fit = 0.35 * text_similarity + 0.50 * skill_coverage + 0.15 * availability
+    p_accept = 0.65 * text_similarity + 0.35 * availability
+    perf = 0.6 * potential + 0.4 * skill_coverage
+    score = 0.35 * p_accept + 0.45 * perf + 0.20 * fit
+
+    # Apply coverage gate (minimum skill coverage required)
+    score = np.where(skill_coverage < 0.3, score * 0.5, np.where(skill_coverage < 0.5, score * 0.85, score))
+
+    return {
+        'score': score,
+        'fit': fit,
+        'p_accept': p_accept,
+        'perf': perf,
+        'skill_coverage': skill_coverage,
+        'text_similarity': text_similarity,
+        'availability': availability,
+        'potential': potential,
+    }
+
+
+def score_student_projects(
+    student,
+    projects: Sequence,
+    text_similarity: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Score one student against a sequence of projects.
+    `student` needs skill_ids, avail_start, avail_end, hrs_per_week, gpa and reliability;
+    each project needs skill_ids, start_date, end_date and hrs_per_week.
+    `text_similarity` is aligned with `projects` (see text_index.project_similarity).
+    """
+    student_skills = student.skill_ids or []
+    # Only the student's own skills can intersect, so they form the whole vocabulary
+    vocabulary = SkillVocabulary(student_skills)
+    shared = popcount(vocabulary.encode([p.skill_ids for p in projects]))
+    n_required = np.fromiter((len(p.skill_ids or []) for p in projects), dtype=np.int64, count=len(projects))
+
+    coverage = coverage_ratio(shared, n_required, np.int64(len(student_skills)))
+    availability = availability_overlap(
+        np.int64(student.avail_start.toordinal() if student.avail_start else 0),
+        np.int64(student.avail_end.toordinal() if student.avail_end else 0),
+        date_ordinals(p.start_date for p in projects),
+        date_ordinals(p.end_date for p in projects),
+        np.int64(student.hrs_per_week or 0),
+        int_column(p.hrs_per_week for p in projects),
+    )
+    potential = student_potential(float_column([student.gpa]), float_column([student.reliability]))
+    return match_scores(coverage, availability, potential, text_similarity)
+
+
+def score_project_students(
+    project,
+    students: Sequence,
+    text_similarity: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Score one project against a sequence of students.
+    Attribute requirements are the same as score_student_projects;
+    `text_similarity` is aligned with `students`.
+    """
+    required_ids = project.skill_ids or []
+    # Only the project's required skills can intersect, so they form the whole vocabulary
+    vocabulary = SkillVocabulary(required_ids)
+    shared = popcount(vocabulary.encode([s.skill_ids for s in students]))
+    n_student = np.fromiter((len(s.skill_ids or []) for s in students), dtype=np.int64, count=len(students))
+
+    coverage = coverage_ratio(shared, np.int64(len(required_ids)), n_student)
+    availability = availability_overlap(
+        date_ordinals(s.avail_start for s in students),
+        date_ordinals(s.avail_end for s in students),
+        np.int64(project.start_date.toordinal() if project.start_date else 0),
+        np.int64(project.end_date.toordinal() if project.end_date else 0),
+        int_column(s.hrs_per_week for s in students),
+        np.int64(project.hrs_per_week or 0),
+    )
+    potential = student_potential(
+        float_column(s.gpa for s in students),
+        float_column(s.reliability for s in students),
+    )
+    return match_scores(coverage, availability, potential, text_similarity)
+
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k best rows, ordered by score descending then id ascending.
+    Uses argpartition so the cost is O(N + k log k) rather than a full sort.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    key = -scores
+    if k < n:
+        # Everything at least as good as the k-th best, so ties at the boundary resolve by id
+        kth = np.partition(key, k - 1)[k - 1]
+        rows = np.flatnonzero(key <= kth)
+    else:
+        rows = np.arange(n)
+    ranked = rows[np.lexsort((ids[rows], key[rows]))]
+    return ranked[:k]
+
+
+def component_dict(scores: Dict[str, np.ndarray], i: int) -> Dict:
+    """Rounded match components for row i, in the same shape calculate_match_score returns"""
+    return {name: round(float(scores[name][i]), 4) for name in COMPONENTS}
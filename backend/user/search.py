@@ -0,0 +1,211 @@
+"""
+Filtering, full-text search and sorting for the project browse endpoint.
+
+filter_projects() applies the ?modality=&location=&university=&min_hours=&max_hours=
+&available_from=&available_to=&skill=&q=&ordering= parameters to a ProfessorProject
+queryset. The structured filters are served by the indexes declared on
+ProfessorProject; free text goes through a database full-text index:
+
+- SQLite: an external-content FTS5 table over title and description, kept current
+  by triggers, so bulk inserts and raw updates are indexed too.
+- PostgreSQL: a GIN index on the English tsvector of title and description.
+- Anything else (or SQLite built without FTS5): case-insensitive substring matches.
+
+install_project_search() creates the index for the current database. Django rebuilds
+SQLite tables on some schema changes, which drops their triggers, so migrations that
+alter ProfessorProject call it again afterwards; it is idempotent.
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.db import connection, OperationalError
+from django.db.models import BooleanField, Exists, FloatField, OuterRef, Q
+from django.db.models.expressions import RawSQL
+
+from .models import ProjectSkill, Skill
+from .skills import normalize_skill
+
+
+FTS_TABLE = 'user_project_fts'
+PROJECT_TABLE = 'user_professorproject'
+PG_INDEX = 'user_project_search'
+PG_DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, description, content='{PROJECT_TABLE}', content_rowid='id')",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {PROJECT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {PROJECT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, description ON {PROJECT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Index whatever the table already holds
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+    'start_date': ('start_date', 'id'),
+    '-start_date': ('-start_date', 'id'),
+    'hours': ('hrs_per_week', 'id'),
+    '-hours': ('-hrs_per_week', 'id'),
+    'title': ('title', 'id'),
+    'relevance': ('-search_rank', '-created_at', '-id'),
+}
+
+_TOKEN = re.compile(r'\w+')
+# Databases (by NAME) whose FTS5 table was found; checked once per process
+_fts_databases: Dict[str, bool] = {}
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def install_project_search(schema_editor) -> None:
+    """Create (or repair) the full-text index for the database behind `schema_editor`"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            for sql in SQLITE_FTS_SQL:
+                schema_editor.execute(sql)
+        except OperationalError:
+            pass  # SQLite without FTS5; searches fall back to substring matches
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {PROJECT_TABLE} USING GIN ({PG_DOCUMENT})")
+
+
+def uninstall_project_search(schema_editor) -> None:
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+def _sqlite_fts() -> bool:
+    name = str(connection.settings_dict['NAME'])
+    if name not in _fts_databases:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_databases[name] = cursor.fetchone() is not None
+    return _fts_databases[name]
+
+
+def search_projects(queryset, text: str):
+    """
+    Projects whose title or description match every word of `text` (as a prefix on
+    SQLite), annotated with `search_rank` (higher is better) where the database can rank
+    """
+    words = _TOKEN.findall(text.lower())
+    if not words:
+        return queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+    if connection.vendor == 'sqlite' and _sqlite_fts():
+        match = ' '.join(f'"{word}"*' for word in words)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]),
+        ).annotate(search_rank=RawSQL(
+            f"(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"AND {FTS_TABLE}.rowid = {PROJECT_TABLE}.id)",
+            [match], output_field=FloatField(),
+        ))
+
+    if connection.vendor == 'postgresql':
+        query = ' '.join(words)
+        return queryset.alias(search_match=RawSQL(
+            f"{PG_DOCUMENT} @@ plainto_tsquery('english', %s)", [query], output_field=BooleanField(),
+        )).filter(search_match=True).annotate(search_rank=RawSQL(
+            f"ts_rank({PG_DOCUMENT}, plainto_tsquery('english', %s))", [query], output_field=FloatField(),
+        ))
+
+    for word in words:
+        queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+    return queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+
+def _int(params, name: str) -> Optional[int]:
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidFilter(f"{name} must be an integer")
+
+
+def _date(params, name: str) -> Optional[date]:
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidFilter(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def _list(params, name: str) -> List[str]:
+    """Values of a repeatable, comma-separable parameter"""
+    return [value.strip() for raw in params.getlist(name) for value in raw.split(',') if value.strip()]
+
+
+def filter_projects(queryset, params):
+    """
+    Apply the browse filters in `params` (a QueryDict) to a ProfessorProject queryset.
+    Hours and date filters only keep projects that state hours or dates. Raises
+    InvalidFilter for malformed values.
+    """
+    modalities = _list(params, 'modality')
+    if modalities:
+        queryset = queryset.filter(modality__in=modalities)
+    if params.get('location'):
+        queryset = queryset.filter(location__icontains=params['location'])
+    if params.get('university'):
+        queryset = queryset.filter(profile__university__icontains=params['university'])
+
+    min_hours, max_hours = _int(params, 'min_hours'), _int(params, 'max_hours')
+    if min_hours is not None:
+        queryset = queryset.filter(hrs_per_week__gte=min_hours)
+    if max_hours is not None:
+        queryset = queryset.filter(hrs_per_week__lte=max_hours)
+
+    # Projects running at some point inside the [available_from, available_to] window
+    available_from, available_to = _date(params, 'available_from'), _date(params, 'available_to')
+    if available_from and available_to and available_from > available_to:
+        raise InvalidFilter("available_from must not be after available_to")
+    if available_from:
+        queryset = queryset.filter(end_date__gte=available_from)
+    if available_to:
+        queryset = queryset.filter(start_date__lte=available_to)
+
+    # Every listed skill must be required; skills nobody uses match nothing
+    for key in {normalize_skill(skill) for skill in _list(params, 'skill')} - {''}:
+        skill_ids = Skill.objects.resolve_ids([key], create=False)
+        if not skill_ids:
+            return queryset.none()
+        queryset = queryset.filter(Exists(ProjectSkill.objects.filter(project=OuterRef('pk'), skill_id=skill_ids[0])))
+
+    text = params.get('q', '').strip()
+    if text:
+        queryset = search_projects(queryset, text)
+
+    ordering = params.get('ordering') or ('relevance' if text else 'newest')
+    if ordering not in ORDERINGS:
+        raise InvalidFilter(f"ordering must be one of: {', '.join(ORDERINGS)}")
+    if ordering == 'relevance' and not text:
+        raise InvalidFilter("ordering=relevance needs a q search")
+    return queryset.order_by(*ORDERINGS[ordering])
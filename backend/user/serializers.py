@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
-from .models import User, StudentProfile, ProfessorProfile, ProfessorProject
+from .media import PROFILE_IMAGE_FIELDS, thumbnail_urls
+from .models import User, StudentProfile, ProfessorProfile, ProfessorProject, Swipe
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,6 +11,13 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
+class ImportUserSerializer(serializers.Serializer):
+    """Account columns of a bulk import row (profile_io.py); usernames are checked for clashes per batch"""
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(required=False, write_only=True)
+
+
 class StudentProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentProfile
@@ -29,6 +39,7 @@ class StudentProfileSerializer(serializers.ModelSerializer):
             'summary',
             'courses',
             'skills',
+            'skill_ids',
             'skills_text',
             'gpa',
             'hrs_per_week',
@@ -36,6 +47,8 @@ class StudentProfileSerializer(serializers.ModelSerializer):
             'avail_end',
             'reliability',
         )
+        # Resolved from `skills` when the profile is saved
+        read_only_fields = ('skill_ids',)
 
 
 class ProfessorProfileSerializer(serializers.ModelSerializer):
@@ -50,6 +63,7 @@ class ProfessorProfileSerializer(serializers.ModelSerializer):
     company_office_second_image = serializers.FileField(source='lab_second_image', allow_empty_file=True, required=False)
     company_office_third_image = serializers.FileField(source='lab_third_image', allow_empty_file=True, required=False)
     job_internship_vancancy = serializers.CharField(source='position_description', allow_blank=True, allow_null=True, required=False)
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = ProfessorProfile
@@ -57,25 +71,65 @@ class ProfessorProfileSerializer(serializers.ModelSerializer):
             # New canonical fields
             'id', 'user', 'professor_name', 'university', 'description', 'website',
             'profile_image', 'lab_first_image', 'lab_second_image', 'lab_third_image', 'position_description',
-            'projects',
+            'projects', 'thumbnails',
             # Backward-compatible aliases used by current frontend
             'company_name', 'company_location', 'company_description', 'company_website',
             'company_logo', 'company_office_first_image', 'company_office_second_image', 'company_office_third_image',
             'job_internship_vancancy',
         )
 
+    def get_thumbnails(self, profile):
+        """WebP thumbnail URLs by size for each image that has them"""
+        request = self.context.get('request')
+        urls = {field: thumbnail_urls(profile, field, request) for field in PROFILE_IMAGE_FIELDS}
+        return {field: sizes for field, sizes in urls.items() if sizes}
+
+
+class ProfileRelatedField(serializers.PrimaryKeyRelatedField):
+    """Takes profiles preloaded by ProfessorProjectListSerializer instead of one query per row"""
+
+    def to_internal_value(self, data):
+        profiles = self.context.get('profiles')
+        if profiles is not None:
+            try:
+                return profiles[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class ProfessorProjectListSerializer(serializers.ListSerializer):
+    """Validates a list of projects and inserts it with one bulk_create (ProjectManager.bulk_create_projects)"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = set()
+            for row in data:
+                try:
+                    ids.add(int(row.get('profile')))
+                except (AttributeError, TypeError, ValueError):
+                    pass
+            self.context['profiles'] = ProfessorProfile.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        return ProfessorProject.objects.bulk_create_projects(ProfessorProject(**attrs) for attrs in validated_data)
+
 
 class ProfessorProjectSerializer(serializers.ModelSerializer):
+    profile = ProfileRelatedField(queryset=ProfessorProfile.objects.all())
     professor_name = serializers.CharField(source='profile.professor_name', read_only=True)
     university = serializers.CharField(source='profile.university', read_only=True)
     profile_image = serializers.FileField(source='profile.profile_image', read_only=True)
-    
+    profile_thumbnails = serializers.SerializerMethodField()
+
     class Meta:
         model = ProfessorProject
         fields = (
             'id', 'profile', 'title', 'description', 'modality', 'location', 'created_at',
             # Algorithm fields
             'required_skills',
+            'skill_ids',
             'hrs_per_week',
             'start_date',
             'end_date',
@@ -85,4 +139,43 @@ class ProfessorProjectSerializer(serializers.ModelSerializer):
             'professor_name',
             'university',
             'profile_image',
-        )
\ No newline at end of file
+            'profile_thumbnails',
+        )
+        # Resolved from `required_skills` when the project is saved
+        read_only_fields = ('skill_ids',)
+        list_serializer_class = ProfessorProjectListSerializer
+
+    def get_profile_thumbnails(self, project):
+        """WebP thumbnail URLs of the profile image by size; null until they are generated"""
+        return thumbnail_urls(project.profile, 'profile_image', self.context.get('request'))
+
+
+class SwipeSerializer(serializers.ModelSerializer):
+    project = serializers.PrimaryKeyRelatedField(queryset=ProfessorProject.objects.all())
+
+    class Meta:
+        model = Swipe
+        fields = ('id', 'project', 'direction', 'client_id', 'created_at')
+        read_only_fields = ('id', 'created_at')
+        # Re-swiping a project updates the existing row instead of failing uniqueness
+        validators = []
+
+
+class SwipeEventSerializer(serializers.Serializer):
+    """One swipe inside a batch upload; projects are checked in bulk by the view"""
+    client_id = serializers.CharField(max_length=64)
+    # Bounded to the database's integer range; larger ids overflow the lookup
+    project = serializers.IntegerField(min_value=1, max_value=2 ** 63 - 1)
+    direction = serializers.ChoiceField(choices=Swipe.Direction.choices)
+
+
+class SwipeBatchSerializer(serializers.Serializer):
+    swipes = SwipeEventSerializer(many=True, allow_empty=False)
+    limit = serializers.IntegerField(required=False, default=20, min_value=0)
+    cursor = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_swipes(self, swipes):
+        max_batch = getattr(settings, 'SWIPE_BATCH_MAX', 500)
+        if len(swipes) > max_batch:
+            raise serializers.ValidationError(f"At most {max_batch} swipes per batch.")
+        return swipes
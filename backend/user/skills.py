@@ -0,0 +1,46 @@
+"""
+Skill normalization helpers shared by the skill vocabulary (models.Skill) and the matcher.
+"""
+from typing import Dict, Iterable, List
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a single skill string for comparison (case and whitespace insensitive)"""
+    return ' '.join(str(skill).lower().split())
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """Normalize a list of skills, dropping blanks and duplicates (order preserved)"""
+    seen = set()
+    result = []
+    for skill in skills or []:
+        normalized = normalize_skill(skill)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            result.append(normalized)
+    return result
+
+
+# Common spellings folded onto one canonical skill. Keys are canonical names; the
+# canonical name's own normalized form is always an alias too.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    'Python': ['python3', 'py'],
+    'JavaScript': ['js', 'javascript es6', 'ecmascript'],
+    'TypeScript': ['ts'],
+    'C++': ['cpp', 'c plus plus'],
+    'C#': ['csharp', 'c sharp'],
+    'Go': ['golang'],
+    'Node.js': ['nodejs', 'node', 'node js'],
+    'React': ['reactjs', 'react.js', 'react js'],
+    'PostgreSQL': ['postgres', 'psql'],
+    'Kubernetes': ['k8s'],
+    'Machine Learning': ['ml'],
+    'Artificial Intelligence': ['ai'],
+    'Deep Learning': ['dl'],
+    'NLP': ['natural language processing'],
+    'Computer Vision': ['cv'],
+    'Statistics': ['stats'],
+    'Data Analysis': ['data analytics'],
+    'Data Visualization': ['data visualisation', 'dataviz'],
+    'Microsoft Excel': ['excel', 'ms excel'],
+}
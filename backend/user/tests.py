@@ -1,3 +1,1520 @@
-from django.test import TestCase
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
+
+from .matching import (
+    calculate_skill_coverage, calculate_availability_overlap,
+    calculate_student_potential, calculate_match_score,
+    get_student_matches, get_project_matches,
+)
+from .models import (
+    User, Student, StudentProfile, Professor, ProfessorProfile, ProfessorProject, Skill, ProjectSkill, StudentSkill,
+    MatchScore, Assignment, ProjectCongestion, Job, Swipe,
+)
+from .assignment import auction, solve_assignments
+from .authentication import check_token_cache
+from .feature_store import feature_store
+from .jobs import claim, enqueue, run_job, run_pending
+from .match_cache import (
+    bump_catalog_version, bump_student_pool_version, bump_student_version, cache_stats, reset_cache_stats,
+)
+from .match_store import rebuild_all_scores, refresh_project_scores, refresh_student_scores
+from .pagination import decode_cursor, encode_cursor, InvalidCursor
+from .scoring import score_student_projects, score_project_students, component_dict, top_k
+from .skills import normalize_skills
+from .text_index import build, load, upsert, PROJECTS, STUDENTS
+from . import ann_index, worker
+
+
+SKILLS = ['Python', 'python', ' Django ', 'SQL', 'React', 'ml', 'Java', 'C++', 'statistics', '']
+# Stand-in Skill ids for the fixtures, which never touch the database
+SKILL_IDS = {skill: i + 1 for i, skill in enumerate(normalize_skills(SKILLS))}
+# Saves append to the text index, so database tests keep it out of the source tree
+TEXT_INDEX = tempfile.TemporaryDirectory(prefix='text-index-')
+UPLOAD_STAGING = tempfile.TemporaryDirectory(prefix='upload-staging-')
+# Likewise the file-based match and token caches, which every test in the module shares
+MATCH_CACHE = tempfile.TemporaryDirectory(prefix='match-cache-')
+TOKEN_CACHE = tempfile.TemporaryDirectory(prefix='token-cache-')
+CACHE_SETTINGS = override_settings(CACHES={
+    **settings.CACHES,
+    'matches': {**settings.CACHES['matches'], 'LOCATION': MATCH_CACHE.name},
+    'tokens': {**settings.CACHES['tokens'], 'LOCATION': TOKEN_CACHE.name},
+})
+
+
+def setUpModule():
+    CACHE_SETTINGS.enable()
+
+
+def tearDownModule():
+    CACHE_SETTINGS.disable()
+
+
+def scalar_match(student, project, text_similarity=None):
+    """Reference result from the per-pair scalar functions"""
+    student_skills = student.skills or []
+    skill_coverage = calculate_skill_coverage(student_skills, project.required_skills or [])
+    availability = calculate_availability_overlap(
+        student.avail_start, student.avail_end,
+        project.start_date, project.end_date,
+        student.hrs_per_week or 0, project.hrs_per_week or 0,
+    )
+    potential = calculate_student_potential(
+        float(student.gpa) if student.gpa else None,
+        float(student.reliability) if student.reliability else None,
+    )
+    return calculate_match_score(student, project, skill_coverage, availability, potential, text_similarity)
+
+
+def with_skill_ids(obj, field):
+    """
+    Canonicalize a fixture's skill list the way saving does: duplicates collapse and
+    skill_ids holds one stand-in id per distinct skill.
+    """
+    skills = normalize_skills(getattr(obj, field))
+    setattr(obj, field, skills)
+    obj.skill_ids = sorted(SKILL_IDS[skill] for skill in skills)
+    return obj
+
+
+def random_dates(rng):
+    if rng.random() < 0.2:
+        return None, None
+    start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))
+    return start, start + timedelta(days=rng.randint(-5, 200))
+
+
+def random_student(rng):
+    avail_start, avail_end = random_dates(rng)
+    return with_skill_ids(SimpleNamespace(
+        skills=rng.sample(SKILLS, rng.randint(0, 5)),
+        avail_start=avail_start,
+        avail_end=avail_end,
+        hrs_per_week=rng.choice([None, 0, -3, 5, 10, 20, 40]),
+        gpa=rng.choice([None, Decimal('0.00'), Decimal('2.75'), Decimal('3.70'), Decimal('4.00')]),
+        reliability=rng.choice([None, Decimal('0.00'), Decimal('0.35'), Decimal('0.90'), Decimal('1.00')]),
+    ), 'skills')
+
+
+def random_project(rng):
+    start_date, end_date = random_dates(rng)
+    required = rng.sample(SKILLS, rng.randint(0, 4))
+    if required and rng.random() < 0.2:
+        required.append(required[0].upper())  # collapses into one skill when canonicalized
+    return with_skill_ids(SimpleNamespace(
+        required_skills=required,
+        start_date=start_date,
+        end_date=end_date,
+        hrs_per_week=rng.choice([None, 0, 5, 15, 20, 60]),
+    ), 'required_skills')
+
+
+class BatchScoringParityTests(SimpleTestCase):
+    """The vectorized engine must reproduce the scalar scoring functions exactly"""
+
+    def setUp(self):
+        rng = random.Random(1234)
+        self.students = [random_student(rng) for _ in range(60)]
+        self.projects = [random_project(rng) for _ in range(80)]
+
+    def test_student_against_projects(self):
+        for student in self.students:
+            scores = score_student_projects(student, self.projects)
+            for i, project in enumerate(self.projects):
+                self.assertEqual(component_dict(scores, i), scalar_match(student, project))
+
+    def test_project_against_students(self):
+        for project in self.projects:
+            scores = score_project_students(project, self.students)
+            for i, student in enumerate(self.students):
+                self.assertEqual(component_dict(scores, i), scalar_match(student, project))
+
+    def test_unrounded_scores_match(self):
+        student = self.students[0]
+        scores = score_student_projects(student, self.projects)
+        for i, project in enumerate(self.projects):
+            skill_coverage = calculate_skill_coverage(student.skills, project.required_skills)
+            self.assertEqual(float(scores['skill_coverage'][i]), skill_coverage)
+
+    def test_coverage_gate(self):
+        student = with_skill_ids(SimpleNamespace(
+            skills=['python'], avail_start=None, avail_end=None,
+            hrs_per_week=None, gpa=None, reliability=None,
+        ), 'skills')
+        projects = [
+            with_skill_ids(SimpleNamespace(
+                required_skills=skills, start_date=None, end_date=None, hrs_per_week=None,
+            ), 'required_skills')
+            for skills in (['python'], ['python', 'sql'], ['python', 'sql', 'ml'], ['java'], [])
+        ]
+        scores = score_student_projects(student, projects)
+        for i, project in enumerate(projects):
+            self.assertEqual(component_dict(scores, i), scalar_match(student, project))
+
+    def test_text_similarity(self):
+        rng = np.random.default_rng(5)
+        student = self.students[1]
+        text_similarity = rng.random(len(self.projects))
+        text_similarity[::3] = np.nan  # no text on one side: skill coverage stands in
+        scores = score_student_projects(student, self.projects, text_similarity)
+        for i, project in enumerate(self.projects):
+            skill_coverage = calculate_skill_coverage(student.skills, project.required_skills)
+            expected = scalar_match(student, project, float(text_similarity[i]))
+            self.assertEqual(component_dict(scores, i), expected)
+            if np.isnan(text_similarity[i]):
+                self.assertEqual(expected['text_similarity'], round(skill_coverage, 4))
+
+    def test_empty_batch(self):
+        scores = score_student_projects(self.students[0], [])
+        self.assertEqual(len(scores['score']), 0)
+        scores = score_project_students(self.projects[0], [])
+        self.assertEqual(len(scores['score']), 0)
+
+
+class TopKTests(SimpleTestCase):
+
+    def test_matches_full_sort(self):
+        rng = np.random.default_rng(7)
+        scores = rng.choice([0.1, 0.25, 0.5, 0.75, 0.9], size=500)
+        ids = rng.permutation(500) + 1
+        expected = sorted(range(500), key=lambda i: (-scores[i], ids[i]))
+        for k in (0, 1, 7, 100, 500, 600):
+            self.assertEqual(list(top_k(scores, ids, k)), expected[:k])
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class ListEndpointQueryCountTests(TestCase):
+    """List endpoints must run a fixed number of queries however many rows they return"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = []
+        for i in range(4):
+            student = Student.objects.create_user(username=f'student{i}', password='pw')
+            profile = StudentProfile.objects.get(user=student)
+            profile.skills = ['python', 'sql'][:i % 2 + 1]
+            profile.save()
+            cls.students.append(student)
+        cls.projects = []
+        for i in range(3):
+            professor = Professor.objects.create_user(username=f'professor{i}', password='pw')
+            profile = ProfessorProfile.objects.get(user=professor)
+            for j in range(3):
+                cls.projects.append(ProfessorProject.objects.create(
+                    profile=profile, title=f'Project {i}.{j}', required_skills=['python'] if j else [],
+                ))
+        cls.professor_profile = profile
+        run_pending()
+
+    def setUp(self):
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+        feature_store.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.students[0])
+
+    def assert_list(self, url, queries, count):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['matches'] if isinstance(data, dict) else data), count)
+
+    # The catalog lists run one extra aggregate query for their ETag (conditional.py)
+    def test_all_projects(self):
+        self.assert_list('/api/user/projects/', 2, 9)
+
+    def test_professor_jobs(self):
+        self.assert_list('/api/user/professor/jobs/', 3, 3)
+
+    def test_professor_projects(self):
+        self.assert_list('/api/user/professor/projects/', 1, 9)
+        self.assert_list(f'/api/user/professor/{self.professor_profile.id}/projects/', 1, 3)
+
+    def test_streamed_lists_match_buffered(self):
+        for url in ('/api/user/projects/', '/api/user/professor/jobs/'):
+            expected = self.client.get(url).json()
+            with override_settings(STREAM_CHUNK_SIZE=2):
+                response = self.client.get(url, {'stream': 'json'})
+                self.assertTrue(response.streaming)
+                self.assertEqual(json.loads(b''.join(response.streaming_content)), expected)
+                response = self.client.get(url, {'stream': 'ndjson'})
+                self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+                lines = b''.join(response.streaming_content).decode().splitlines()
+                self.assertEqual([json.loads(line) for line in lines], expected)
+        self.assertEqual(self.client.get('/api/user/projects/', {'stream': 'xml'}).status_code, 400)
+
+    async def test_streamed_list_under_asgi(self):
+        response = await self.async_client.get('/api/user/projects/', {'stream': 'json'})
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)), 9)
+
+    def assert_revalidates(self, url, change, queries=0):
+        """A repeat GET with the ETag is a 304 that runs only the validator `queries` until `change` runs"""
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_catalog_lists(self):
+        project = self.projects[0]
+
+        def edit_project():
+            project.title = 'Renamed'
+            project.save()
+        self.assert_revalidates('/api/user/projects/', edit_project, queries=1)
+        self.assert_revalidates('/api/user/projects/?ordering=title', lambda: self.projects[1].delete(), queries=1)
+        self.assert_revalidates('/api/user/professor/jobs/', lambda: self.professor_profile.save(), queries=1)
+        response = self.client.get('/api/user/professor/jobs/')
+        self.assertEqual(
+            self.client.get('/api/user/professor/jobs/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+            304,
+        )
+
+    def test_conditional_match_lists(self):
+        def swipe():
+            self.client.post('/api/user/student/swipes/', {'project': self.projects[2].id, 'direction': 'LEFT'})
+            # Bumped on commit, which TestCase never reaches
+            bump_student_version(self.students[0].id)
+        self.assert_revalidates('/api/user/student/matches/', swipe)
+        self.assert_revalidates(f'/api/user/project/{self.projects[1].id}/matches/', bump_student_pool_version)
+
+    def test_student_matches(self):
+        self.assert_list('/api/user/student/matches/', 2, 9)
+        # Served from the cache on reload
+        self.assert_list('/api/user/student/matches/', 1, 9)
+
+    def test_project_matches(self):
+        self.assert_list(f'/api/user/project/{self.projects[1].id}/matches/', 1, 4)
+
+    def test_live_matchers(self):
+        # The first call loads the feature store, later ones only look up the profile, swipes and winners
+        for queries in (4, 3):
+            with self.assertNumQueries(queries):
+                self.assertEqual(len(get_student_matches(self.students[0].id)), 9)
+        for queries in (3, 2):
+            with self.assertNumQueries(queries):
+                self.assertEqual(len(get_project_matches(self.projects[1].id)), 4)
+
+    def test_feature_store_reloads_on_version_bump(self):
+        store = feature_store.projects()
+        self.assertEqual(len(store), 9)
+        self.assertIs(feature_store.projects(), store)
+        ProfessorProject.objects.filter(id=self.projects[0].id).update(is_open=False)
+        bump_catalog_version()
+        self.assertNotIn(self.projects[0].id, feature_store.projects().records)
+        self.assertEqual(len(get_student_matches(self.students[0].id)), 8)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class MatchStoreTests(TestCase):
+    """Stored MatchScore rows follow the saves of the students and projects they pair"""
+
+    def setUp(self):
+        self.profile = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='professor', password='pw'))
+        self.python = self.make_project('Python', ['python'])
+        self.sql = self.make_project('SQL', ['sql'])
+        self.student = StudentProfile.objects.get(user=Student.objects.create_user(username='ada', password='pw'))
+        self.student.skills = ['python']
+        self.student.save()
+        run_pending()
+
+    def make_project(self, title, skills):
+        return ProfessorProject.objects.create(profile=self.profile, title=title, required_skills=skills)
+
+    def pairs(self):
+        return set(MatchScore.objects.values_list('student_id', 'project_id'))
+
+    def test_saving_a_student_rewrites_their_rows(self):
+        self.assertEqual(self.pairs(), {(self.student.id, self.python.id)})
+        self.student.skills = ['sql']
+        self.student.save()
+        run_pending()
+        self.assertEqual(self.pairs(), {(self.student.id, self.sql.id)})
+
+    def test_saving_a_project_rewrites_its_rows(self):
+        self.sql.required_skills = ['python', 'sql']
+        self.sql.save()
+        run_pending()
+        self.assertEqual(self.pairs(), {(self.student.id, self.python.id), (self.student.id, self.sql.id)})
+
+        # Closing a project removes its rows
+        self.python.is_open = False
+        self.python.save()
+        run_pending()
+        self.assertEqual(self.pairs(), {(self.student.id, self.sql.id)})
+
+    def test_refresh_does_not_trust_a_stale_feature_store(self):
+        feature_store.projects()
+        # Committed elsewhere without the version bump reaching this process
+        added = self.make_project('Django', ['python'])
+        refresh_student_scores(self.student)
+        self.assertIn((self.student.id, added.id), self.pairs())
+
+    def test_refresh_retrieves_from_the_ann_index_once_active(self):
+        self.make_project('Python again', ['python'])
+        run_pending()
+        self.assertEqual(len(self.pairs()), 2)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(ANN_INDEX_DIR=directory.name, MATCH_ANN_MIN_PROJECTS=1, MATCH_ANN_CANDIDATES=1):
+            ann_index.rebuild_ann_index()
+            refresh_student_scores(self.student)
+            self.assertEqual(len(self.pairs()), 1)
+            # Projects created since the build are candidates until the next one
+            added = self.make_project('Robotics', ['python'])
+            refresh_student_scores(self.student)
+            pairs = self.pairs()
+            self.assertEqual(len(pairs), 2)
+            self.assertIn((self.student.id, added.id), pairs)
+            rebuild_all_scores()
+            self.assertEqual(self.pairs(), pairs)
+
+    @override_settings(MATCH_FALLBACK_LIMIT=1)
+    def test_skill_less_projects_follow_the_fallback_window(self):
+        older = self.make_project('Anything', [])
+        run_pending()
+        self.assertIn((self.student.id, older.id), self.pairs())
+
+        # Only the newest skill-less project is scored against everyone
+        newer = self.make_project('Anything else', [])
+        run_pending()
+        expected = {(self.student.id, self.python.id), (self.student.id, newer.id)}
+        self.assertEqual(self.pairs(), expected)
+
+        # Refreshing the older one does not bring it back, and a full rebuild agrees
+        older.save()
+        run_pending()
+        self.assertEqual(self.pairs(), expected)
+        rebuild_all_scores()
+        self.assertEqual(self.pairs(), expected)
+
+    def test_rows_are_capped_per_student(self):
+        for title, skills in (('Data', ['python', 'sql']), ('Web', ['python', 'react']), ('ML', ['python', 'ml'])):
+            self.make_project(title, skills)
+        self.student.skills = ['python', 'sql']
+        self.student.save()
+        run_pending()
+        ranked = [
+            project_id for project_id, _ in sorted(
+                MatchScore.objects.values_list('project_id', 'rank_score'), key=lambda row: (-row[1], row[0]),
+            )
+        ]
+        self.assertEqual(len(ranked), 5)
+
+        with override_settings(MATCH_STORE_DEPTH=2):
+            refresh_student_scores(self.student)
+            self.assertEqual(self.pairs(), {(self.student.id, project_id) for project_id in ranked[:2]})
+            rebuild_all_scores()
+            self.assertEqual(self.pairs(), {(self.student.id, project_id) for project_id in ranked[:2]})
+
+            # A project refresh only displaces the student's lowest row, and only if it beats it
+            refresh_project_scores(ProfessorProject.objects.get(id=ranked[-1]))
+            self.assertEqual(len(self.pairs()), 2)
+            MatchScore.objects.filter(project_id=ranked[1]).delete()
+            refresh_project_scores(ProfessorProject.objects.get(id=ranked[-1]))
+            self.assertEqual(self.pairs(), {(self.student.id, ranked[0]), (self.student.id, ranked[-1])})
+            refresh_project_scores(ProfessorProject.objects.get(id=ranked[1]))
+            self.assertEqual(self.pairs(), {(self.student.id, project_id) for project_id in ranked[:2]})
+
+            # Projects passed on are not stored
+            Swipe.objects.create(student=self.student, project_id=ranked[0], direction=Swipe.Direction.LEFT)
+            refresh_student_scores(self.student)
+            self.assertEqual(self.pairs(), {(self.student.id, project_id) for project_id in ranked[1:3]})
+            refresh_project_scores(ProfessorProject.objects.get(id=ranked[0]))
+            self.assertNotIn((self.student.id, ranked[0]), self.pairs())
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class MatchCacheTests(TestCase):
+    """Student match lists are served from the cache until a commit bumps a version they are keyed on"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Student.objects.create_user(username='ada', password='pw')
+        cls.student = StudentProfile.objects.get(user=cls.user)
+        cls.student.skills = ['python']
+        cls.student.save()
+        profile = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='professor', password='pw'))
+        cls.project = ProfessorProject.objects.create(profile=profile, title='Robotics', required_skills=['python'])
+        run_pending()
+
+    def setUp(self):
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_matches(self):
+        response = self.client.get('/api/user/student/matches/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['matches']
+
+    def assert_stats(self, hits, misses):
+        stats = cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (hits, misses))
+
+    def test_repeat_request_is_a_hit(self):
+        first = self.get_matches()
+        self.assert_stats(0, 1)
+        # The stored-match query is skipped on a hit
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_matches(), first)
+        self.assert_stats(1, 1)
+        # Other page sizes are cached separately
+        self.client.get('/api/user/student/matches/', {'limit': 5})
+        self.assert_stats(1, 2)
+
+    def test_committed_project_save_invalidates(self):
+        self.get_matches()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = 'Underwater robotics'
+            self.project.save()
+        self.assertEqual(self.get_matches()[0]['title'], 'Underwater robotics')
+        self.assert_stats(0, 2)
+
+    def test_committed_student_edit_invalidates(self):
+        self.get_matches()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.skills = ['sql']
+            self.student.save()
+        # Missed on the commit's bump, before the refresh job has rewritten the rows
+        self.get_matches()
+        self.assert_stats(0, 2)
+        run_pending()
+        self.assertEqual(self.get_matches(), [])
+        self.assert_stats(0, 3)
+
+    def test_worker_bumps_reach_the_request_path(self):
+        self.get_matches()
+        # A refresh job bumps the student's version once it has rewritten their rows...
+        enqueue(Job.Kind.REFRESH_STUDENT, self.student.id)
+        run_pending()
+        self.get_matches()
+        self.assert_stats(0, 2)
+        # ...and run_matching_worker does so from another process, which must share the cache
+        etag = self.client.get('/api/user/student/matches/')['ETag']
+        subprocess.run(
+            [sys.executable, '-c', 'import django; from django.conf import settings; '
+             f'settings.CACHES["matches"]["LOCATION"] = {MATCH_CACHE.name!r}; django.setup(); '
+             f'from user.match_cache import bump_student_version; bump_student_version({self.user.id})'],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'main.settings'}, check=True,
+        )
+        response = self.client.get('/api/user/student/matches/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assert_stats(1, 3)
+
+    def test_refresh_jobs_change_match_etags(self):
+        for url, kind, object_id in (
+            (f'/api/user/project/{self.project.id}/matches/', Job.Kind.REFRESH_PROJECT, self.project.id),
+            ('/api/user/student/matches/', Job.Kind.REFRESH_STUDENT, self.student.id),
+        ):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            enqueue(kind, object_id)
+            run_pending()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_uncommitted_save_keeps_serving_the_cache(self):
+        self.get_matches()
+        # Rolled back (or not yet committed) saves must not invalidate
+        self.project.title = 'Renamed'
+        self.project.save()
+        self.assertEqual(self.get_matches()[0]['title'], 'Robotics')
+        self.assert_stats(1, 1)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class MatchCursorTests(TestCase):
+    """Keyset cursors of the match endpoints"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for i in range(5):
+            user = Student.objects.create_user(username=f'student{i}', password='pw')
+            profile = StudentProfile.objects.get(user=user)
+            profile.skills = ['python']
+            profile.save()
+            cls.users.append(user)
+        profile = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='professor', password='pw'))
+        cls.projects = [
+            ProfessorProject.objects.create(profile=profile, title=f'Project {i}', required_skills=['python'])
+            for i in range(5)
+        ]
+        run_pending()
+        # Every row ties, so pages are split by id alone
+        MatchScore.objects.update(rank_score=0.5)
+
+    def setUp(self):
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def pages(self, url, limit=2):
+        pages, cursor = [], None
+        while True:
+            params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(url, params).json()
+            pages.append(data)
+            cursor = data['next_cursor']
+            if not cursor:
+                return pages
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor((0.123456789, 42), 7)
+        self.assertEqual(decode_cursor(cursor), ((0.123456789, 42), 7))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('x' + cursor)
+
+    def test_tied_scores_page_without_gaps_or_repeats(self):
+        for url, key, expected in (
+            ('/api/user/student/matches/', 'project_id', [p.id for p in self.projects]),
+            (f'/api/user/project/{self.projects[0].id}/matches/', 'student_id', [u.id for u in self.users]),
+        ):
+            pages = self.pages(url)
+            self.assertEqual([len(page['matches']) for page in pages], [2, 2, 1])
+            self.assertEqual([match[key] for page in pages for match in page['matches']], sorted(expected))
+            self.assertFalse(any(page['stale'] for page in pages))
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = self.client.get('/api/user/student/matches/', {'limit': 2}).json()['next_cursor']
+        forged = encode_cursor((0.5, 0), None).split(':')[0] + ':' + cursor.split(':', 1)[1]
+        for url in ('/api/user/student/matches/', f'/api/user/project/{self.projects[0].id}/matches/'):
+            for bad in (forged, 'not-a-cursor'):
+                response = self.client.get(url, {'limit': 2, 'cursor': bad})
+                self.assertEqual(response.status_code, 400)
+
+    def test_cursor_from_an_older_catalog_is_stale(self):
+        first = self.client.get('/api/user/student/matches/', {'limit': 2}).json()
+        bump_catalog_version()
+        second = self.client.get('/api/user/student/matches/', {'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertTrue(second['stale'])
+        self.assertEqual(len(second['matches']), 2)
+        # The cursor keeps its snapshot version, so later pages stay stale too
+        third = self.client.get('/api/user/student/matches/', {'limit': 2, 'cursor': second['next_cursor']}).json()
+        self.assertTrue(third['stale'])
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class SwipeTests(TestCase):
+    """Swiped projects leave the student's deck"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Student.objects.create_user(username='ada', password='pw')
+        student = StudentProfile.objects.get(user=cls.user)
+        student.skills = ['python']
+        student.save()
+        profile = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='professor', password='pw'))
+        cls.projects = [
+            ProfessorProject.objects.create(profile=profile, title=f'Project {i}', required_skills=['python'])
+            for i in range(3)
+        ]
+        run_pending()
+
+    def setUp(self):
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def deck(self):
+        return [match['project_id'] for match in self.client.get('/api/user/student/matches/').json()['matches']]
+
+    def swipe(self, project, direction):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/user/student/swipes/', {'project': project.id, 'direction': direction})
+
+    def test_swiped_project_leaves_the_cached_deck(self):
+        self.assertCountEqual(self.deck(), [p.id for p in self.projects])
+        response = self.swipe(self.projects[0], 'LEFT')
+        self.assertEqual(response.status_code, 201)
+        # The deck was cached before the swipe; the committed swipe invalidates it
+        self.assertCountEqual(self.deck(), [p.id for p in self.projects[1:]])
+
+        # Re-swiping updates the existing swipe
+        response = self.swipe(self.projects[0], 'RIGHT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Swipe.objects.get().direction, 'RIGHT')
+        self.assertCountEqual(self.deck(), [p.id for p in self.projects[1:]])
+
+    def post_batch(self, *swipes):
+        events = [{'client_id': client_id, 'project': project, 'direction': direction}
+                  for client_id, project, direction in swipes]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/student/swipes/batch/', {'swipes': events}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_batch_counts_and_deck(self):
+        first, second, third = (p.id for p in self.projects)
+        data = self.post_batch(('a', first, 'LEFT'), ('a', second, 'LEFT'), ('b', 10 ** 9, 'RIGHT'))
+        self.assertEqual(
+            {key: data[key] for key in ('received', 'created', 'updated', 'duplicates', 'unknown_projects')},
+            {'received': 3, 'created': 1, 'updated': 0, 'duplicates': 1, 'unknown_projects': ['b']},
+        )
+        self.assertCountEqual([match['project_id'] for match in data['matches']], [second, third])
+
+    def test_batch_replays_and_reswipes(self):
+        first, second, _ = (p.id for p in self.projects)
+        self.post_batch(('a', first, 'LEFT'))
+        # Retrying the same batch stores nothing new
+        data = self.post_batch(('a', first, 'LEFT'))
+        self.assertEqual((data['created'], data['updated'], data['duplicates']), (0, 0, 1))
+
+        # A new event for a swiped project updates it; the last event per project wins
+        data = self.post_batch(('b', first, 'LEFT'), ('c', first, 'RIGHT'), ('d', second, 'LEFT'))
+        self.assertEqual((data['created'], data['updated'], data['duplicates']), (1, 1, 0))
+        self.assertEqual(
+            dict(Swipe.objects.values_list('project_id', 'direction')), {first: 'RIGHT', second: 'LEFT'},
+        )
+        self.assertEqual(Swipe.objects.get(project_id=first).client_id, 'c')
+
+    def test_replayed_batch_keeps_the_latest_swipe(self):
+        first, second, _ = (p.id for p in self.projects)
+        batch = (('a', first, 'LEFT'), ('b', first, 'RIGHT'), ('c', second, 'LEFT'))
+        data = self.post_batch(*batch)
+        self.assertEqual((data['created'], data['updated'], data['duplicates']), (2, 0, 0))
+        # Every event of the batch was recorded, including the superseded 'a'
+        for _ in range(2):
+            data = self.post_batch(*batch)
+            self.assertEqual((data['received'], data['created'], data['updated'], data['duplicates']), (3, 0, 0, 3))
+            self.assertEqual(Swipe.objects.get(project_id=first).direction, 'RIGHT')
+
+        # A later swipe survives a replay of the older batch
+        self.post_batch(('d', first, 'LEFT'))
+        self.assertEqual(self.post_batch(*batch)['duplicates'], 3)
+        self.assertEqual(
+            list(Swipe.objects.filter(project_id=first).values_list('direction', 'client_id')), [('LEFT', 'd')],
+        )
+
+    def test_single_swipes_share_client_ids_with_batches(self):
+        first, second, _ = self.projects
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/student/swipes/', {
+                'project': first.id, 'direction': 'RIGHT', 'client_id': 'a',
+            })
+        self.assertEqual((response.status_code, response.json()['client_id']), (201, 'a'))
+        # The same event sent again, alone or in a batch, is not applied twice
+        response = self.client.post('/api/user/student/swipes/', {'project': first.id, 'direction': 'RIGHT', 'client_id': 'a'})
+        self.assertEqual(response.status_code, 200)
+        self.post_batch(('b', first.id, 'LEFT'))
+        data = self.post_batch(('a', first.id, 'RIGHT'))
+        self.assertEqual((data['updated'], data['duplicates']), (0, 1))
+        self.assertEqual(Swipe.objects.get(project=first).direction, 'LEFT')
+        # An id already used for one project cannot record a swipe on another
+        response = self.client.post('/api/user/student/swipes/', {'project': second.id, 'direction': 'LEFT', 'client_id': 'a'})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Swipe.objects.filter(project=second).exists())
+
+    def test_batch_rejects_out_of_range_projects(self):
+        for project in (0, 10 ** 20):
+            response = self.client.post('/api/user/student/swipes/batch/', {
+                'swipes': [{'client_id': 'a', 'project': project, 'direction': 'LEFT'}],
+            }, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_swipe_needs_a_student_profile(self):
+        self.client.force_authenticate(User.objects.get(username='professor'))
+        self.assertEqual(self.swipe(self.projects[0], 'LEFT').status_code, 404)
+        self.assertFalse(Swipe.objects.exists())
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class ProjectBrowseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        profile = ProfessorProfile.objects.get(user=professor)
+        profile.university = 'NUS'
+        profile.save()
+        other = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='other', password='pw'))
+        other.university = 'NTU'
+        other.save()
+        cls.robotics = ProfessorProject.objects.create(
+            profile=profile, title='Robot arm control', description='Reinforcement learning for manipulators',
+            modality='On-site', location='Kent Ridge', required_skills=['Python', 'ROS'], hrs_per_week=20,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        cls.genomics = ProfessorProject.objects.create(
+            profile=other, title='Genome assembly', description='Sequencing pipelines in Python',
+            modality='Remote', required_skills=['python3', 'Bioinformatics'], hrs_per_week=10,
+            start_date=date(2025, 7, 1), end_date=date(2025, 12, 31),
+        )
+        cls.closed = ProfessorProject.objects.create(profile=profile, title='Robot vision', is_open=False)
+
+    def ids(self, **params):
+        response = self.client.get('/api/user/projects/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        return [row['id'] for row in (data['results'] if 'results' in data else data)]
+
+    def test_structured_filters(self):
+        self.assertEqual(self.ids(), [self.genomics.id, self.robotics.id])
+        self.assertEqual(self.ids(modality='Remote'), [self.genomics.id])
+        self.assertEqual(self.ids(modality='Remote,On-site', ordering='hours'), [self.genomics.id, self.robotics.id])
+        self.assertEqual(self.ids(location='kent'), [self.robotics.id])
+        self.assertEqual(self.ids(university='ntu'), [self.genomics.id])
+        self.assertEqual(self.ids(min_hours=15), [self.robotics.id])
+        self.assertEqual(self.ids(available_from='2025-08-01'), [self.genomics.id])
+        self.assertEqual(self.ids(available_from='2025-05-01', available_to='2025-07-15', ordering='start_date'),
+                         [self.robotics.id, self.genomics.id])
+        self.assertEqual(self.ids(skill='PY'), [self.genomics.id, self.robotics.id])
+        self.assertEqual(self.ids(skill='python,ros'), [self.robotics.id])
+        self.assertEqual(self.ids(skill='cobol'), [])
+
+    def test_full_text_search(self):
+        self.assertEqual(self.ids(q='robot'), [self.robotics.id])
+        self.assertEqual(self.ids(q='python'), [self.genomics.id])
+        self.assertEqual(self.ids(q='learning manipulators'), [self.robotics.id])
+        # Edits and bulk inserts reach the index too
+        ProfessorProject.objects.filter(id=self.genomics.id).update(title='Robot genome assembly')
+        ProfessorProject.objects.bulk_create([
+            ProfessorProject(profile=self.robotics.profile, title='Swarm robotics', is_open=True),
+        ])
+        self.assertEqual(len(self.ids(q='robot')), 3)
+
+    def test_pagination(self):
+        response = self.client.get('/api/user/projects/', {'limit': 1, 'ordering': 'title'})
+        data = response.json()
+        self.assertEqual((data['count'], [row['id'] for row in data['results']]), (2, [self.genomics.id]))
+        self.assertEqual(self.client.get(data['next']).json()['results'][0]['id'], self.robotics.id)
+
+    def test_invalid_filters(self):
+        for params in ({'min_hours': 'x'}, {'available_to': 'soon'}, {'ordering': 'popularity'},
+                       {'ordering': 'relevance'}, {'available_from': '2025-02-01', 'available_to': '2025-01-01'}):
+            self.assertEqual(self.client.get('/api/user/projects/', params).status_code, 400, params)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class AsyncEndpointTests(TestCase):
+    """The async match and browse views served through the ASGI request path"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create_user(username='student', password='pw')
+        profile = StudentProfile.objects.get(user=cls.student)
+        profile.skills = ['python']
+        profile.save()
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        cls.project = ProfessorProject.objects.create(
+            profile=ProfessorProfile.objects.get(user=professor), title='Robotics', required_skills=['python'],
+        )
+        cls.token = Token.objects.create(user=cls.student)
+        run_pending()
+
+    def setUp(self):
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+
+    async def test_async_views_match_sync_client(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        for url in ['/api/user/student/matches/', f'/api/user/project/{self.project.id}/matches/', '/api/user/projects/']:
+            response = await self.async_client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.client.get)(url, headers=headers)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_async_views_check_permissions(self):
+        response = await self.async_client.get('/api/user/student/matches/')
+        self.assertEqual(response.status_code, 401)
+        professor_token = await Token.objects.acreate(user=await Professor.objects.aget(username='professor'))
+        response = await self.async_client.get(
+            '/api/user/student/matches/', headers={'Authorization': f'Token {professor_token.key}'},
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class CachedTokenAuthenticationTests(TestCase):
+    """Tokens resolved from the cache, with the student profile attached to the request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create_user(username='student', password='pw')
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        ProfessorProject.objects.create(profile=ProfessorProfile.objects.get(user=professor), title='Robotics')
+        run_pending()
+
+    def setUp(self):
+        caches[settings.AUTH_TOKEN_CACHE_ALIAS].clear()
+        caches[settings.MATCH_CACHE_ALIAS].clear()
+        self.token = Token.objects.create(user=self.student)
+        self.client = APIClient(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_warm_requests_skip_token_and_profile_queries(self):
+        url = '/api/user/student/matches/'
+        # Token, user and both profile ids in one query, then the stored matches
+        with self.assertNumQueries(2):
+            first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(len(first.json()['matches']), 1)
+
+        # The cached user loads other fields on access
+        response = self.client.post('/api/user/student/swipes/', {
+            'project': ProfessorProject.objects.get().id, 'direction': 'LEFT',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Swipe.objects.get().student, StudentProfile.objects.get(user=self.student))
+
+    def test_login_logout_revokes_token(self):
+        response = self.client.post('/api/user/login/', {'username': 'student', 'password': 'pw'}, format='json')
+        self.assertEqual(response.json()['token'], self.token.key)
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post('/api/user/logout/').status_code, 204)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 401)
+
+    def test_expired_token_is_rejected_and_replaced_at_login(self):
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 200)
+        with override_settings(AUTH_TOKEN_EXPIRY_SECONDS=60):
+            Token.objects.filter(key=self.token.key).update(created=self.token.created - timedelta(minutes=2))
+            # The cached entry carries the creation time it was resolved with
+            caches[settings.AUTH_TOKEN_CACHE_ALIAS].clear()
+            response = self.client.get('/api/user/student/matches/')
+            self.assertEqual(response.status_code, 401)
+            self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+
+            response = self.client.post('/api/user/login/', {'username': 'student', 'password': 'pw'}, format='json')
+            self.assertNotEqual(response.json()['token'], self.token.key)
+
+    def test_account_and_profile_changes_drop_cached_entry(self):
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(id=self.student.id).update(is_active=False)
+            Student.objects.get(id=self.student.id).save()
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 401)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(id=self.student.id).update(is_active=True)
+            Student.objects.get(id=self.student.id).save()
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentProfile.objects.filter(user=self.student).delete()
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 404)
+
+    def test_revocation_reaches_other_processes(self):
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 200)
+        # Another web process handles the logout: deletes the row and drops the entry
+        Token.objects.filter(key=self.token.key).delete()
+        subprocess.run(
+            [sys.executable, '-c', 'import django; from django.conf import settings; '
+             f'settings.CACHES["tokens"]["LOCATION"] = {TOKEN_CACHE.name!r}; django.setup(); '
+             f'from user.authentication import forget_token; forget_token({self.token.key!r})'],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'main.settings'}, check=True,
+        )
+        self.assertEqual(self.client.get('/api/user/student/matches/').status_code, 401)
+
+    def test_per_process_token_cache_is_refused_outside_debug(self):
+        self.assertEqual(check_token_cache(), [])
+        locmem = {**settings.CACHES, 'tokens': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([error.id for error in check_token_cache()], ['user.E001'])
+            with override_settings(DEBUG=True):
+                self.assertEqual(check_token_cache(), [])
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class SkillVocabularyTests(TestCase):
+    def test_spellings_resolve_to_one_skill(self):
+        ids = Skill.objects.resolve_ids(['Python', ' python3 ', 'PY', 'python'])
+        self.assertEqual(ids, Skill.objects.resolve_ids(['python']))
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(Skill.objects.get(id=ids[0]).name, 'Python')
+
+    def test_unknown_skill_is_created_once(self):
+        first = Skill.objects.resolve_ids(['Quantum  Annealing'])
+        second = Skill.objects.resolve_ids(['quantum annealing'])
+        self.assertEqual(first, second)
+        self.assertEqual(Skill.objects.get(id=first[0]).name, 'Quantum Annealing')
+        self.assertEqual(Skill.objects.resolve_ids(['unseen skill'], create=False), [])
+
+    def test_saving_resolves_ids_and_index(self):
+        student = StudentProfile.objects.get(user=Student.objects.create_user(username='s', password='pw'))
+        student.skills = ['JS', 'javascript', '']
+        student.save()
+        owner = ProfessorProfile.objects.get(user=Professor.objects.create_user(username='p', password='pw'))
+        project = ProfessorProject.objects.create(profile=owner, title='P', required_skills=['JavaScript', 'k8s'])
+
+        js, k8s = Skill.objects.resolve_ids(['js']) + Skill.objects.resolve_ids(['kubernetes'])
+        self.assertEqual(student.skill_ids, [js])
+        self.assertEqual(project.skill_ids, sorted([js, k8s]))
+        self.assertEqual(list(StudentSkill.objects.filter(student=student).values_list('skill_id', flat=True)), [js])
+        self.assertEqual(
+            sorted(ProjectSkill.objects.filter(project=project).values_list('skill_id', flat=True)), sorted([js, k8s]),
+        )
+
+        student.skills = ['Kubernetes']
+        student.save()
+        self.assertEqual(list(StudentSkill.objects.filter(student=student).values_list('skill_id', flat=True)), [k8s])
+
+
+class TextIndexTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(TEXT_INDEX_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        build(
+            students=[(1, 'Deep learning for medical imaging'), (2, 'Econometrics of housing markets'), (3, '')],
+            projects=[
+                (10, 'Medical imaging with deep learning'),
+                (11, 'Housing markets and econometrics survey'),
+                (12, 'Robotics lab assistant'),
+                (13, None),
+            ],
+        )
+
+    def test_ranks_related_text_first(self):
+        matrix = load(PROJECTS)
+        sims = matrix.similarity(matrix.vectorize('deep learning for imaging'), [10, 11, 12])
+        self.assertEqual(list(np.argsort(-sims)), [0, 1, 2])
+        self.assertGreater(sims[0], 0.3)
+        self.assertEqual(sims[2], 0.0)
+
+    def test_missing_text_is_nan(self):
+        matrix = load(PROJECTS)
+        sims = matrix.similarity(matrix.vectorize('deep learning'), [13, 99])
+        self.assertTrue(np.isnan(sims).all())
+        self.assertTrue(np.isnan(matrix.similarity(matrix.vectorize(''), [10])).all())
+
+    def test_symmetric_across_sides(self):
+        projects, students = load(PROJECTS), load(STUDENTS)
+        forward = projects.similarity(projects.vectorize('Deep learning for medical imaging'), [10])
+        backward = students.similarity(students.vectorize('Medical imaging with deep learning'), [1])
+        self.assertAlmostEqual(forward[0], backward[0], places=6)
+
+    def test_upsert_replaces_row(self):
+        upsert(PROJECTS, 12, 'Econometrics of housing')
+        upsert(PROJECTS, 14, 'Housing econometrics')
+        matrix = load(PROJECTS)
+        sims = matrix.similarity(matrix.vectorize('housing econometrics'), [11, 12, 14])
+        self.assertTrue((sims > 0).all())
+        upsert(PROJECTS, 14, None)
+        self.assertTrue(np.isnan(load(PROJECTS).similarity(matrix.vectorize('housing'), [14])).all())
+
+    def test_upsert_without_fcntl(self):
+        # Windows has no fcntl; writers then lock in-process only and must not deadlock with load()
+        with mock.patch('user.text_index.fcntl', None):
+            writer = threading.Thread(target=upsert, args=(PROJECTS, 14, 'Housing econometrics'), daemon=True)
+            writer.start()
+            writer.join(timeout=10)
+        self.assertFalse(writer.is_alive())
+        self.assertIn(14, load(PROJECTS).delta_ids)
+
+    def test_delta_merge_keeps_scores(self):
+        matrix = load(PROJECTS)
+        query = matrix.vectorize('housing econometrics')
+        with override_settings(TEXT_INDEX_DELTA_ROWS=2):
+            upsert(PROJECTS, 12, 'Econometrics of housing')
+            before = load(PROJECTS).similarity(query, [10, 11, 12])
+            upsert(PROJECTS, 14, 'Robotics')
+            upsert(PROJECTS, 15, 'More robotics')  # third delta row folds the delta into the main segment
+        merged = load(PROJECTS)
+        self.assertEqual(len(merged.delta_ids), 0)
+        np.testing.assert_allclose(merged.similarity(query, [10, 11, 12]), before)
+
+
+class AnnIndexTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(TEXT_INDEX_DIR=directory.name, ANN_INDEX_DIR=directory.name + '/ann')
+        override.enable()
+        self.addCleanup(override.disable)
+        rng = random.Random(3)
+        self.rows = [
+            (i, rng.choice(['deep learning', 'housing markets', 'robotics', '']), rng.sample(range(1, 30), rng.randint(0, 4)))
+            for i in range(1, 400)
+        ]
+
+    def test_full_probe_matches_brute_force(self):
+        ann_index.build(self.rows, clusters=12)
+        index = ann_index.load()
+        vectors = {int(i): v for i, v in zip(index.ids, np.asarray(index.vectors))}
+        query = ann_index.embed(load(PROJECTS).vectorize('deep learning'), [1, 2, 3], query=True)
+        expected = sorted(vectors, key=lambda i: -(vectors[i] @ query))[:25]
+        found = index.search(query, 25, probes=12)
+        kth = vectors[expected[-1]] @ query
+        self.assertEqual(len(found), 25)
+        self.assertTrue(all(vectors[int(i)] @ query >= kth - 1e-6 for i in found))
+
+    def test_inner_product_tracks_skill_coverage(self):
+        no_text = load(PROJECTS).vectorize('')
+        student = ann_index.embed(no_text, [1, 2], query=True)
+        covered = ann_index.embed(no_text, [1, 2])
+        half = ann_index.embed(no_text, [1, 7])
+        skill_less = ann_index.embed(no_text, [])
+        disjoint = ann_index.embed(no_text, [8, 9])
+        self.assertGreater(covered @ student, half @ student)
+        self.assertGreater(half @ student, disjoint @ student)
+        self.assertAlmostEqual(skill_less @ student, covered @ student, delta=0.25)
+
+    def test_rebuild_swaps_versions(self):
+        ann_index.build(self.rows[:100])
+        self.assertEqual(len(ann_index.load()), 100)
+        ann_index.build(self.rows)
+        ann_index.build(self.rows[:50])
+        self.assertEqual(len(ann_index.load()), 50)
+        versions = [name for name in os.listdir(ann_index.index_dir()) if name not in ('CURRENT',)]
+        self.assertEqual(len(versions), 2)
+
+    def test_recall_at_k(self):
+        self.assertEqual(ann_index.recall_at_k([[1, 2]], [[1, 2, 3]], 2), 1.0)
+        self.assertEqual(ann_index.recall_at_k([[1, 4], [5, 6]], [[1, 2], [5, 6]], 2), 0.75)
+
+
+class AuctionTests(SimpleTestCase):
+    @staticmethod
+    def graph(weights):
+        """CSR arrays for a dense students x projects weight matrix (NaN = no edge)"""
+        indptr, projects, scores = [0], [], []
+        for row in weights:
+            for j, w in enumerate(row):
+                if not np.isnan(w):
+                    projects.append(j)
+                    scores.append(w)
+            indptr.append(len(projects))
+        return np.array(indptr), np.array(projects, dtype=np.int64), np.array(scores)
+
+    @staticmethod
+    def brute_force(weights, capacity):
+        """Best total over every assignment of students to a project or to nothing (-1)"""
+        best = 0.0
+        for choice in itertools.product(range(-1, weights.shape[1]), repeat=weights.shape[0]):
+            if any(choice.count(j) > c for j, c in enumerate(capacity)):
+                continue
+            if any(j >= 0 and np.isnan(weights[i, j]) for i, j in enumerate(choice)):
+                continue
+            best = max(best, sum(weights[i, j] for i, j in enumerate(choice) if j >= 0))
+        return best
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(5)
+        for _ in range(30):
+            weights = rng.choice([0.2, 0.4, 0.5, 0.7, 0.9, np.nan], size=(5, 3))
+            capacity = rng.integers(0, 3, size=3)
+            assigned, prices = auction(*self.graph(weights), capacity)
+            total = sum(weights[i, j] for i, j in enumerate(assigned) if j >= 0)
+            self.assertAlmostEqual(total, self.brute_force(weights, capacity), delta=5 * 1e-4)
+            counts = np.bincount(assigned[assigned >= 0], minlength=3)
+            self.assertTrue((counts <= capacity).all())
+            # Only full projects carry a price
+            self.assertTrue(((prices == 0) | (counts == capacity)).all())
+
+    def test_scarce_capacity_is_priced(self):
+        weights = np.array([[0.9, 0.5], [0.8, 0.6], [0.7, np.nan]])
+        assigned, prices = auction(*self.graph(weights), np.array([1, 5]))
+        self.assertEqual(assigned.tolist(), [1, 1, 0])
+        self.assertGreater(prices[0], 0)
+        self.assertEqual(prices[1], 0)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name, MATCH_CONGESTION_WEIGHT=0.5, MATCH_ASSIGNMENT_BONUS=0.1)
+class SolveAssignmentsTests(TestCase):
+    def setUp(self):
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        profile = ProfessorProfile.objects.get(user=professor)
+        self.popular = ProfessorProject.objects.create(profile=profile, title='Popular', capacity=1,
+                                                       required_skills=['python'])
+        self.other = ProfessorProject.objects.create(profile=profile, title='Other', capacity=3,
+                                                     required_skills=['python', 'sql', 'react'])
+        self.students = []
+        for i in range(3):
+            student = Student.objects.create_user(username=f'student{i}', password='pw')
+            profile = StudentProfile.objects.get(user=student)
+            profile.skills = ['python']
+            profile.save()
+            self.students.append(profile)
+        run_pending()
+
+    def test_assignments_respect_capacity_and_rerank(self):
+        summary = solve_assignments()
+        self.assertEqual(summary['assigned'], 3)
+        self.assertEqual(Assignment.objects.filter(project=self.popular).count(), 1)
+        self.assertEqual(Assignment.objects.filter(project=self.other).count(), 2)
+        congestion = ProjectCongestion.objects.get(project=self.popular)
+        self.assertGreater(congestion.price, 0)
+        self.assertEqual(ProjectCongestion.objects.get(project=self.other).price, 0)
+
+        for row in MatchScore.objects.all():
+            chosen = Assignment.objects.filter(student_id=row.student_id, project_id=row.project_id).exists()
+            price = congestion.price if row.project_id == self.popular.id else 0.0
+            self.assertAlmostEqual(row.rank_score, row.score - 0.5 * price + (0.1 if chosen else 0.0))
+
+        # Rows rescored on save are ranked with the same prices
+        student = self.students[0]
+        expected = dict(MatchScore.objects.filter(student=student).values_list('project_id', 'rank_score'))
+        student.save()
+        run_pending()
+        for project_id, rank in MatchScore.objects.filter(student=student).values_list('project_id', 'rank_score'):
+            self.assertAlmostEqual(rank, expected[project_id])
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class BulkProjectTests(TestCase):
+    def setUp(self):
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        self.profile = ProfessorProfile.objects.get(user=professor)
+        student = StudentProfile.objects.get(user=Student.objects.create_user(username='student', password='pw'))
+        student.skills = ['python']
+        student.save()
+        run_pending()
+        feature_store.clear()
+        self.client = APIClient()
+
+    def rows(self, count):
+        return [{'title': f'Opening {i}', 'required_skills': ['Python', 'SQL'][:i % 2 + 1], 'hrs_per_week': 10}
+                for i in range(count)]
+
+    def post_batch(self, count):
+        return self.client.post(f'/api/user/professor/{self.profile.id}/projects/', self.rows(count), format='json')
+
+    def test_batch_cost_does_not_grow_with_rows(self):
+        self.post_batch(2)  # Creates the skills
+        with CaptureQueriesContext(connection) as small:
+            self.post_batch(5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.post_batch(60)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual([project['title'] for project in response.json()][-1], 'Opening 59')
+
+        projects = ProfessorProject.objects.filter(profile=self.profile)
+        self.assertEqual(projects.count(), 67)
+        python = Skill.objects.get(aliases__alias='python')
+        self.assertEqual(ProjectSkill.objects.filter(skill=python).count(), 67)
+        self.assertEqual(list(Job.objects.filter(status=Job.Status.PENDING).values_list('kind', 'object_id')),
+                         [(Job.Kind.REFRESH_PROFILE_PROJECTS, self.profile.id)])
+
+        run_pending()
+        self.assertEqual(MatchScore.objects.count(), 67)
+        self.assertEqual(len(get_student_matches(StudentProfile.objects.get().user_id, limit=100)), 67)
+
+    def test_invalid_batch_inserts_nothing(self):
+        rows = self.rows(3)
+        rows[1]['start_date'] = 'soon'
+        response = self.client.post(f'/api/user/professor/{self.profile.id}/projects/', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', response.json()[1])
+        with override_settings(PROJECT_BATCH_MAX=2):
+            self.assertEqual(self.post_batch(3).status_code, 400)
+        self.assertFalse(ProfessorProject.objects.exists())
+
+    def test_registration_is_atomic(self):
+        register = {'username': 'lab', 'password': 'pw', 'email': 'lab@example.com', 'projects': self.rows(3)}
+        register['projects'][2]['title'] = ''
+        response = self.client.post('/api/user/register/professor/', register, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('projects', response.json())
+        self.assertFalse(Professor.objects.filter(username='lab').exists())
+
+        register['projects'][2]['title'] = 'Opening 2'
+        self.assertEqual(self.client.post('/api/user/register/professor/', register, format='json').status_code, 201)
+        self.assertEqual(ProfessorProject.objects.filter(profile__user__username='lab', is_open=True).count(), 3)
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name)
+class ProfileImportExportTests(TestCase):
+    def run_import(self, kind, content, *args):
+        suffix = '.ndjson' if content.startswith('{') else '.csv'
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        errors = StringIO()
+        call_command('import_profiles', kind, f.name, *args, batch_size=2, stdout=StringIO(), stderr=errors)
+        return [json.loads(line) for line in errors.getvalue().splitlines()]
+
+    def export(self, kind, fmt):
+        out = StringIO()
+        call_command('export_profiles', kind, format=fmt, stdout=out)
+        return out.getvalue()
+
+    def test_import_reports_row_errors_and_keeps_valid_rows(self):
+        errors = self.run_import('students', (
+            'username,email,skills,gpa,avail_start\n'
+            'ada,ada@uni.edu,Python;SQL,3.9,2026-01-05\n'
+            'grace,not-an-email,"[""COBOL""]",3.5,\n'
+            'ada,,,,\n'
+            'linus,,C,abc,\n'
+            'alan,,,,\n'
+        ))
+        self.assertEqual([(error['line'], sorted(error['errors'])) for error in errors],
+                         [(3, ['email']), (4, ['username']), (5, ['gpa'])])
+        self.assertEqual(sorted(StudentProfile.objects.values_list('user__username', flat=True)), ['ada', 'alan'])
+        ada = StudentProfile.objects.get(user__username='ada')
+        self.assertEqual((ada.skills, ada.gpa, ada.avail_start, ada.user.role), (['Python', 'SQL'], Decimal('3.90'), date(2026, 1, 5), 'STUDENT'))
+        self.assertEqual(sorted(ada.skill_entries.values_list('skill_id', flat=True)), ada.skill_ids)
+        self.assertFalse(ada.user.has_usable_password())
+        self.assertEqual(list(Job.objects.values_list('kind', flat=True)), [Job.Kind.REBUILD_MATCH_SCORES])
+
+    def test_projects_and_round_trip(self):
+        self.run_import('professors', '{"username": "turing", "email": "t@uni.edu", "password": "pw", "university": "NUS"}\n')
+        self.assertTrue(Professor.objects.get(username='turing').check_password('pw'))
+        errors = self.run_import('projects', (
+            'professor,title,required_skills,hrs_per_week,is_open\n'
+            'turing,Enigma,Python;Cryptography,10,false\n'
+            'nobody,Orphan,,,\n'
+            'turing,,,,\n'
+        ))
+        self.assertEqual([(error['line'], list(error['errors'])) for error in errors], [(3, ['professor']), (4, ['title'])])
+        project = ProfessorProject.objects.get()
+        self.assertEqual((project.title, project.is_open, project.hrs_per_week), ('Enigma', False, 10))
+        self.assertEqual(project.skill_entries.count(), 2)
+
+        # An export imports back into an empty database
+        professors, projects = self.export('professors', 'ndjson'), self.export('projects', 'csv')
+        User.objects.all().delete()
+        self.assertEqual(self.run_import('professors', professors) + self.run_import('projects', projects), [])
+        project = ProfessorProject.objects.select_related('profile__user').get()
+        self.assertEqual((project.profile.user.username, project.profile.university), ('turing', 'NUS'))
+        self.assertEqual((project.required_skills, project.is_open), (['Python', 'Cryptography'], False))
+
+    def test_dry_run_inserts_nothing(self):
+        self.assertEqual(self.run_import('students', 'username\nada\n', '--dry-run'), [])
+        self.assertFalse(User.objects.exists())
+
+
+@override_settings(TEXT_INDEX_DIR=TEXT_INDEX.name, JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=0)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        professor = Professor.objects.create_user(username='professor', password='pw')
+        self.project = ProfessorProject.objects.create(
+            profile=ProfessorProfile.objects.get(user=professor), title='Robotics', required_skills=['python'],
+        )
+        self.student = StudentProfile.objects.get(user=Student.objects.create_user(username='student', password='pw'))
+
+    def test_deletes_unindex_text_on_commit(self):
+        run_pending()
+
+        def indexed():
+            matrix = load(PROJECTS)
+            return not np.isnan(matrix.similarity(matrix.vectorize('robotics'), [self.project.id])).all()
+
+        self.assertTrue(indexed())
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                ProfessorProject.objects.filter(id=self.project.id).delete()
+                transaction.set_rollback(True)
+        self.assertTrue(indexed())
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfessorProject.objects.filter(id=self.project.id).delete()
+        self.assertFalse(indexed())
+
+    def test_saves_queue_refreshes_instead_of_scoring(self):
+        Job.objects.all().delete()
+        MatchScore.objects.all().delete()
+        self.student.skills = ['python']
+        for _ in range(3):
+            self.student.save()
+        self.project.save()
+        pending = Job.objects.filter(status=Job.Status.PENDING)
+        self.assertEqual(sorted(pending.values_list('kind', 'object_id')), [
+            (Job.Kind.REFRESH_PROJECT, self.project.id), (Job.Kind.REFRESH_STUDENT, self.student.id),
+        ])
+        self.assertFalse(MatchScore.objects.exists())
+
+        self.assertEqual(run_pending(), 2)
+        self.assertTrue(MatchScore.objects.filter(student=self.student, project=self.project).exists())
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 2)
+
+    def test_worker_command_drains_queue(self):
+        self.student.skills = ['python']
+        self.student.save()
+        call_command('run_matching_worker', processes=0, once=True, enqueue=['SOLVE_ASSIGNMENTS'], stdout=StringIO())
+        self.assertFalse(Job.objects.exclude(status=Job.Status.DONE).exists())
+        self.assertEqual(Assignment.objects.get().student, self.student)
+
+    def test_pool_processes_start_under_spawn(self):
+        # spawn is the default start method on macOS and Windows; children import user.worker before Django is set up
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'), initializer=worker.init_process) as pool:
+            self.assertIsInstance(pool.submit(os.getpid).result(timeout=120), int)
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        run_pending()
+        enqueue(Job.Kind.REFRESH_STUDENT, self.student.id)
+        first = claim(10, 'a')
+        self.assertEqual(len(first), 1)
+        self.assertEqual(claim(10, 'b'), [])
+        # A save while the job runs queues a fresh refresh behind it
+        self.student.save()
+        self.assertEqual(Job.objects.filter(status=Job.Status.PENDING).count(), 1)
+
+    def test_failures_retry_then_fail(self):
+        run_pending()
+        enqueue(Job.Kind.REFRESH_STUDENT, self.student.id)
+        with mock.patch('user.jobs.refresh_student_scores', side_effect=RuntimeError('boom')):
+            self.assertFalse(run_job(claim(1)[0].id))
+            job = Job.objects.get(status=Job.Status.PENDING)
+            self.assertIn('boom', job.error)
+            self.assertFalse(run_job(claim(1)[0].id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+
+def png_bytes(size=(1200, 800), color=(200, 30, 30)):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}, MEDIA_THUMBNAIL_SIZES=(160, 480), MEDIA_UPLOAD_STAGING_DIR=UPLOAD_STAGING.name,
+   TEXT_INDEX_DIR=TEXT_INDEX.name)
+class MediaPipelineTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()  # Upload throttle history
+
+    def register_professor(self, username, image):
+        response = self.client.post('/api/user/register/professor/', {
+            'username': username, 'password': 'pw', 'email': f'{username}@example.com',
+            'profile_image': SimpleUploadedFile('logo.png', image, content_type='image/png'),
+            'projects': json.dumps([{'title': f'{username} lab'}]),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        return ProfessorProfile.objects.get(user__username=username)
+
+    def test_identical_uploads_share_file_and_thumbnails(self):
+        image = png_bytes()
+        first, second = self.register_professor('ada', image), self.register_professor('grace', image)
+        self.assertEqual(first.profile_image.name, second.profile_image.name)
+        self.assertIn(hashlib.sha256(image).hexdigest(), first.profile_image.name)
+        self.assertEqual(first.thumbnails, {})
+
+        run_pending()
+        first.refresh_from_db()
+        sizes = first.thumbnails['profile_image']['sizes']
+        self.assertEqual(sorted(sizes), ['160', '480'])
+        with default_storage.open(sizes['160']) as thumb:
+            from PIL import Image
+            image = Image.open(thumb)
+            self.assertEqual((image.format, max(image.size)), ('WEBP', 160))
+
+        project = self.client.get('/api/user/projects/').json()[0]
+        self.assertTrue(project['profile_thumbnails']['480'].endswith(sizes['480']))
+        professor = self.client.get('/api/user/professor/jobs/').json()[0]
+        self.assertEqual(sorted(professor['thumbnails']['profile_image']), ['160', '480'])
+
+    def test_non_images_get_no_thumbnails(self):
+        profile = self.register_professor('ada', b'not an image')
+        run_pending()
+        profile.refresh_from_db()
+        self.assertEqual(profile.thumbnails, {})
+
+    def test_ticketed_upload(self):
+        resume = b'%PDF-1.4 resume' * 100
+        ticket = self.client.post('/api/user/uploads/', {
+            'field': 'resume', 'filename': 'cv.PDF', 'content_type': 'application/pdf',
+        }, format='json').json()
+        response = self.client.put(ticket['upload_url'], resume, content_type='application/pdf')
+        self.assertEqual(response.json()['offset'], len(resume))
+
+        # A registration that fails validation (here: a taken username) leaves the ticket for the retry
+        Student.objects.create_user(username='taken', password='pw')
+        register = {'password': 'pw', 'email': 'student@example.com', 'resume_upload': ticket['ticket']}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/register/student/', {**register, 'username': 'taken'}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/register/student/', {**register, 'username': 'student'}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        name = StudentProfile.objects.get(user__username='student').resume.name
+        self.assertEqual(name, f'resumes/{hashlib.sha256(resume).hexdigest()[:2]}/{hashlib.sha256(resume).hexdigest()}.pdf')
+        with default_storage.open(name) as stored:
+            self.assertEqual(stored.read(), resume)
+
+        # Claiming moved the staged file, and tickets only fit their field
+        for field, ticket_value in (('resume', ticket['ticket']), ('transcript', ticket['ticket']), ('resume', 'forged')):
+            response = self.client.post('/api/user/register/student/', {
+                'username': 'other', 'password': 'pw', 'email': 'other@example.com', f'{field}_upload': ticket_value,
+            }, format='multipart')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Student.objects.filter(username='other').exists())
+        self.assertEqual(self.client.post('/api/user/uploads/', {'field': 'gpa'}, format='json').status_code, 400)
+
+    @override_settings(MEDIA_UPLOAD_MAX_BYTES=1000)
+    def test_ticket_requests_are_capped_and_throttled(self):
+        ticket = {'field': 'resume', 'filename': 'cv.pdf'}
+        response = self.client.post('/api/user/uploads/', {**ticket, 'size': 1001}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'uploads': '2/hour'}):
+            statuses = [self.client.post('/api/user/uploads/', ticket, format='json').status_code for _ in range(3)]
+        # The refused oversized request already counted against the rate
+        self.assertEqual(statuses, [201, 429, 429])
+
+    def test_chunked_upload_resumes(self):
+        transcript = os.urandom(300 * 1024)
+        ticket = self.client.post('/api/user/uploads/', {
+            'field': 'transcript', 'filename': 'grades.pdf', 'size': len(transcript),
+        }, format='json').json()
+        url = ticket['resumable_url']
+
+        def patch(offset, chunk):
+            return self.client.generic('PATCH', url, chunk, content_type='application/offset+octet-stream',
+                                       headers={'Upload-Offset': str(offset)})
+
+        self.assertEqual(patch(0, transcript[:100000]).json()['offset'], 100000)
+        # A resent or skipped chunk is refused with the offset to continue from
+        for offset in (0, 150000):
+            response = patch(offset, transcript[offset:offset + 1000])
+            self.assertEqual((response.status_code, response['Upload-Offset']), (409, '100000'))
+        # After a dropped connection the client asks where to resume
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '100000')
+
+        # Registration cannot claim the upload until every byte is in
+        register = {'username': 'student', 'password': 'pw', 'email': 's@example.com',
+                    'skills': ['python'], 'transcript_upload': ticket['ticket']}
+        self.assertEqual(self.client.post('/api/user/register/student/', register, format='json').status_code, 400)
+        self.assertEqual(patch(100000, transcript[100000:]).json(), {'offset': len(transcript), 'size': len(transcript)})
+        self.assertEqual(patch(len(transcript), b'x').status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/register/student/', register, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        profile = StudentProfile.objects.get(user__username='student')
+        self.assertEqual(profile.skills, ['python'])
+        with default_storage.open(profile.transcript.name) as stored:
+            self.assertEqual(stored.read(), transcript)
+        self.assertEqual(os.listdir(UPLOAD_STAGING.name), [])
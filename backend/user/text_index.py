@@ -0,0 +1,342 @@
+"""
+Text similarity index for matching.
+
+Student text (headline, summary, skills_text) and project text (title, description)
+are hashed into word unigram and bigram features and stored as L2-normalized TF-IDF
+rows, one sparse matrix per side, under settings.TEXT_INDEX_DIR. Similarity for a
+request is one sparse matrix-vector product against the other side's matrix.
+
+Each side is a column-major main segment written by a full build, plus a small
+delta segment that every save appends to; the newest row for an id wins, so saves
+never rewrite the main matrix. IDF weights come from the project corpus at the
+last full build and stay fixed until `manage.py rebuild_text_index`, which keeps
+stored rows and freshly vectorized queries on the same scale.
+"""
+import os
+import re
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+
+FEATURES = 1 << 18
+STUDENTS = 'students'
+PROJECTS = 'projects'
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+_EMPTY = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+_cache = {}
+_lock = threading.Lock()
+# Serializes writers where fcntl is missing; separate from _lock, which load() takes inside writes
+_write_lock = threading.Lock()
+
+
+def student_text(student) -> str:
+    return ' '.join(filter(None, (student.headline, student.summary, student.skills_text)))
+
+
+def project_text(project) -> str:
+    return ' '.join(filter(None, (project.title, project.description)))
+
+
+def features(text: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed unigram and bigram counts as (sorted unique feature ids, counts)"""
+    words = _TOKEN.findall((text or '').lower())
+    grams = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    if not grams:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    hashed = np.fromiter((zlib.crc32(gram.encode()) % FEATURES for gram in grams), dtype=np.int64, count=len(grams))
+    return np.unique(hashed, return_counts=True)
+
+
+def weigh(cols: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sublinear TF times IDF, L2-normalized"""
+    if not len(cols):
+        return _EMPTY
+    vals = ((1.0 + np.log(counts)) * idf[cols]).astype(np.float32)
+    return cols, vals / np.float32(np.sqrt(np.dot(vals, vals)))
+
+
+class TextMatrix:
+    """One side's TF-IDF rows: a column-major main segment plus an append-only delta"""
+
+    def __init__(self, idf, ids, colptr, rows, vals, delta_ids, delta_rows, delta_cols, delta_vals):
+        self.idf = idf
+        self.ids = np.concatenate([ids, delta_ids]).astype(np.int64)
+        self.main_rows = len(ids)
+        self.colptr, self.rows, self.vals = colptr, rows, vals
+        self.delta_ids = delta_ids
+        self.delta_rows, self.delta_cols, self.delta_vals = delta_rows, delta_cols, delta_vals
+
+        # Newest row per id; rows without any feature mean "no text"
+        n = len(self.ids)
+        unique, last_in_reversed = np.unique(self.ids[::-1], return_index=True)
+        self.lookup_ids = unique
+        self.lookup_rows = n - 1 - last_in_reversed
+        self.has_text = np.zeros(n, dtype=bool)
+        self.has_text[rows] = True
+        self.has_text[self.main_rows + delta_rows] = True
+
+    @classmethod
+    def empty(cls, idf=None):
+        return cls(
+            np.ones(FEATURES, dtype=np.float32) if idf is None else idf,
+            np.empty(0, dtype=np.int64), np.zeros(FEATURES + 1, dtype=np.int64),
+            np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_rows(cls, idf, ids, vectors):
+        """Build a main segment from per-row (cols, vals) vectors"""
+        lengths = np.fromiter((len(cols) for cols, _ in vectors), dtype=np.int64, count=len(vectors))
+        rows = np.repeat(np.arange(len(vectors), dtype=np.int32), lengths)
+        cols = np.concatenate([c for c, _ in vectors] or [np.empty(0, dtype=np.int64)])
+        vals = np.concatenate([v for _, v in vectors] or [np.empty(0, dtype=np.float32)]).astype(np.float32)
+        order = np.argsort(cols, kind='stable')
+        colptr = np.zeros(FEATURES + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=FEATURES), out=colptr[1:])
+        return cls(
+            idf, np.asarray(ids, dtype=np.int64), colptr, rows[order], vals[order],
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+        )
+
+    def vectorize(self, text: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return weigh(*features(text), self.idf)
+
+    def row_vectors(self):
+        """(id, (cols, vals)) for every live row, used when merging the delta into the main segment"""
+        rows = np.concatenate([self.rows, self.main_rows + self.delta_rows])
+        cols = np.concatenate([np.repeat(np.arange(FEATURES), np.diff(self.colptr)), self.delta_cols])
+        vals = np.concatenate([self.vals, self.delta_vals])
+        order = np.lexsort((cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        bounds = np.searchsorted(rows, self.lookup_rows, side='left'), np.searchsorted(rows, self.lookup_rows, side='right')
+        return [
+            (int(obj_id), (cols[start:end], vals[start:end]))
+            for obj_id, start, end in zip(self.lookup_ids, *bounds)
+        ]
+
+    def similarity(self, query: Tuple[np.ndarray, np.ndarray], ids: Sequence[int]) -> np.ndarray:
+        """
+        Cosine similarity of `query` with the rows for `ids`, as one sparse
+        matrix-vector product. NaN where either side has no text.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        result = np.full(len(ids), np.nan)
+        qcols, qvals = query
+        if not len(qcols) or not len(ids):
+            return result
+
+        n = len(self.ids)
+        sims = np.zeros(n)
+        # Main segment: gather the posting lists of the query's features
+        starts = self.colptr[qcols]
+        lengths = self.colptr[qcols + 1] - starts
+        total = int(lengths.sum())
+        if total:
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            weights = self.vals[offsets] * np.repeat(qvals, lengths)
+            sims += np.bincount(self.rows[offsets], weights=weights, minlength=n)
+        # Delta segment: small, so match its entries against the query directly
+        if len(self.delta_cols):
+            at = np.minimum(np.searchsorted(qcols, self.delta_cols), len(qcols) - 1)
+            hit = qcols[at] == self.delta_cols
+            weights = self.delta_vals[hit] * qvals[at[hit]]
+            sims += np.bincount(self.main_rows + self.delta_rows[hit], weights=weights, minlength=n)
+
+        at = np.minimum(np.searchsorted(self.lookup_ids, ids), max(len(self.lookup_ids) - 1, 0))
+        known = (self.lookup_ids[at] == ids) if len(self.lookup_ids) else np.zeros(len(ids), dtype=bool)
+        rows = self.lookup_rows[at[known]]
+        present = self.has_text[rows]
+        matched = np.flatnonzero(known)[present]
+        result[matched] = np.minimum(sims[rows[present]], 1.0)
+        return result
+
+
+def index_dir() -> str:
+    return str(getattr(settings, 'TEXT_INDEX_DIR', os.path.join(settings.BASE_DIR, 'text_index')))
+
+
+def _paths(name: str) -> Tuple[str, str]:
+    directory = index_dir()
+    return os.path.join(directory, f'{name}.npz'), os.path.join(directory, f'{name}.delta.npz')
+
+
+def _stamp(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _save(path: str, **arrays):
+    """Write an .npz atomically so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as f:
+        np.savez(f, **arrays)
+    os.replace(f.name, path)
+
+
+def load(name: str) -> TextMatrix:
+    """The current matrix for one side, reloaded only when its files change"""
+    main_path, delta_path = _paths(name)
+    stamp = (_stamp(main_path), _stamp(delta_path))
+    with _lock:
+        cached = _cache.get(main_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    if stamp[0]:
+        with np.load(main_path) as main:
+            parts = [main['idf'], main['ids'], main['colptr'], main['rows'], main['vals']]
+    else:
+        empty = TextMatrix.empty()
+        parts = [empty.idf, empty.ids, empty.colptr, empty.rows, empty.vals]
+    if stamp[1]:
+        with np.load(delta_path) as delta:
+            parts += [delta['ids'], delta['rows'], delta['cols'], delta['vals']]
+    else:
+        parts += [np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32),
+                  np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)]
+    matrix = TextMatrix(*parts)
+
+    with _lock:
+        _cache[main_path] = (stamp, matrix)
+    return matrix
+
+
+def _write_main(name: str, matrix: TextMatrix):
+    main_path, delta_path = _paths(name)
+    _save(main_path, idf=matrix.idf, ids=matrix.ids[:matrix.main_rows], colptr=matrix.colptr,
+          rows=matrix.rows, vals=matrix.vals)
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+
+
+@contextmanager
+def _writing():
+    """Serialize index writers across threads and, where supported, processes"""
+    directory = index_dir()
+    os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        with _write_lock:
+            yield
+        return
+    with open(os.path.join(directory, '.lock'), 'w') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def upsert(name: str, obj_id: int, text: Optional[str]):
+    """Append the current text of one object to its side's delta segment"""
+    upsert_many(name, [(obj_id, text)])
+
+
+def upsert_many(name: str, items: Iterable[Tuple[int, Optional[str]]]):
+    """Append the current text of several objects to the delta segment in one write"""
+    items = list(items)
+    if not items:
+        return
+    with _writing():
+        matrix = load(name)
+        delta_ids, delta_rows = [matrix.delta_ids], [matrix.delta_rows]
+        delta_cols, delta_vals = [matrix.delta_cols], [matrix.delta_vals]
+        row = len(matrix.delta_ids)
+        for obj_id, text in items:
+            cols, vals = matrix.vectorize(text)
+            delta_ids.append(np.array([obj_id], dtype=matrix.delta_ids.dtype))
+            delta_rows.append(np.full(len(cols), row, dtype=np.int32))
+            delta_cols.append(cols)
+            delta_vals.append(vals)
+            row += 1
+        _, delta_path = _paths(name)
+        delta_ids = np.concatenate(delta_ids)
+        delta_rows = np.concatenate(delta_rows)
+        delta_cols = np.concatenate(delta_cols)
+        delta_vals = np.concatenate(delta_vals)
+
+        if len(delta_ids) > getattr(settings, 'TEXT_INDEX_DELTA_ROWS', 1000):
+            # Fold the delta into the main segment; IDF is unchanged, so rows stay comparable
+            merged = TextMatrix(matrix.idf, matrix.ids[:matrix.main_rows], matrix.colptr, matrix.rows, matrix.vals,
+                                delta_ids, delta_rows, delta_cols, delta_vals)
+            vectors = merged.row_vectors()
+            _write_main(name, TextMatrix.from_rows(matrix.idf, [i for i, _ in vectors], [v for _, v in vectors]))
+        else:
+            _save(delta_path, ids=delta_ids, rows=delta_rows, cols=delta_cols, vals=delta_vals)
+
+
+def index_student(student):
+    upsert(STUDENTS, student.id, student_text(student))
+
+
+def index_project(project):
+    upsert(PROJECTS, project.id, project_text(project))
+
+
+def index_projects(projects: Iterable):
+    upsert_many(PROJECTS, ((project.id, project_text(project)) for project in projects))
+
+
+def remove_student(student_id: int):
+    upsert(STUDENTS, student_id, None)
+
+
+def remove_project(project_id: int):
+    upsert(PROJECTS, project_id, None)
+
+
+def project_similarity(student, project_ids: Sequence[int]) -> np.ndarray:
+    """Text similarity of one student to each project (NaN where either has no text)"""
+    matrix = load(PROJECTS)
+    return matrix.similarity(matrix.vectorize(student_text(student)), project_ids)
+
+
+def student_similarity(project, student_ids: Sequence[int]) -> np.ndarray:
+    """Text similarity of one project to each student (NaN where either has no text)"""
+    matrix = load(STUDENTS)
+    return matrix.similarity(matrix.vectorize(project_text(project)), student_ids)
+
+
+def build(students: Iterable, projects: Iterable) -> Tuple[int, int]:
+    """Full rebuild of both sides from (id, text) pairs; IDF comes from the project texts"""
+    project_docs = [(obj_id, features(text)) for obj_id, text in projects]
+    student_docs = [(obj_id, features(text)) for obj_id, text in students]
+
+    df = np.bincount(
+        np.concatenate([cols for _, (cols, _) in project_docs] or [np.empty(0, dtype=np.int64)]),
+        minlength=FEATURES,
+    )
+    idf = (np.log((1 + len(project_docs)) / (1 + df)) + 1).astype(np.float32)
+
+    with _writing():
+        for name, docs in ((PROJECTS, project_docs), (STUDENTS, student_docs)):
+            vectors = [weigh(cols, counts, idf) for _, (cols, counts) in docs]
+            _write_main(name, TextMatrix.from_rows(idf, [obj_id for obj_id, _ in docs], vectors))
+    return len(student_docs), len(project_docs)
+
+
+def rebuild_text_index() -> Tuple[int, int]:
+    """Rebuild both sides from the database; returns (students, projects) indexed"""
+    from .models import StudentProfile, ProfessorProject
+
+    students = StudentProfile.objects.values_list('id', 'headline', 'summary', 'skills_text')
+    projects = ProfessorProject.objects.values_list('id', 'title', 'description')
+    return build(
+        ((row[0], ' '.join(filter(None, row[1:]))) for row in students.iterator(chunk_size=2000)),
+        ((row[0], ' '.join(filter(None, row[1:]))) for row in projects.iterator(chunk_size=2000)),
+    )
@@ -1,20 +1,27 @@
 
 from django.urls import path
 from .views import (
-    LoginUser, StudentRegisterView, ProfessorRegisterView, 
+    LoginUser, LogoutUser, StudentRegisterView, ProfessorRegisterView,
     ProfessorJobListAPIView, ProfessorProjectListCreateAPIView,
-    StudentMatchesAPIView, ProjectMatchesAPIView, AllProjectsAPIView
+    StudentMatchesAPIView, ProjectMatchesAPIView, AllProjectsAPIView,
+    MatchCacheStatsAPIView, SwipeCreateAPIView, SwipeBatchAPIView, UploadTicketAPIView, UploadAPIView,
 )
 
 urlpatterns = [
     path('login/', LoginUser.as_view(), name='user-login'),
+    path('logout/', LogoutUser.as_view(), name='user-logout'),
     path('register/student/', StudentRegisterView.as_view(), name='register-student'),
     path('register/professor/', ProfessorRegisterView.as_view(), name='register-professor'),
+    path('uploads/', UploadTicketAPIView.as_view(), name='media-upload-ticket'),
+    path('uploads/<str:ticket>/', UploadAPIView.as_view(), name='media-upload'),
     path("professor/jobs/", ProfessorJobListAPIView.as_view(), name="professor-job-list"),
     path("professor/projects/", ProfessorProjectListCreateAPIView.as_view(), name="professor-projects"),
     path("professor/<int:profile_id>/projects/", ProfessorProjectListCreateAPIView.as_view(), name="professor-profile-projects"),
     # Matching endpoints
     path("student/matches/", StudentMatchesAPIView.as_view(), name="student-matches"),
+    path("student/swipes/", SwipeCreateAPIView.as_view(), name="student-swipes"),
+    path("student/swipes/batch/", SwipeBatchAPIView.as_view(), name="student-swipes-batch"),
     path("project/<int:project_id>/matches/", ProjectMatchesAPIView.as_view(), name="project-matches"),
+    path("matches/cache-stats/", MatchCacheStatsAPIView.as_view(), name="match-cache-stats"),
     path("projects/", AllProjectsAPIView.as_view(), name="all-projects"),
 ]
\ No newline at end of file
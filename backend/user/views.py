@@ -1,16 +1,42 @@
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-from .serializers import UserSerializer, StudentProfileSerializer, ProfessorProfileSerializer, ProfessorProjectSerializer
-from .models import Student, StudentProfile, ProfessorProfile, Professor, ProfessorProject
-from rest_framework.authtoken.models import Token
-from .matching import get_student_matches, get_project_matches
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.throttling import ScopedRateThrottle
+from .serializers import (
+    UserSerializer, StudentProfileSerializer, ProfessorProfileSerializer, ProfessorProjectSerializer,
+    SwipeSerializer, SwipeBatchSerializer,
+)
+from .models import Student, StudentProfile, ProfessorProfile, Professor, ProfessorProject, Swipe, SwipeEvent
+from .authentication import cached_profile, issue_token, revoke_token, TokenInfo
+from .match_store import stored_student_matches, stored_project_matches
+from .match_cache import cached_student_matches, cache_stats, catalog_version, bump_student_version
+from .pagination import encode_cursor, decode_cursor, InvalidCursor, BrowsePagination
+from .async_api import AsyncAPIView, run_in_thread
+from .streaming import stream_format, streaming_response, InvalidStreamFormat
+from .search import filter_projects, InvalidFilter
+from .media import (
+    PROFILE_IMAGE_FIELDS, claim_upload, issue_upload, receive_upload, upload_offset,
+    InvalidUpload, UploadOffsetMismatch,
+)
+from .conditional import (
+    not_modified, with_validators, profile_list_validators, project_list_validators,
+    student_match_validators, project_match_validators,
+)
 
 
 
 class LoginUser(APIView):
+    # A stale or revoked token header must not block logging in again
+    authentication_classes = []
+
     def post(self, request, *args, **kwargs):
         username = request.data.get('username')
         password = request.data.get('password')
@@ -18,8 +44,8 @@ class LoginUser(APIView):
         user = authenticate(username=username, password=password)
 
         if user:
-            # Get or create token for the user
-            token, created = Token.objects.get_or_create(user=user)
+            # The user's token, or a new one if it has expired
+            token = issue_token(user)
             serializer = UserSerializer(user)
             return Response({
                 "token": token.key,
@@ -28,6 +54,118 @@ class LoginUser(APIView):
         else:
             return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
+
+class LogoutUser(APIView):
+    """Revoke the token the request was authenticated with"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if isinstance(request.auth, TokenInfo):
+            revoke_token(request.auth.key)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_student_profile(request):
+    """The request user's StudentProfile, from the token cache when possible; raises DoesNotExist"""
+    profile = cached_profile(request, StudentProfile)
+    return profile if profile is not None else StudentProfile.objects.get(user=request.user)
+
+def claim_uploads(request, fields):
+    """
+    Stored names for the `<field>_upload` tickets sent in place of files; raises
+    InvalidUpload. Call it inside the registration's transaction once everything else
+    has validated: the staged files are only deleted when that transaction commits.
+    """
+    return {
+        field: claim_upload(request.data[f'{field}_upload'], field)
+        for field in fields if request.data.get(f'{field}_upload')
+    }
+
+
+def json_list(value):
+    """A list sent as JSON or as a JSON-encoded string (multipart forms); [] otherwise"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def project_batch_serializer(rows):
+    """Validates up to PROJECT_BATCH_MAX projects for one bulk insert"""
+    return ProfessorProjectSerializer(
+        data=rows, many=True, allow_empty=False, max_length=getattr(settings, 'PROJECT_BATCH_MAX', 500),
+    )
+
+
+class UploadTicketAPIView(APIView):
+    """
+    Start an upload that bypasses the registration request: returns a ticket and the URL
+    to PUT the file to (or PATCH it to in chunks); the registration form then sends
+    `<field>_upload=<ticket>`. Open to anonymous clients, so rate limited by the
+    'uploads' throttle scope; each ticket stages at most MEDIA_UPLOAD_MAX_BYTES.
+    """
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'uploads'
+
+    def post(self, request):
+        size = request.data.get('size')
+        try:
+            upload = issue_upload(
+                request.data.get('field'), request.data.get('filename', ''),
+                request.data.get('content_type', ''), request, int(size) if size not in (None, '') else None,
+            )
+        except ValueError as e:  # InvalidUpload, or a size that is not a number
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
+class UploadAPIView(APIView):
+    """
+    Receives ticketed uploads when the storage backend has no direct upload URL.
+    PUT sends the whole file; PATCH appends a chunk starting at its Upload-Offset header,
+    and HEAD returns the Upload-Offset to resume from after a dropped connection.
+    """
+
+    def head(self, request, ticket):
+        try:
+            state = upload_offset(ticket)
+        except InvalidUpload as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return self.progress(Response(status=status.HTTP_200_OK), state)
+
+    def put(self, request, ticket):
+        return self.receive(request, ticket, None)
+
+    def patch(self, request, ticket):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset header required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.receive(request, ticket, offset)
+
+    def receive(self, request, ticket, offset):
+        # Read from the raw body stream, so nothing is buffered or parsed
+        stream = request.stream if request.stream is not None else io.BytesIO()
+        try:
+            state = receive_upload(ticket, stream, offset)
+        except UploadOffsetMismatch as e:
+            response = Response({'error': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+            return self.progress(response, {'offset': e.offset})
+        except InvalidUpload as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.progress(Response(state, status=status.HTTP_200_OK), state)
+
+    @staticmethod
+    def progress(response, state):
+        response['Upload-Offset'] = str(state['offset'])
+        if state.get('size'):
+            response['Upload-Length'] = str(state['size'])
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
 class StudentRegisterView(APIView):
     def post(self, request):
         user_data = {
@@ -79,21 +217,28 @@ class StudentRegisterView(APIView):
             "reliability": request.data.get("reliability"),
         }
 
-        user_serializer = UserSerializer(data=user_data)
-        if user_serializer.is_valid():
+        # The account and profile are created together or not at all
+        with transaction.atomic():
+            user_serializer = UserSerializer(data=user_data)
+            if not user_serializer.is_valid():
+                return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             user = user_serializer.save()
             student = Student.objects.get(id=user.id)  # Get the student instance created by signal
 
             profile, _ = StudentProfile.objects.get_or_create(user=student)
             profile_serializer = StudentProfileSerializer(profile, data=profile_data, partial=True)
+            if not profile_serializer.is_valid():
+                transaction.set_rollback(True)
+                return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            if profile_serializer.is_valid():
-                profile_serializer.save()
-                return Response({"message": "Student registered successfully"}, status=status.HTTP_201_CREATED)
-
-            return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            # Files uploaded ahead of time with a ticket (UploadTicketAPIView)
+            try:
+                uploaded = claim_uploads(request, ('transcript', 'resume'))
+            except InvalidUpload as e:
+                transaction.set_rollback(True)
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            profile_serializer.save(**uploaded)
+        return Response({"message": "Student registered successfully"}, status=status.HTTP_201_CREATED)
     
 
 class ProfessorRegisterView(APIView):
@@ -113,62 +258,49 @@ class ProfessorRegisterView(APIView):
                 "university": request.data.get("university") or request.data.get("company_location"),
                 "description": request.data.get("description") or request.data.get("company_description"),
                 "website": request.data.get("website") or request.data.get("company_website"),
-                "team_image": request.FILES.get("team_image") or request.FILES.get("company_logo"),
+                "profile_image": request.FILES.get("profile_image") or request.FILES.get("team_image") or request.FILES.get("company_logo"),
                 "lab_first_image": request.FILES.get("lab_first_image") or request.FILES.get("company_office_first_image"),
                 "lab_second_image": request.FILES.get("lab_second_image") or request.FILES.get("company_office_second_image"),
                 "lab_third_image": request.FILES.get("lab_third_image") or request.FILES.get("company_office_third_image"),
                 "position_description": request.data.get("position_description") or request.data.get("job_internship_vancancy"),
             }
 
-            user_serializer = UserSerializer(data=user_data)
-            if user_serializer.is_valid():
+            # Optional: several projects as a JSON list under 'projects' (a JSON string if multipart)
+            projects = json_list(request.data.get('projects'))
+
+            # The account, profile and projects are created together or not at all
+            with transaction.atomic():
+                user_serializer = UserSerializer(data=user_data)
+                if not user_serializer.is_valid():
+                    return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 user = user_serializer.save()
                 professor = Professor.objects.get(id=user.id)
 
                 profile, _ = ProfessorProfile.objects.get_or_create(user=professor)  # Created by signal
                 profile_serializer = ProfessorProfileSerializer(profile, data=profile_data, partial=True)
-                if profile_serializer.is_valid():
-                    profile = profile_serializer.save()
-
-                    # Optional: handle multiple projects from payload JSON list under 'projects'
-                    projects = request.data.get('projects')
-                    if projects:
-                        # Expect projects as list of dicts if using JSON; if multipart, it may be a JSON string
-                        import json
-                        if isinstance(projects, str):
-                            try:
-                                projects = json.loads(projects)
-                            except Exception:
-                                projects = []
-                        if isinstance(projects, list):
-                            for p in projects:
-                                # Parse JSON fields if they come as strings
-                                required_skills = p.get('required_skills', [])
-                                if isinstance(required_skills, str):
-                                    try:
-                                        required_skills = json.loads(required_skills)
-                                    except:
-                                        required_skills = []
-                                
-                                ProfessorProject.objects.create(
-                                    profile=profile,
-                                    title=p.get('title', ''),
-                                    description=p.get('description', ''),
-                                    modality=p.get('modality', None),
-                                    location=p.get('location', None),
-                                    # Algorithm fields
-                                    required_skills=required_skills if required_skills else [],
-                                    hrs_per_week=p.get('hrs_per_week'),
-                                    start_date=p.get('start_date'),
-                                    end_date=p.get('end_date'),
-                                    capacity=p.get('capacity', 1),
-                                    is_open=True,
-                                )
-                    return Response({"message": "Professor registered successfully"}, status=status.HTTP_201_CREATED)
+                if not profile_serializer.is_valid():
+                    transaction.set_rollback(True)
+                    return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-                return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                project_serializer = project_batch_serializer([
+                    dict(project, profile=profile.id, is_open=True,
+                         required_skills=json_list(project.get('required_skills')))
+                    for project in projects if isinstance(project, dict)
+                ]) if projects else None
+                if project_serializer is not None and not project_serializer.is_valid():
+                    transaction.set_rollback(True)
+                    return Response({'projects': project_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                # Images uploaded ahead of time with a ticket (UploadTicketAPIView)
+                try:
+                    uploaded = claim_uploads(request, PROFILE_IMAGE_FIELDS)
+                except InvalidUpload as e:
+                    transaction.set_rollback(True)
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                profile_serializer.save(**uploaded)
+                if project_serializer is not None:
+                    project_serializer.save()
+            return Response({"message": "Professor registered successfully"}, status=status.HTTP_201_CREATED)
 
         except Exception as e:
             print("Professor registration error:", str(e))
@@ -178,21 +310,48 @@ class ProfessorRegisterView(APIView):
         
 
 class ProfessorJobListAPIView(APIView):
+    """All professor profiles with their project ids (?stream=json|ndjson streams the list)"""
+
     def get(self, request):
-        profiles = ProfessorProfile.objects.all()
+        profiles = ProfessorProfile.objects.prefetch_related('projects').order_by('id')
+        try:
+            fmt = stream_format(request)
+        except InvalidStreamFormat as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        validators = profile_list_validators(request)
+        response = not_modified(request, validators)
+        if response is not None:
+            return response
+        if fmt:
+            return with_validators(streaming_response(request, profiles, lambda rows: ProfessorProfileSerializer(
+                rows, many=True, context={'request': request},
+            ).data, fmt), validators)
         serializer = ProfessorProfileSerializer(profiles, many=True, context={'request': request})
-        return Response(serializer.data)
+        return with_validators(Response(serializer.data), validators)
 
 
 class ProfessorProjectListCreateAPIView(APIView):
+    """
+    A professor's projects. POST takes one project, or a JSON list of projects that is
+    validated as a whole and inserted with one bulk_create in one transaction.
+    """
+
     def get(self, request, profile_id=None):
-        qs = ProfessorProject.objects.all()
+        qs = ProfessorProject.objects.select_related('profile')
         if profile_id:
             qs = qs.filter(profile_id=profile_id)
         serializer = ProfessorProjectSerializer(qs, many=True)
         return Response(serializer.data)
 
     def post(self, request, profile_id=None):
+        if isinstance(request.data, list):
+            rows = [dict(row, profile=profile_id) if profile_id and isinstance(row, dict) else row for row in request.data]
+            serializer = project_batch_serializer(rows)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            projects = serializer.save()
+            return Response(ProfessorProjectSerializer(projects, many=True).data, status=status.HTTP_201_CREATED)
+
         data = request.data.copy()
         if profile_id:
             data['profile'] = profile_id
@@ -203,19 +362,51 @@ class ProfessorProjectListCreateAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class StudentMatchesAPIView(APIView):
-    """Get matching projects for a student"""
+def match_page(matches, next_after, cursor_version):
+    """Match list payload with an opaque cursor for the next page"""
+    version = catalog_version()
+    snapshot = cursor_version if cursor_version is not None else version
+    return {
+        'matches': matches,
+        'count': len(matches),
+        'next_cursor': encode_cursor(next_after, snapshot) if next_after else None,
+        # The catalog changed since the first page; the client may want to restart
+        'stale': snapshot != version,
+    }
+
+
+def student_deck(student_profile, limit, cursor=None):
+    """A (cached) page of the student's unseen matches; raises InvalidCursor"""
+    after, cursor_version = decode_cursor(cursor) if cursor else (None, None)
+    matches, next_after = cached_student_matches(
+        student_profile.user_id, limit,
+        lambda: stored_student_matches(student_profile, limit=limit, after=after),
+        cursor=cursor,
+    )
+    return match_page(matches, next_after, cursor_version)
+
+
+class StudentMatchesAPIView(AsyncAPIView):
+    """Get matching projects for a student (paginated with ?limit=&cursor=)"""
     permission_classes = [IsAuthenticated]
     
-    def get(self, request):
+    async def get(self, request):
         user = request.user
         limit = int(request.query_params.get('limit', 20))
+        cursor = request.query_params.get('cursor')
         
         try:
-            # Check if user has a student profile
-            from .models import StudentProfile
+            # Deleting the profile bumps the student's version, so an unchanged deck needs no profile lookup
+            validators = await sync_to_async(student_match_validators)(request)
+            response = not_modified(request, validators)
+            if response is not None:
+                return response
+
+            # Check if user has a student profile; token requests resolved it while authenticating
             try:
-                student_profile = StudentProfile.objects.get(user=user)
+                student_profile = cached_profile(request, StudentProfile)
+                if student_profile is None:
+                    student_profile = await StudentProfile.objects.aget(user=user)
             except StudentProfile.DoesNotExist:
                 return Response({
                     'error': 'Student profile not found. Please complete your registration.',
@@ -223,11 +414,11 @@ class StudentMatchesAPIView(APIView):
                     'count': 0
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            matches = get_student_matches(user.id, limit=limit)
-            return Response({
-                'matches': matches,
-                'count': len(matches)
-            }, status=status.HTTP_200_OK)
+            # Cache lookups and the stored-match query are synchronous
+            deck = await sync_to_async(student_deck)(student_profile, limit, cursor)
+            return with_validators(Response(deck, status=status.HTTP_200_OK), validators)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -236,29 +427,186 @@ class StudentMatchesAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ProjectMatchesAPIView(APIView):
-    """Get matching students for a project"""
+class ProjectMatchesAPIView(AsyncAPIView):
+    """Get matching students for a project (paginated with ?limit=&cursor=)"""
     permission_classes = [IsAuthenticated]
     
-    def get(self, request, project_id):
+    async def get(self, request, project_id):
         limit = int(request.query_params.get('limit', 20))
+        cursor = request.query_params.get('cursor')
         
         try:
-            matches = get_project_matches(project_id, limit=limit)
-            return Response({
-                'matches': matches,
-                'count': len(matches)
-            }, status=status.HTTP_200_OK)
+            after, cursor_version = decode_cursor(cursor) if cursor else (None, None)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            validators = await sync_to_async(project_match_validators)(request)
+            response = not_modified(request, validators)
+            if response is not None:
+                return response
+            matches, next_after = await sync_to_async(stored_project_matches)(project_id, limit=limit, after=after)
+            page = await sync_to_async(match_page)(matches, next_after, cursor_version)
+            return with_validators(Response(page, status=status.HTTP_200_OK), validators)
         except Exception as e:
             return Response({
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class AllProjectsAPIView(APIView):
-    """Get all open projects for students to browse"""
+class SwipeCreateAPIView(APIView):
+    """Record a student's swipe on a project so matching stops serving it"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            student_profile = get_student_profile(request)
+        except StudentProfile.DoesNotExist:
+            return Response({'error': 'Student profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = SwipeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        project = serializer.validated_data['project']
+        client_id = serializer.validated_data.get('client_id') or None
+        with transaction.atomic():
+            # A retried request (or an event also sent in a batch) is applied once
+            if client_id is not None:
+                _, new = SwipeEvent.objects.get_or_create(student=student_profile, client_id=client_id)
+                if not new:
+                    swipe = Swipe.objects.filter(student=student_profile, project=project).first()
+                    if swipe is None:
+                        return Response({'error': 'client_id was already used for another swipe.'},
+                                        status=status.HTTP_409_CONFLICT)
+                    return Response(SwipeSerializer(swipe).data, status=status.HTTP_200_OK)
+            swipe, created = Swipe.objects.update_or_create(
+                student=student_profile,
+                project=project,
+                defaults={'direction': serializer.validated_data['direction'], 'client_id': client_id},
+            )
+        return Response(
+            SwipeSerializer(swipe).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class SwipeBatchAPIView(APIView):
+    """
+    Ingest a batch of swipes in one transaction and return the next deck page.
+    Events are deduplicated by their client-generated `client_id` (every accepted one
+    is kept as a SwipeEvent), so retrying a batch after a dropped connection is safe;
+    a new event for a project the student already swiped on updates that swipe.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            student_profile = get_student_profile(request)
+        except StudentProfile.DoesNotExist:
+            return Response({'error': 'Student profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = SwipeBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        events = serializer.validated_data['swipes']
+        limit = serializer.validated_data['limit']
+        cursor = serializer.validated_data.get('cursor') or None
+        try:
+            decode_cursor(cursor) if cursor else None
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Events replayed from an earlier batch, or repeated within this one, are duplicates
+        stored = set(
+            SwipeEvent.objects.filter(student=student_profile, client_id__in={event['client_id'] for event in events})
+            .values_list('client_id', flat=True)
+        )
+        fresh = {}
+        duplicates = 0
+        by_project = {}
+        for event in events:
+            if event['client_id'] in fresh or event['client_id'] in stored:
+                duplicates += 1
+                continue
+            fresh[event['client_id']] = event['project']
+            # The last new event per project wins
+            by_project[event['project']] = event
+
+        known = set(ProfessorProject.objects.filter(id__in=by_project).values_list('id', flat=True))
+        unknown = [event['client_id'] for project_id, event in by_project.items() if project_id not in known]
+        swipes = [
+            Swipe(student=student_profile, project_id=project_id,
+                  direction=event['direction'], client_id=event['client_id'])
+            for project_id, event in by_project.items() if project_id in known
+        ]
+        # Superseded events are recorded too, or a replay would apply them over the last one
+        accepted = [
+            SwipeEvent(student=student_profile, client_id=client_id)
+            for client_id, project_id in fresh.items() if project_id in known
+        ]
+
+        with transaction.atomic():
+            SwipeEvent.objects.bulk_create(accepted, ignore_conflicts=True)
+            swiped = set(
+                Swipe.objects.filter(student=student_profile, project_id__in=known).values_list('project_id', flat=True)
+            )
+            # Re-swiping a project updates its row, as SwipeCreateAPIView does
+            Swipe.objects.bulk_create(
+                swipes, update_conflicts=True, unique_fields=['student', 'project'],
+                update_fields=['direction', 'client_id', 'created_at'],
+            )
+            # bulk_create skips post_save, so invalidate the deck once for the whole batch
+            transaction.on_commit(lambda: bump_student_version(request.user.id))
+
+        response = {
+            'received': len(events),
+            'created': len(known - swiped),
+            'updated': len(known & swiped),
+            'duplicates': duplicates,
+            'unknown_projects': unknown,
+        }
+        response.update(student_deck(student_profile, limit, cursor))
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class AllProjectsAPIView(AsyncAPIView):
+    """
+    Open projects for students to browse, filtered and sorted by the query parameters
+    in search.py; ?limit=&offset= pages the list, ?stream=json|ndjson streams it
+    """
     
+    async def get(self, request):
+        queryset = ProfessorProject.objects.filter(is_open=True).select_related('profile')
+        try:
+            fmt = stream_format(request)
+            # Resolving ?skill= reads the skill vocabulary
+            queryset = await sync_to_async(filter_projects)(queryset, request.query_params)
+        except (InvalidStreamFormat, InvalidFilter) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        validators = await sync_to_async(project_list_validators)(request)
+        response = not_modified(request, validators)
+        if response is not None:
+            return response
+
+        def serialize(rows):
+            return ProfessorProjectSerializer(rows, many=True, context={'request': request}).data
+
+        if fmt:
+            return with_validators(streaming_response(request, queryset, serialize, fmt), validators)
+        paginator = BrowsePagination()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, request, self)
+        if page is not None:
+            response = paginator.get_paginated_response(await run_in_thread(serialize, page))
+            return with_validators(response, validators)
+        projects = [project async for project in queryset]
+        # Everything serialized is already loaded, so it can leave the request thread
+        return with_validators(Response(await run_in_thread(serialize, projects), status=status.HTTP_200_OK), validators)
+
+
+class MatchCacheStatsAPIView(APIView):
+    """Hit/miss counters of the match cache in this worker process"""
+    permission_classes = [IsAdminUser]
+
     def get(self, request):
-        projects = ProfessorProject.objects.filter(is_open=True).select_related('profile')
-        serializer = ProfessorProjectSerializer(projects, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(cache_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,21 @@
+"""
+Entry points of run_matching_worker's process pool.
+
+Under the spawn start method (the default on macOS and Windows) every pool process
+is a fresh interpreter that unpickles these functions by importing this module
+before Django is set up, so it must not import models at module level. The job
+runner is imported lazily, once init_process() has set Django up.
+"""
+
+
+def init_process():
+    """Pool initializer: set up Django and drop database connections inherited from the parent"""
+    import django
+    django.setup()
+    from django.db import connections
+    connections.close_all()
+
+
+def run_job(job_id: int) -> bool:
+    from .jobs import run_job
+    return run_job(job_id)